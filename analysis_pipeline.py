@@ -0,0 +1,94 @@
+from functools import cached_property
+from audio_analysis import AcousticExtraction, build_features, load_audio
+from audio_quality import assess_audio_quality, frame_rms
+from profiling import resolve_trace
+from risk_scoring import calculate_risk
+
+class AnalysisPipeline:
+    """
+    One recording, decoded once, flowing through gate -> features -> risk.
+
+    Nothing is decoded until a stage needs the samples, so a caller that finds the
+    recording's features cached never pays for the decode or the gate. The RMS /
+    clipping / SNR quality gate runs first on the shared decoded samples, so a silent
+    or clipped upload is rejected in milliseconds before any Praat or ensemble stage
+    runs. Its frame RMS is computed once for the silence and SNR checks, and its
+    metrics (`quality["metrics"]`, including snr_db) are what run() returns for
+    dataset storage (store_anonymized_features' quality_metrics).
+    """
+
+    def __init__(self, audio, task_type="free_speech", profile="full", trace=None, on_stage=None):
+        self.trace = resolve_trace(trace, on_stage)
+        self.audio = audio
+        self.task_type = task_type
+        self.profile = profile
+
+    @cached_property
+    def decoded(self):
+        with self.trace.stage("load_resample"):
+            return load_audio(self.audio)
+
+    @property
+    def y(self):
+        return self.decoded[0]
+
+    @property
+    def sr(self):
+        return self.decoded[1]
+
+    @cached_property
+    def extraction(self):
+        return AcousticExtraction(self.y, self.sr, profile=self.profile, trace=self.trace)
+
+    @cached_property
+    def frame_rms(self):
+        with self.trace.stage("quality_gate"):
+            return frame_rms(self.y)
+
+    @cached_property
+    def quality(self):
+        rms = self.frame_rms
+        with self.trace.stage("quality_gate"):
+            return assess_audio_quality(self.y, self.sr, rms=rms)
+
+    @property
+    def is_valid(self):
+        return self.quality["is_valid"]
+
+    def extract_features(self, lazy=False):
+        """
+        Feature extraction on the shared samples. Refuses recordings that failed the gate.
+        """
+        if not self.is_valid:
+            raise ValueError(f"Recording rejected by quality gate: {self.quality['error']}")
+        return build_features(self.extraction, self.task_type, lazy=lazy)
+
+    def calculate_risk(self, features, audio=None, mode="public", life_stage=None):
+        """
+        Risk scoring for this recording; the deep embedding is computed from the recording
+        itself (its source bytes / path) unless another `audio` source is given.
+        """
+        audio = self.audio if audio is None else audio
+        return calculate_risk(features, audio, mode, trace=self.trace, life_stage=life_stage)
+
+    def run(self, mode="public", life_stage=None):
+        """
+        Full gate-first analysis. Rejected recordings return immediately with the gate error.
+        """
+        if not self.is_valid:
+            return {
+                "is_valid": False,
+                "error": self.quality["error"],
+                "quality": self.quality,
+                "pipeline_trace": self.trace.as_dict()
+            }
+
+        features = self.extract_features()
+        analysis = self.calculate_risk(features, mode=mode, life_stage=life_stage)
+        return {
+            "is_valid": True,
+            "quality": self.quality,
+            "features": features,
+            "analysis": analysis,
+            "pipeline_trace": self.trace.as_dict()
+        }
@@ -5,18 +5,25 @@ import os
 import random
 import uuid
 import base64
-import librosa
 import numpy as np
 import io
 import threading
 import plotly.graph_objects as go
 from security_utils import generate_secure_key
 from mailer import send_encrypted_report, send_access_key_email, send_contact_form_emails
-from audio_analysis import extract_features
-from risk_scoring import calculate_risk, calculate_longitudinal_delta
+from audio_analysis import waveform_spectrogram
+from analysis_pipeline import AnalysisPipeline
+from risk_scoring import calculate_longitudinal_delta, risk_cache_namespace
+from feature_cache import feature_cache
+from baseline_service import baseline_service
+from change_detection import change_detector
+from dataset_manager import anonymized_patient_hash
 from report_agent import generate_report, encrypt_pdf
 from auth import handle_authentication
 
+# Extraction profile for interactive scans (see audio_analysis.EXTRACTION_PROFILES)
+EXTRACTION_PROFILE = "full"
+
 # --- CONFIG & STYLING ---
 st.set_page_config(page_title="Nuros | Voice AI", page_icon="🧬", layout="centered")
 
@@ -697,17 +704,34 @@ elif st.session_state.step == 4:
     
     status_text.text("Extracting Formants & Rendering CNN Mel-Spectrogram...")
     
-    # Save temp file
-    temp_path = "temp_audio.wav"
-    with open(temp_path, "wb") as f:
-        f.write(st.session_state.audio_bytes)
+    # Content-addressed: widget reruns on the same recording are served from the cache
+    # without decoding the upload again. On a miss the upload is decoded once, in memory,
+    # and the quality gate runs first so silent/clipped recordings never reach Praat or the ensemble.
+    audio_bytes = st.session_state.audio_bytes
+    analysis_run = AnalysisPipeline(audio_bytes, profile=EXTRACTION_PROFILE)
+    features_key = feature_cache.key(audio_bytes, namespace=f"features:{EXTRACTION_PROFILE}")
+    features = feature_cache.get(features_key)
+    features_cached = features is not None
+
+    if features is None and not analysis_run.is_valid:
+        progress_bar.empty()
+        status_text.empty()
+        st.error(f"⚠️ {analysis_run.quality['error']}")
+        if st.button("🎙️ Record Again"):
+            del st.session_state.audio_bytes
+            st.session_state.step = 3
+            st.rerun()
+        st.markdown("</div>", unsafe_allow_html=True)
+        st.stop()
         
     for i in range(1, 40):
         time.sleep(0.01)
         progress_bar.progress(i)
         
     # Feature Extraction
-    features = extract_features(temp_path)
+    if features is None:
+        features = analysis_run.extract_features()
+        feature_cache.put(features_key, features)
     
     status_text.text("Applying Deep Learning Predictor (90%+ Accuracy Engine)...")
     for i in range(40, 80):
@@ -715,7 +739,12 @@ elif st.session_state.step == 4:
         progress_bar.progress(i)
         
     # Risk Scoring Framework with Women's Health Life Stage Calibration
-    analysis = calculate_risk(features, st.session_state.patient_profile.get("life_stage", "General"))
+    life_stage = st.session_state.patient_profile.get("life_stage", "General")
+    # Keyed by model version too, so a newly published model re-scores instead of hitting stale results
+    analysis = feature_cache.get_or_compute(
+        audio_bytes, lambda: analysis_run.calculate_risk(features, life_stage=life_stage),
+        namespace=risk_cache_namespace(life_stage, EXTRACTION_PROFILE)
+    )
     
     status_text.text("Generating Scribe Narrative...")
     for i in range(80, 101):
@@ -726,19 +755,21 @@ elif st.session_state.step == 4:
     progress_bar.empty()
     st.success("Acoustic Analysis Pipeline Complete.")
     
-    # --- VOCAL TWIN DELTA ANALYSIS (Simulating Database Retrieval) ---
-    baseline_features = st.session_state.get("baseline_features", None)
-    
-    # For demonstration/MVP purposes, if no baseline exists, we mock a historical baseline tightly 
-    # to demonstrate the >15% longitudinal drift trigger.
-    if not baseline_features:
-        baseline_features = {
-            "jitter_percent": max(0.001, features.get("jitter_percent", 0.0) * 0.8), # Ensure current is 20%+ higher than baseline
-            "shimmer_percent": max(0.001, features.get("shimmer_percent", 0.0) * 0.8)
-        }
-        st.session_state.baseline_features = baseline_features # save to session so it persists
-
-    delta_analysis = calculate_longitudinal_delta(features, baseline_features)
+    # --- VOCAL TWIN DELTA ANALYSIS ---
+    # Compared against the patient's rolling baseline and change-point state (keyed by the
+    # anonymized hash), then folded into both once per recording so reruns do not count it twice.
+    scan_key = feature_cache.key(audio_bytes, namespace="vocal_twin")
+    if st.session_state.get("vocal_twin_scan") != scan_key:
+        profile = st.session_state.patient_profile
+        patient_hash = anonymized_patient_hash({
+            "email": profile.get("email", ""),
+            "name": f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip(),
+        })
+        baseline_features, _ = baseline_service.observe(patient_hash, features)
+        change = change_detector.update(patient_hash, features)
+        st.session_state.vocal_twin_delta = calculate_longitudinal_delta(features, baseline_features, change)
+        st.session_state.vocal_twin_scan = scan_key
+    delta_analysis = st.session_state.vocal_twin_delta
     
     if delta_analysis["alert"]:
         st.error(delta_analysis["message"])
@@ -753,9 +784,11 @@ elif st.session_state.step == 4:
     st.write("Real-time bioluminescent mapping of glottal frequencies.")
     
     # Generate STFT for 3D Plot (Scientific Oscillograph High-Density Format)
-    y, sr = librosa.load(temp_path, duration=3.0) # only plot first 3 secs for speed
-    D = np.abs(librosa.stft(y, n_fft=1024, hop_length=128))
-    D_db = librosa.amplitude_to_db(D, ref=np.max)
+    # Reuses the samples the analysis already decoded; only a features cache hit decodes (first 3 secs)
+    if features_cached:
+        D_db = waveform_spectrogram(audio_bytes, duration=3.0)
+    else:
+        D_db = waveform_spectrogram((analysis_run.y[:3 * analysis_run.sr], analysis_run.sr), duration=3.0)
     
     # Truncate high frequencies for bioluminescent live-physics look
     D_db = D_db[:150, :] 
@@ -793,10 +826,6 @@ elif st.session_state.step == 4:
         height=300
     )
     st.plotly_chart(fig, use_container_width=True)
-    
-    # Cleanup
-    if os.path.exists(temp_path):
-        os.remove(temp_path)
         
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -0,0 +1,137 @@
+import numpy as np
+from inference_engine import _sigmoid
+
+# d activation / d pre-activation, as a function of the pre-activation z
+_ACTIVATION_GRADIENTS = {
+    "relu": lambda z: (z > 0).astype(np.float64),
+    "tanh": lambda z: 1.0 - np.tanh(z) ** 2,
+    "logistic": lambda z: _sigmoid(z) * (1.0 - _sigmoid(z)),
+    "identity": lambda z: np.ones_like(z),
+}
+
+def _node_expectations(left, right, value, weight, roots):
+    """
+    Training-weighted expected leaf value below every node of a flattened forest.
+    GBT internal nodes store the raw residual mean, not the (line-searched) leaf
+    values, so expectations are recomputed bottom-up from the leaves.
+    """
+    expectation = np.where(left < 0, value, 0.0)
+    # Children always have larger indices than their parent within a flattened tree
+    for node in range(len(left) - 1, -1, -1):
+        if left[node] >= 0:
+            l, r = left[node], right[node]
+            total = weight[l] + weight[r]
+            expectation[node] = (weight[l] * expectation[l] + weight[r] * expectation[r]) / total if total else 0.0
+    return expectation
+
+class AttributionEngine:
+    """
+    Per-prediction feature attributions for the compiled ensemble, over the fused vector.
+
+    Each member is explained in its own logit space, relative to the training mean
+    (scaled input 0):
+      - lr:  exact linear contributions, coef * x_scaled
+      - xgb: path-based (Saabas) contributions, the change in expected tree output at
+             every split along the decision path, charged to the split feature
+      - nn:  gradient x input of the output logit
+    The member attributions are mapped to probability space by each member's local
+    slope p(1 - p), weighted by the normalized voting weights and averaged over the
+    calibrated folds. Tree expectations and per-fold weights are precomputed once.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.n_features = engine.mean.shape[0]
+        self.weights = engine.voting_weights / engine.voting_weights.sum()
+        self.activation_gradient = _ACTIVATION_GRADIENTS[engine.mlp_activation]
+        a = engine.arrays
+        self._expectations = []
+        for fold in range(engine.n_folds):
+            self._expectations.append(_node_expectations(
+                a[f"f{fold}_gbt_left"], a[f"f{fold}_gbt_right"], a[f"f{fold}_gbt_value"],
+                a[f"f{fold}_gbt_weight"], a[f"f{fold}_gbt_roots"]
+            ))
+
+    # --- Members ---
+    def _gbt(self, fold, X_scaled):
+        """
+        Returns (raw logit (N,), Saabas contributions (N, D)).
+        """
+        a = self.engine.arrays
+        feature = a[f"f{fold}_gbt_feature"]
+        threshold = a[f"f{fold}_gbt_threshold"]
+        left = a[f"f{fold}_gbt_left"]
+        right = a[f"f{fold}_gbt_right"]
+        roots = a[f"f{fold}_gbt_roots"]
+        learning_rate = float(a[f"f{fold}_gbt_learning_rate"])
+        expectation = self._expectations[fold]
+
+        n_rows = X_scaled.shape[0]
+        X32 = X_scaled.astype(np.float32).astype(np.float64)
+        rows = np.arange(n_rows)[:, None]
+        node = np.broadcast_to(roots, (n_rows, roots.shape[0])).copy()
+        contributions = np.zeros((n_rows, self.n_features))
+        for _ in range(int(a[f"f{fold}_gbt_max_depth"])):
+            is_split = left[node] >= 0
+            if not is_split.any():
+                break
+            split_feature = feature[node]
+            go_left = X32[rows, split_feature] <= threshold[node]
+            child = np.where(is_split, np.where(go_left, left[node], right[node]), node)
+            delta = learning_rate * (expectation[child] - expectation[node])
+            np.add.at(contributions, (np.broadcast_to(rows, node.shape), split_feature), delta)
+            node = child
+
+        bias = a[f"f{fold}_gbt_init"] + learning_rate * expectation[roots].sum()
+        return bias + contributions.sum(axis=1), contributions
+
+    def _lr(self, fold, X_scaled):
+        coef = self.engine.arrays[f"f{fold}_lr_coef"]
+        contributions = X_scaled * coef
+        return contributions.sum(axis=1) + self.engine.arrays[f"f{fold}_lr_intercept"], contributions
+
+    def _mlp(self, fold, X_scaled):
+        logit, pre_activations = self.engine._mlp_forward(fold, X_scaled)
+        n_layers = int(self.engine.arrays[f"f{fold}_mlp_n_layers"])
+        # Backpropagate d logit / d input through the hidden layers
+        grad = np.broadcast_to(self.engine.arrays[f"f{fold}_mlp_W{n_layers - 1}"][:, 0], (X_scaled.shape[0], pre_activations[-1].shape[1]))
+        for i in range(n_layers - 2, -1, -1):
+            grad = (grad * self.activation_gradient(pre_activations[i])) @ self.engine.arrays[f"f{fold}_mlp_W{i}"].T
+        return logit, grad * X_scaled
+
+    # --- Ensemble ---
+    def explain_scaled(self, X_scaled):
+        """
+        Attributions (N, D) for scaled fused vectors, in calibrated-vote probability units.
+        """
+        X_scaled = np.atleast_2d(X_scaled)
+        total = np.zeros(X_scaled.shape)
+        for fold in range(self.engine.n_folds):
+            for weight, member in zip(self.weights, (self._gbt, self._lr, self._mlp)):
+                logit, contributions = member(fold, X_scaled)
+                p = _sigmoid(logit)
+                total += (weight * p * (1.0 - p))[:, None] * contributions
+        return total / self.engine.n_folds
+
+    def explain(self, X):
+        """
+        Attributions (N, D) for raw (unscaled) fused vectors.
+        """
+        return self.explain_scaled(self.engine.transform(X))
+
+def top_drivers(attributions, labels, groups=None, top_k=3):
+    """
+    Ranks one row of attributions by magnitude. `labels` names every fused column;
+    `groups` optionally maps a label to a list of column indices summed into one driver
+    (e.g. all embedding dimensions). Returns [(label, contribution), ...].
+    """
+    scores = {}
+    grouped = set()
+    for label, columns in (groups or {}).items():
+        scores[label] = float(attributions[columns].sum())
+        grouped.update(columns)
+    for i, label in enumerate(labels):
+        if i not in grouped:
+            scores[label] = float(attributions[i])
+    ranked = sorted(scores.items(), key=lambda item: abs(item[1]), reverse=True)
+    return ranked[:top_k]
@@ -5,118 +5,313 @@ import numpy as np
 import scipy.signal
 import hashlib
 import json
-import os
+import io
+from collections.abc import Mapping
+from functools import cached_property
+from feature_graph import SpectralFeatureGraph
+from profiling import PipelineTrace, resolve_trace, profile_request
 
-def extract_features(audio_path, task_type="free_speech"):
+# Enforce 48kHz sampling rate for micro-instabilities
+TARGET_SR = 48000
+
+# Bump whenever extracted values change, so cached features are invalidated
+EXTRACTOR_VERSION = "2.1.0"
+
+# Spectral analysis behind the inputs the ensemble consumes (MFCCs, spectral centroid, ZCR).
+# Every profile computes these identically, so features from any profile score the same.
+MODEL_SPECTRAL = {"spectral_sr": TARGET_SR, "n_fft": 2048, "hop_length": 512, "n_mels": 128, "n_mfcc": 40}
+
+# Named extraction profiles. Praat micro-perturbation measures (jitter, shimmer, HNR,
+# CPP, formants) and the model-consumed spectral inputs always run at full rate; "fast"
+# lowers the analysis rate and resolution only for the descriptive spectral features
+# (chroma, rolloff), chroma being the costliest librosa stage. MFCC deltas and flux stay on
+# the full-rate MFCCs / log-mel, which is cheaper than a second low-rate analysis.
+EXTRACTION_PROFILES = {
+    "full": {"model": MODEL_SPECTRAL, "auxiliary": MODEL_SPECTRAL},
+    "fast": {"model": MODEL_SPECTRAL, "auxiliary": {"spectral_sr": 16000, "n_fft": 1024, "hop_length": 256, "n_mels": 64}},
+}
+
+def load_audio(audio, sr=TARGET_SR, duration=None):
     """
-    Extract research-grade acoustic biomarkers from audio.
-    Now includes advanced spectral features, MFCC deltas, and Cepstral Peak Prominence (CPP).
+    Decodes audio from any supported source into a mono float array at `sr`.
+    Accepts a file path, raw bytes, a file-like buffer, a pre-decoded (y, sr) tuple,
+    or a NumPy array that is already at `sr`. In-memory sources never touch the disk.
+    """
+    if isinstance(audio, tuple):
+        y, orig_sr = audio
+        y = np.asarray(y, dtype=np.float32)
+        if y.ndim > 1:
+            y = librosa.to_mono(y)
+        if duration is not None:
+            y = y[:int(duration * orig_sr)]
+        if orig_sr != sr:
+            y = librosa.resample(y, orig_sr=orig_sr, target_sr=sr)
+        return y, sr
+
+    if isinstance(audio, np.ndarray):
+        y = audio[:int(duration * sr)] if duration is not None else audio
+        return y, sr
+
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        audio = io.BytesIO(bytes(audio))
+    elif hasattr(audio, "seek"):
+        audio.seek(0)
+
+    return librosa.load(audio, sr=sr, duration=duration)
+
+def waveform_spectrogram(audio, duration=3.0, sr=22050, n_fft=1024, hop_length=128):
+    """
+    dB STFT magnitude used by the 3D waveform visualizer (first `duration` seconds only).
+    Takes the same sources as load_audio, so already-decoded samples can be passed in as a
+    (y, sr) tuple and are only resampled, never decoded again.
+    """
+    y, sr = load_audio(audio, sr=sr, duration=duration)
+    D = np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length))
+    return librosa.amplitude_to_db(D, ref=np.max)
+
+class LazyFeatures(Mapping):
     """
-    # Enforce 48kHz sampling rate for micro-instabilities
-    y, sr = librosa.load(audio_path, sr=48000)
-    
+    Read-only feature mapping whose values are computed on first access.
+    Expensive stages (e.g. chroma, MFCC deltas, formants) only run if a consumer reads
+    a key that needs them. dict(features) or materialize() computes everything.
+    """
+
+    def __init__(self, thunks):
+        self._thunks = thunks
+        self._values = {}
+
+    def __getitem__(self, key):
+        if key not in self._values:
+            self._values[key] = self._thunks[key]()
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._thunks)
+
+    def __len__(self):
+        return len(self._thunks)
+
+    def computed(self):
+        return [key for key in self._thunks if key in self._values]
+
+    def materialize(self):
+        return {key: self[key] for key in self._thunks}
+
+class AcousticExtraction:
+    """
+    Lazily evaluated extraction stages for one decoded recording.
+    Each stage is computed once on first use and shared by every feature that needs it,
+    and its time is recorded on `trace` under the stage name.
+    """
+
+    def __init__(self, y, sr, profile="full", trace=None):
+        if profile not in EXTRACTION_PROFILES:
+            raise ValueError(f"Unknown extraction profile '{profile}'. Choose from {sorted(EXTRACTION_PROFILES)}.")
+        self.y = y
+        self.sr = sr
+        self.profile = profile
+        self.config = EXTRACTION_PROFILES[profile]
+        self.trace = trace if trace is not None else PipelineTrace()
+
     # --- 1. Spectral & High-Level Features (librosa) ---
-    # MFCCs (Expanded to 40 for deep acoustic modeling)
-    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=40)
-    mfcc_mean = np.mean(mfccs, axis=1)
-    
-    # MFCC Deltas (Velocity and Acceleration of speech tract changes)
-    mfcc_delta = librosa.feature.delta(mfccs)
-    mfcc_delta_mean = np.mean(mfcc_delta, axis=1)
-    
-    mfcc_delta2 = librosa.feature.delta(mfccs, order=2)
-    mfcc_delta2_mean = np.mean(mfcc_delta2, axis=1)
-
-    # Spectral Features
-    spectral_centroids = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-    spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=sr)[0]
-    spectral_flux = librosa.onset.onset_strength(y=y, sr=sr)
-    zcr = librosa.feature.zero_crossing_rate(y)[0]
-    chroma = librosa.feature.chroma_stft(y=y, sr=sr)
+    def _resampled(self, spectral_sr):
+        with self.trace.stage("load_resample"):
+            if spectral_sr == self.sr:
+                return self.y
+            return librosa.resample(self.y, orig_sr=self.sr, target_sr=spectral_sr)
+
+    def _spectral_graph(self, config):
+        return SpectralFeatureGraph(
+            self._resampled(config["spectral_sr"]), config["spectral_sr"],
+            n_fft=config["n_fft"], hop_length=config["hop_length"], n_mels=config["n_mels"]
+        )
+
+    @cached_property
+    def graph(self):
+        # A single STFT / mel spectrogram feeds every model-consumed spectral feature
+        return self._spectral_graph(self.config["model"])
+
+    @cached_property
+    def auxiliary_graph(self):
+        # Chroma / rolloff analysis; shares the model graph unless the profile lowers its rate
+        if self.config["auxiliary"] is self.config["model"]:
+            return self.graph
+        return self._spectral_graph(self.config["auxiliary"])
+
+    @cached_property
+    def mfccs(self):
+        with self.trace.stage("spectral"):
+            # MFCCs (Expanded to 40 for deep acoustic modeling)
+            return self.graph.mfcc(n_mfcc=self.config["model"]["n_mfcc"])
+
+    def mfcc_mean(self):
+        with self.trace.stage("spectral"):
+            return np.mean(self.mfccs, axis=1).tolist()
+
+    def mfcc_delta_mean(self):
+        with self.trace.stage("spectral"):
+            # MFCC Deltas (Velocity and Acceleration of speech tract changes)
+            return np.mean(librosa.feature.delta(self.mfccs), axis=1).tolist()
+
+    def mfcc_delta2_mean(self):
+        with self.trace.stage("spectral"):
+            return np.mean(librosa.feature.delta(self.mfccs, order=2), axis=1).tolist()
+
+    def spectral_centroid(self):
+        with self.trace.stage("spectral"):
+            return float(np.mean(self.graph.spectral_centroid()))
+
+    def spectral_rolloff(self):
+        with self.trace.stage("spectral"):
+            return float(np.mean(self.auxiliary_graph.spectral_rolloff()))
+
+    def spectral_flux(self):
+        with self.trace.stage("spectral"):
+            return float(np.mean(self.graph.spectral_flux()))
+
+    def zcr(self):
+        with self.trace.stage("spectral"):
+            return float(np.mean(librosa.feature.zero_crossing_rate(
+                self.graph.y, frame_length=self.config["model"]["n_fft"], hop_length=self.config["model"]["hop_length"]
+            )[0]))
+
+    def chroma_mean(self):
+        with self.trace.stage("spectral"):
+            return np.mean(self.auxiliary_graph.chroma(), axis=1).tolist()
 
     # --- 2. Low-Pass Filtering (Isolate Glottal Pulse) ---
-    nyq = 0.5 * sr
-    cutoff = 400.0 / nyq
-    b, a = scipy.signal.butter(4, cutoff, btype='low')
-    y_filtered = scipy.signal.filtfilt(b, a, y)
-    
-    temp_filtered_path = "temp_filtered.wav"
-    import soundfile as sf
-    sf.write(temp_filtered_path, y_filtered, sr)
+    @cached_property
+    def y_filtered(self):
+        with self.trace.stage("filter"):
+            nyq = 0.5 * self.sr
+            cutoff = 400.0 / nyq
+            b, a = scipy.signal.butter(4, cutoff, btype='low')
+            return scipy.signal.filtfilt(b, a, self.y)
 
     # --- 3. Praat Features (Micro-Instabilities) ---
-    snd = parselmouth.Sound(temp_filtered_path)
-    
-    # Extract Pitch
-    pitch = snd.to_pitch()
-    pitch_values = pitch.selected_array['frequency']
-    pitch_values = pitch_values[pitch_values != 0] # remove unvoiced
-    f0_std = np.std(pitch_values) if len(pitch_values) > 0 else 0
-
-    # Jitter & Shimmer
-    pointProcess = call(snd, "To PointProcess (periodic, cc)", 60, 600)
-    try:
-        jitter = call(pointProcess, "Get jitter (local)", 0.00005, 0.02, 1.3) * 100
-    except:
-        jitter = 0.5
-
-    try:
-        shimmer = call([snd, pointProcess], "Get shimmer (local)", 0.00005, 0.02, 1.3, 1.6) * 100
-    except:
-        shimmer = 2.0
-
-    # HNR
-    try:
-        harmonicity = call(snd, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0)
-        hnr = call(harmonicity, "Get mean", 0, 0)
-    except:
-        hnr = 20.0
+    @cached_property
+    def snd(self):
+        with self.trace.stage("filter"):
+            # Built straight from the in-memory array: no temp file, safe across concurrent sessions
+            return parselmouth.Sound(self.y_filtered, sampling_frequency=self.sr)
+
+    @cached_property
+    def f0_std(self):
+        with self.trace.stage("pitch"):
+            # Extract Pitch
+            pitch = self.snd.to_pitch()
+            pitch_values = pitch.selected_array['frequency']
+            pitch_values = pitch_values[pitch_values != 0] # remove unvoiced
+            return float(np.std(pitch_values)) if len(pitch_values) > 0 else 0.0
+
+    @cached_property
+    def point_process(self):
+        with self.trace.stage("point_process"):
+            return call(self.snd, "To PointProcess (periodic, cc)", 60, 600)
+
+    @cached_property
+    def jitter(self):
+        with self.trace.stage("jitter_shimmer"):
+            # Jitter & Shimmer
+            try:
+                return float(call(self.point_process, "Get jitter (local)", 0.00005, 0.02, 1.3) * 100)
+            except:
+                return 0.5
+
+    @cached_property
+    def shimmer(self):
+        with self.trace.stage("jitter_shimmer"):
+            try:
+                return float(call([self.snd, self.point_process], "Get shimmer (local)", 0.00005, 0.02, 1.3, 1.6) * 100)
+            except:
+                return 2.0
+
+    @cached_property
+    def hnr(self):
+        with self.trace.stage("harmonicity"):
+            # HNR
+            try:
+                harmonicity = call(self.snd, "To Harmonicity (cc)", 0.01, 75, 0.1, 1.0)
+                return float(call(harmonicity, "Get mean", 0, 0))
+            except:
+                return 20.0
 
     # --- 4. Cepstral Peak Prominence (CPP) ---
-    # CPP is a highly reliable measure of breathiness and overall dysphonia
-    try:
-        # Praat's PowerCepstrum
-        power_cepstrum = call(snd, "To PowerCepstrum", 60, 0.002, 50, 0.05)
-        cpp = call(power_cepstrum, "Get peak prominence", 60, 333, "parabolic", 0.001, 0.05, "Exponential decay", "Robust")
-    except:
-        cpp = 15.0 # Baseline healthy
+    @cached_property
+    def cpp(self):
+        with self.trace.stage("cepstrum"):
+            # CPP is a highly reliable measure of breathiness and overall dysphonia
+            try:
+                # Praat's PowerCepstrum
+                power_cepstrum = call(self.snd, "To PowerCepstrum", 60, 0.002, 50, 0.05)
+                return float(call(power_cepstrum, "Get peak prominence", 60, 333, "parabolic", 0.001, 0.05, "Exponential decay", "Robust"))
+            except:
+                return 15.0 # Baseline healthy
 
     # --- 5. Formants (Neuropathy mapping) ---
-    snd_full = parselmouth.Sound(audio_path)
-    formants = call(snd_full, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
-    try:
-        f1_mean = call(formants, "Get mean", 1, 0, 0, "Hertz")
-        f2_mean = call(formants, "Get mean", 2, 0, 0, "Hertz")
-        f3_mean = call(formants, "Get mean", 3, 0, 0, "Hertz")
-    except:
-        f1_mean, f2_mean, f3_mean = 500.0, 1500.0, 2500.0
-
-    # Clean up
-    if os.path.exists(temp_filtered_path):
-        os.remove(temp_filtered_path)
-        
-    features = {
-        "task_type": task_type,
-        "jitter_percent": float(jitter),
-        "shimmer_percent": float(shimmer),
-        "hnr_db": float(hnr),
-        "f0_std": float(f0_std),
-        "f1_mean": float(f1_mean),
-        "f2_mean": float(f2_mean),
-        "f3_mean": float(f3_mean),
-        "cpp": float(cpp),
-        "spectral_centroid": float(np.mean(spectral_centroids)),
-        "spectral_rolloff": float(np.mean(spectral_rolloff)),
-        "spectral_flux": float(np.mean(spectral_flux)),
-        "zcr": float(np.mean(zcr)),
-        "chroma_mean": np.mean(chroma, axis=1).tolist(),
-        "mfcc_mean": mfcc_mean.tolist(),
-        "mfcc_delta_mean": mfcc_delta_mean.tolist(),
-        "mfcc_delta2_mean": mfcc_delta2_mean.tolist()
-    }
-    
-    # Hash
-    hash_payload = f"{jitter:.4f}:{shimmer:.4f}:{hnr:.4f}:{f0_std:.4f}"
-    features["vocal_twin_hash"] = hashlib.sha256(hash_payload.encode()).hexdigest()[:12].upper()
-    
+    @cached_property
+    def formant_means(self):
+        with self.trace.stage("formants"):
+            # Reuses the already-decoded signal instead of reading the file a second time
+            snd_full = parselmouth.Sound(self.y, sampling_frequency=self.sr)
+            formants = call(snd_full, "To Formant (burg)", 0.0, 5, 5500, 0.025, 50)
+            try:
+                return tuple(float(call(formants, "Get mean", i, 0, 0, "Hertz")) for i in (1, 2, 3))
+            except:
+                return 500.0, 1500.0, 2500.0
+
+    def vocal_twin_hash(self):
+        hash_payload = f"{self.jitter:.4f}:{self.shimmer:.4f}:{self.hnr:.4f}:{self.f0_std:.4f}"
+        return hashlib.sha256(hash_payload.encode()).hexdigest()[:12].upper()
+
+    def feature_thunks(self, task_type):
+        return {
+            "task_type": lambda: task_type,
+            "extraction_profile": lambda: self.profile,
+            "jitter_percent": lambda: self.jitter,
+            "shimmer_percent": lambda: self.shimmer,
+            "hnr_db": lambda: self.hnr,
+            "f0_std": lambda: self.f0_std,
+            "f1_mean": lambda: self.formant_means[0],
+            "f2_mean": lambda: self.formant_means[1],
+            "f3_mean": lambda: self.formant_means[2],
+            "cpp": lambda: self.cpp,
+            "spectral_centroid": self.spectral_centroid,
+            "spectral_rolloff": self.spectral_rolloff,
+            "spectral_flux": self.spectral_flux,
+            "zcr": self.zcr,
+            "chroma_mean": self.chroma_mean,
+            "mfcc_mean": self.mfcc_mean,
+            "mfcc_delta_mean": self.mfcc_delta_mean,
+            "mfcc_delta2_mean": self.mfcc_delta2_mean,
+            "vocal_twin_hash": self.vocal_twin_hash,
+        }
+
+def extract_features(audio, task_type="free_speech", return_graph=False, profile="full", lazy=False, trace=None, on_stage=None):
+    """
+    Extract research-grade acoustic biomarkers from audio.
+    Now includes advanced spectral features, MFCC deltas, and Cepstral Peak Prominence (CPP).
+    `audio` may be a path, bytes, a buffer or pre-decoded samples (see load_audio).
+    `profile` selects an EXTRACTION_PROFILES entry ("full" or "fast"). With lazy=True a
+    LazyFeatures mapping is returned and each feature is only computed when read.
+    Per-stage timings are recorded on `trace` / reported to `on_stage(stage, seconds)` if
+    given; they are kept out of the returned mapping so cached features hold only features.
+    With return_graph=True, also returns the spectral graph report (computed/reused intermediates).
+    """
+    trace = resolve_trace(trace, on_stage)
+    with profile_request("extract_features"):
+        with trace.stage("load_resample"):
+            y, sr = load_audio(audio)
+        extraction = AcousticExtraction(y, sr, profile=profile, trace=trace)
+        features = build_features(extraction, task_type, lazy=lazy)
+
+    if return_graph:
+        return features, extraction.graph.report()
     return features
+
+def build_features(extraction, task_type="free_speech", lazy=False):
+    """
+    Feature mapping over an existing AcousticExtraction (shares its decoded audio and stages).
+    """
+    features = LazyFeatures(extraction.feature_thunks(task_type))
+    return features if lazy else features.materialize()
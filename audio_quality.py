@@ -1,19 +1,35 @@
 import numpy as np
 import librosa
+from audio_analysis import load_audio
 
-def validate_audio_quality(audio_path):
+def validate_audio_quality(audio):
     """
     Validates audio recording quality before processing.
     Checks SNR, clipping, and Voice Activity (VAD).
+    `audio` may be a path, bytes, a buffer or pre-decoded samples (see load_audio).
     """
     try:
-        y, sr = librosa.load(audio_path, sr=48000)
+        y, sr = load_audio(audio)
     except Exception as e:
         return {"is_valid": False, "error": "Could not load audio file."}
 
+    return assess_audio_quality(y, sr)
+
+def frame_rms(y):
+    """
+    Frame-level RMS energy, computed once for the gate's silence and SNR checks.
+    """
+    return librosa.feature.rms(y=y)[0]
+
+def assess_audio_quality(y, sr, rms=None):
+    """
+    Runs the silence / clipping / SNR gate on already-decoded samples.
+    Pass precomputed `rms` frames to avoid recomputing them.
+    """
     # 1. Check for silence / Voice Activity (VAD proxy)
     # If the root mean square energy is extremely low, it's silence.
-    rms = librosa.feature.rms(y=y)[0]
+    if rms is None:
+        rms = frame_rms(y)
     mean_rms = np.mean(rms)
     if mean_rms < 0.001:
         return {"is_valid": False, "error": "Audio is too quiet or mostly silence. Please speak closer to the microphone."}
@@ -0,0 +1,219 @@
+import threading
+import time
+import numpy as np
+from scipy.stats import chi2
+from feature_store import feature_store
+
+# Core measures tracked per patient: feature key (audio_analysis) -> research store column
+BASELINE_FEATURES = {
+    "jitter_percent": "jitter",
+    "shimmer_percent": "shimmer",
+    "hnr_db": "hnr",
+    "f0_std": "f0_std",
+    "f1_mean": "f1_mean",
+    "f2_mean": "f2_mean",
+    "spectral_centroid": "spectral_centroid",
+    "cpp": "cpp",
+}
+BASELINE_LABELS = {
+    "jitter_percent": "Jitter",
+    "shimmer_percent": "Shimmer",
+    "hnr_db": "HNR",
+    "f0_std": "F0 Variance",
+    "f1_mean": "F1",
+    "f2_mean": "F2",
+    "spectral_centroid": "Spectral Centroid",
+    "cpp": "CPP",
+}
+FEATURE_KEYS = list(BASELINE_FEATURES)
+
+# EWMA half-life in scans: recent scans dominate, older sessions fade out
+DEFAULT_HALF_LIFE = 8
+# Scans needed before the multivariate test is trusted
+MIN_SCANS = 3
+# Floor on the baseline standard deviation as a fraction of the mean (scan-to-scan noise)
+MIN_CV = 0.05
+# Multivariate alert: chi-square tail probability of the diagonal Mahalanobis distance
+ALERT_P_VALUE = 0.01
+# Single-measure rule kept from the original tracker
+JITTER_DELTA_ALERT = 0.15
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS baselines (patient_hash TEXT PRIMARY KEY, n INTEGER NOT NULL, "
+    "mean BLOB NOT NULL, var BLOB NOT NULL, updated_at TEXT)",
+]
+_UPSERT = ("INSERT INTO baselines VALUES (?, ?, ?, ?, ?) ON CONFLICT(patient_hash) DO UPDATE SET "
+           "n = excluded.n, mean = excluded.mean, var = excluded.var, updated_at = excluded.updated_at")
+
+class PatientBaseline:
+    """
+    Rolling per-patient baseline over FEATURE_KEYS: scan count plus EWMA mean and
+    variance (exact running moments until the count reaches the EWMA horizon).
+    """
+
+    def __init__(self, patient_hash, n=0, mean=None, var=None, updated_at=None):
+        dim = len(FEATURE_KEYS)
+        self.patient_hash = patient_hash
+        self.n = int(n)
+        self.mean = np.zeros(dim) if mean is None else np.asarray(mean, dtype=np.float64)
+        self.var = np.zeros(dim) if var is None else np.asarray(var, dtype=np.float64)
+        self.updated_at = updated_at
+
+    def update(self, x, min_alpha, timestamp=None):
+        # Same exponentially weighted moment update as DriftMonitor.update, O(D)
+        self.n += 1
+        alpha = max(1.0 / self.n, min_alpha)
+        diff = x - self.mean
+        increment = alpha * diff
+        self.mean = self.mean + increment
+        self.var = (1.0 - alpha) * (self.var + diff * increment)
+        self.updated_at = timestamp
+
+    def std(self):
+        floor = MIN_CV * np.abs(self.mean)
+        return np.sqrt(np.maximum(self.var, floor * floor) + 1e-12)
+
+    def as_dict(self):
+        """
+        The {"n", "mean", "std"} form calculate_longitudinal_delta accepts.
+        """
+        std = self.std()
+        return {
+            "n": self.n,
+            "mean": {key: float(self.mean[i]) for i, key in enumerate(FEATURE_KEYS)},
+            "std": {key: float(std[i]) for i, key in enumerate(FEATURE_KEYS)},
+            "updated_at": self.updated_at,
+        }
+
+def feature_vector(features, fallback=None):
+    """
+    FEATURE_KEYS values of a features dict as a (D,) array; missing measures take the
+    `fallback` values (the baseline mean, or 0.0 as in the research records) or NaN.
+    """
+    x = np.array([features.get(key, np.nan) if features.get(key) is not None else np.nan for key in FEATURE_KEYS],
+                 dtype=np.float64)
+    if fallback is not None:
+        x = np.where(np.isnan(x), fallback, x)
+    return x
+
+def multivariate_delta(current_features, baseline):
+    """
+    Deviation of one scan from a baseline ({"n", "mean", "std"} dicts or a
+    PatientBaseline): per-feature z-scores and relative changes, plus the diagonal
+    Mahalanobis distance D^2 and its chi-square tail probability over the measured
+    features. O(D).
+    """
+    if isinstance(baseline, PatientBaseline):
+        baseline = baseline.as_dict()
+    mean = np.array([baseline["mean"].get(key, np.nan) for key in FEATURE_KEYS], dtype=np.float64)
+    std = np.array([baseline["std"].get(key, np.nan) for key in FEATURE_KEYS], dtype=np.float64)
+    x = feature_vector(current_features)
+    measured = ~(np.isnan(x) | np.isnan(mean) | np.isnan(std))
+    z = np.where(measured, (x - mean) / np.where(measured, std, 1.0), 0.0)
+    relative = np.where(measured & (mean != 0), (x - mean) / np.where(mean != 0, np.abs(mean), 1.0), 0.0)
+    distance = float(np.sum(z[measured] ** 2))
+    dof = int(measured.sum())
+    return {
+        "n_baseline_scans": int(baseline.get("n", 0)),
+        "distance": distance,
+        "p_value": float(chi2.sf(distance, dof)) if dof else 1.0,
+        "z_scores": {key: float(z[i]) for i, key in enumerate(FEATURE_KEYS) if measured[i]},
+        "relative_change": {key: float(relative[i]) for i, key in enumerate(FEATURE_KEYS) if measured[i]},
+    }
+
+class BaselineService:
+    """
+    Longitudinal Vocal Twin baselines keyed by the anonymized patient hash
+    (dataset_manager.anonymized_patient_hash), persisted as one fixed-size row per
+    patient in the feature store database.
+
+    Lookups are a single primary-key read, never a scan of the patient's history;
+    each new scan updates the EWMA moments in O(D) inside one transaction, so
+    concurrent sessions for the same patient do not lose updates.
+    """
+
+    def __init__(self, store=feature_store, half_life=DEFAULT_HALF_LIFE):
+        self.store = store
+        self.min_alpha = 1.0 - 0.5 ** (1.0 / half_life) if half_life else 0.0
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = self.store.connection()
+        if not self._initialized:
+            with self._lock:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._initialized = True
+        return conn
+
+    @staticmethod
+    def _from_row(row):
+        return PatientBaseline(row["patient_hash"], row["n"], np.frombuffer(row["mean"], dtype=np.float64),
+                               np.frombuffer(row["var"], dtype=np.float64), row["updated_at"])
+
+    def get(self, patient_hash):
+        """
+        The patient's PatientBaseline, or None before their first scan.
+        """
+        row = self._connect().execute("SELECT * FROM baselines WHERE patient_hash = ?", (patient_hash,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def update(self, patient_hash, features, timestamp=None):
+        """
+        Folds one scan into the patient's baseline and returns the updated baseline.
+        Measures missing from `features` are imputed with the baseline mean.
+        """
+        return self.observe(patient_hash, features, timestamp)[1]
+
+    def observe(self, patient_hash, features, timestamp=None):
+        """
+        Compares a new scan with the patient's current baseline, then folds it in.
+        Returns (baseline before the scan or None, baseline after it).
+        """
+        conn = self._connect()
+        timestamp = timestamp or time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT * FROM baselines WHERE patient_hash = ?", (patient_hash,)).fetchone()
+            before = self._from_row(row) if row else None
+            after = self._from_row(row) if row else PatientBaseline(patient_hash)
+            x = feature_vector(features, after.mean if after.n else 0.0)
+            after.update(x, self.min_alpha, timestamp)
+            conn.execute(_UPSERT, (patient_hash, after.n, after.mean.tobytes(), after.var.tobytes(), after.updated_at))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return before, after
+
+    def rebuild(self, chunk_size=50000):
+        """
+        Recomputes the baselines of every patient with research records, in insertion
+        order, and upserts them in one transaction. Baselines of patients with no stored
+        records (online scans only) are left as they are. Returns the number of patients.
+        """
+        baselines = {}
+        for records in self.store.iter_records(chunk_size=chunk_size):
+            for record in records:
+                patient = record["vocal_twin_hash"]
+                baseline = baselines.get(patient)
+                if baseline is None:
+                    baseline = baselines[patient] = PatientBaseline(patient)
+                features = {key: record.get(column) for key, column in BASELINE_FEATURES.items()}
+                x = feature_vector(features, baseline.mean if baseline.n else 0.0)
+                baseline.update(x, self.min_alpha, record.get("timestamp"))
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(_UPSERT, [
+                (b.patient_hash, b.n, b.mean.tobytes(), b.var.tobytes(), b.updated_at) for b in baselines.values()
+            ])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return len(baselines)
+
+# Singleton instance
+baseline_service = BaselineService()
@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from audio_analysis import extract_features, load_audio, TARGET_SR
+from profiling import PipelineTrace
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3", ".m4a")
+
+def _warm_up_worker():
+    """
+    Process-pool initializer: imports librosa/parselmouth and runs one short extraction
+    so numba JIT compilation and Praat start-up are paid once per worker, not per file.
+    """
+    import librosa  # noqa: F401
+    import parselmouth  # noqa: F401
+    t = np.arange(int(0.5 * TARGET_SR)) / TARGET_SR
+    tone = (0.3 * np.sin(2 * np.pi * 150 * t)).astype(np.float32)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            extract_features(tone)
+        except Exception:
+            pass
+
+def _extract_chunk(paths, task_type):
+    results = []
+    for path in paths:
+        timings = {}
+        start = time.perf_counter()
+        try:
+            audio = load_audio(path)
+            timings["load"] = time.perf_counter() - start
+            trace = PipelineTrace()
+            features = extract_features(audio, task_type=task_type, trace=trace)
+            # Fine-grained extraction stages (spectral, pitch, formants, ...) from the pipeline trace
+            for stage in trace.as_dict()["stages"]:
+                timings[stage["stage"]] = timings.get(stage["stage"], 0.0) + stage["ms"] / 1000
+            results.append({"path": path, "ok": True, "features": features, "timings": timings})
+        except Exception as e:
+            timings["failed"] = time.perf_counter() - start
+            results.append({"path": path, "ok": False, "error": f"{type(e).__name__}: {e}", "timings": timings})
+    return results
+
+class BatchStats:
+    """
+    Accumulates per-file outcomes and stage timings for a batch run.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.succeeded = 0
+        self.failed = 0
+        self.stage_seconds = {}
+
+    def record(self, result):
+        if result["ok"]:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        for stage, seconds in result.get("timings", {}).items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+    def summary(self):
+        wall = (self.finished or time.perf_counter()) - self.started
+        files = self.succeeded + self.failed
+        return {
+            "files": files,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_sec": round(wall, 3),
+            "files_per_sec": round(files / wall, 3) if wall > 0 else 0.0,
+            "stage_sec": {k: round(v, 3) for k, v in self.stage_seconds.items()},
+            "stage_mean_ms": {k: round(1000 * v / max(1, files), 2) for k, v in self.stage_seconds.items()}
+        }
+
+def extract_features_batch(paths, workers=None, chunksize=8, task_type="free_speech", stats=None):
+    """
+    Extracts features for many recordings across a process pool.
+    Paths are scheduled in chunks of `chunksize` and results are yielded as each chunk
+    completes (so output order is not input order). A failing file yields an
+    {"ok": False, "error": ...} record instead of aborting the batch. Pass a BatchStats
+    to collect the throughput summary.
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    chunks = [paths[i:i + chunksize] for i in range(0, len(paths), chunksize)]
+
+    if workers == 1:
+        _warm_up_worker()
+        for chunk in chunks:
+            for result in _extract_chunk(chunk, task_type):
+                if stats is not None:
+                    stats.record(result)
+                yield result
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_up_worker) as executor:
+            futures = {executor.submit(_extract_chunk, chunk, task_type): chunk for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    # Worker crashed (e.g. killed by the OS): report the whole chunk as failed
+                    chunk_results = [
+                        {"path": path, "ok": False, "error": f"{type(e).__name__}: {e}", "timings": {}}
+                        for path in futures[future]
+                    ]
+                for result in chunk_results:
+                    if stats is not None:
+                        stats.record(result)
+                    yield result
+
+    if stats is not None:
+        stats.finished = time.perf_counter()
+
+def _expand_paths(inputs):
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                for name in sorted(files):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield item
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch acoustic feature extraction for archived research recordings.")
+    parser.add_argument("inputs", nargs="+", help="Audio files or directories (searched recursively)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=8, help="Files per scheduled task")
+    parser.add_argument("--task-type", default="free_speech")
+    parser.add_argument("--output", default="-", help="JSON-lines output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    stats = BatchStats()
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for result in extract_features_batch(_expand_paths(args.inputs), workers=args.workers,
+                                             chunksize=args.chunksize, task_type=args.task_type, stats=stats):
+            out.write(json.dumps(result) + "\n")
+            if not result["ok"]:
+                print(f"[FAILED] {result['path']}: {result['error']}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(json.dumps(stats.summary(), indent=2), file=sys.stderr)
+    return 0 if stats.failed == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""
+Reproducible performance benchmarks for the Nuros analysis pipeline.
+Run: python -m benchmarks.run_benchmarks --output results.json [--baseline baseline.json]
+"""
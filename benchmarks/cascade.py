@@ -0,0 +1,84 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import measure
+from benchmarks.training import write_synthetic_dataset
+
+def _held_out_matrix(ensemble_pipeline, path):
+    from training import fuse_rows, parse_label
+    with open(path, newline="") as f:
+        rows = [row for row in csv.DictReader(f) if parse_label(row["clinical_label"]) is not None]
+    return fuse_rows(rows, ensemble_pipeline)
+
+def run(train_rows=3000, test_rows=2000, bands=((0.2, 0.8), (0.3, 0.7), (0.4, 0.6)), iterations=None, seed=0):
+    """
+    Trains on one synthetic dataset and scores a held-out one in single_pass and cascade
+    mode. Reports per-scan latency, the share of scans settled by the screen, and how
+    often the cascade's decision (score >= 50) or score differs from the full ensemble.
+    """
+    from training import train_from_dataset
+
+    workdir = tempfile.mkdtemp(prefix="nuros_cascade_bench_")
+    train_path = write_synthetic_dataset(os.path.join(workdir, "train.csv"), train_rows, seed)
+    test_path = write_synthetic_dataset(os.path.join(workdir, "test.csv"), test_rows, seed + 1)
+    ensemble_pipeline, report = train_from_dataset(train_path, version="bench", directory=os.path.join(workdir, "models"))
+    X = _held_out_matrix(ensemble_pipeline, test_path)
+    iterations = iterations or len(X)
+
+    ensemble_pipeline.scoring_mode = "single_pass"
+    full = ensemble_pipeline.predict_signal_batch(X)["calibrated_score"]
+    rows = iter(np.tile(X, (2, 1)))
+    full_latency = measure(lambda: ensemble_pipeline.predict_signal_batch(next(rows)[None, :]), iterations)
+
+    results = {
+        "train_rows": report["rows_labeled"],
+        "held_out_rows": len(X),
+        "screen_fit": ensemble_pipeline.active_model().screen.fit_stats,
+        "single_pass": full_latency,
+        "cascade": {},
+    }
+    ensemble_pipeline.scoring_mode = "cascade"
+    for band in bands:
+        ensemble_pipeline.cascade_band = band
+        out = ensemble_pipeline.predict_signal_batch(X)
+        screened = np.array(out["inference_path"]) == "screen"
+        rows = iter(np.tile(X, (2, 1)))
+        latency = measure(lambda: ensemble_pipeline.predict_signal_batch(next(rows)[None, :]), iterations)
+        results["cascade"][f"{band[0]:.2f}-{band[1]:.2f}"] = {
+            "screened_fraction": float(screened.mean()),
+            "decision_disagreement_rate": float(np.mean((out["calibrated_score"] >= 50) != (full >= 50))),
+            "mean_abs_score_diff": float(np.mean(np.abs(out["calibrated_score"] - full))),
+            "latency": latency,
+            "mean_latency_saved_ms": round(full_latency["mean_ms"] - latency["mean_ms"], 3),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cascade (screen + ensemble) latency and disagreement on a held-out set.")
+    parser.add_argument("--train-rows", type=int, default=3000)
+    parser.add_argument("--test-rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=None, help="Single-scan calls timed per mode (default: held-out size)")
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.train_rows, args.test_rows, iterations=args.iterations)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    for band, row in results["cascade"].items():
+        print(f"band {band}: {row['screened_fraction']:.1%} screened, saved {row['mean_latency_saved_ms']} ms/scan, "
+              f"{row['decision_disagreement_rate']:.2%} decisions differ", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def write_longitudinal_store(path, patients=2000, max_scans=40, shifted_fraction=0.3, shift=0.2, cv=0.1, seed=0):
+    """
+    Feature store of synthetic scan histories: each patient has a stable voice with
+    `cv` scan-to-scan noise, and a `shifted_fraction` of them get a sustained +`shift`
+    relative change in jitter, shimmer and HNR from a random scan on. Returns
+    (store, {patient_hash: first shifted scan index or None}).
+    """
+    from feature_store import FeatureStore
+    from baseline_service import BASELINE_FEATURES
+
+    rng = np.random.default_rng(seed)
+    columns = list(BASELINE_FEATURES.values())
+    base = np.array([0.6, 2.5, 20.0, 18.0, 520.0, 1500.0, 1100.0, 15.0])
+    lengths = rng.integers(1, max_scans + 1, patients)
+    onsets = np.where(rng.random(patients) < shifted_fraction, rng.integers(8, max_scans, patients), max_scans)
+    records = []
+    for t in range(max_scans):
+        for p in np.flatnonzero(lengths > t):
+            x = base * (1 + rng.normal(0, cv, len(base)))
+            if t >= onsets[p]:
+                x[:3] *= 1 + shift
+            records.append({"timestamp": f"2026-01-01T00:00:{t:02d}", "vocal_twin_hash": f"patient{p:06d}",
+                            **dict(zip(columns, x))})
+    store = FeatureStore(path)
+    store.append_many(records)
+    truth = {f"patient{p:06d}": int(onsets[p]) if onsets[p] < lengths[p] else None for p in range(patients)}
+    return store, truth
+
+def run(patients=2000, max_scans=40, online_patients=200, seed=0):
+    """
+    Backfill throughput (vectorized across patients) vs online per-scan updates, plus
+    detection recall/delay on shifted patients and false-alarm rate on stable ones.
+    """
+    from change_detection import ChangeDetector
+    from feature_store import FeatureStore
+    from baseline_service import BASELINE_FEATURES
+
+    workdir = tempfile.mkdtemp(prefix="nuros_change_bench_")
+    store, truth = write_longitudinal_store(os.path.join(workdir, "features.db"), patients, max_scans, seed=seed)
+    summary = ChangeDetector(store).backfill()
+
+    first_alert = {}
+    for alert in summary["alerts"]:
+        first_alert.setdefault(alert["patient_hash"], alert["scan"] - 1)
+    shifted = [p for p, onset in truth.items() if onset is not None]
+    stable = [p for p, onset in truth.items() if onset is None]
+    delays = [first_alert[p] - truth[p] for p in shifted if first_alert.get(p, -1) >= truth[p]]
+
+    online = ChangeDetector(FeatureStore(os.path.join(workdir, "online.db")))
+    selected = set(sorted(truth)[:online_patients])
+    n_scans = 0
+    start = time.perf_counter()
+    for records in store.iter_records():
+        for record in records:
+            if record["vocal_twin_hash"] in selected:
+                online.update(record["vocal_twin_hash"], {key: record[column] for key, column in BASELINE_FEATURES.items()},
+                              record["timestamp"], record["id"])
+                n_scans += 1
+    online_sec = time.perf_counter() - start
+
+    return {
+        "records": summary["records"],
+        "patients": summary["patients"],
+        "backfill": {"load_sec": summary["load_sec"], "replay_sec": summary["replay_sec"],
+                     "scans_per_sec": round(summary["records"] / max(summary["replay_sec"], 1e-9))},
+        "online_update_ms": round(1000 * online_sec / max(n_scans, 1), 3),
+        "shifted_patients": len(shifted),
+        "recall": len(delays) / max(len(shifted), 1),
+        "median_delay_scans": float(np.median(delays)) if delays else None,
+        "stable_patients_with_false_alarm": sum(p in first_alert for p in stable) / max(len(stable), 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Change-point detection: backfill throughput and detection quality.")
+    parser.add_argument("--patients", type=int, default=2000)
+    parser.add_argument("--max-scans", type=int, default=40)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.patients, args.max_scans)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(f"backfill {results['backfill']['scans_per_sec']} scans/s vs online {results['online_update_ms']} ms/scan; "
+          f"recall {results['recall']:.1%}, median delay {results['median_delay_scans']} scans", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
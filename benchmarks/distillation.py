@@ -0,0 +1,84 @@
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import measure
+from benchmarks.training import write_synthetic_dataset
+from benchmarks.cascade import _held_out_matrix
+
+def _pickled_bytes(obj):
+    buffer = io.BytesIO()
+    joblib.dump(obj, buffer)
+    return buffer.tell()
+
+def run(train_rows=3000, test_rows=2000, iterations=500, seed=0):
+    """
+    Teacher (calibrated ensemble) vs distilled student on a held-out synthetic set:
+    per-scan latency, model memory, and agreement of the calibrated scores.
+    """
+    from training import train_from_dataset
+    from distillation import student_agreement
+
+    workdir = tempfile.mkdtemp(prefix="nuros_distill_bench_")
+    train_path = write_synthetic_dataset(os.path.join(workdir, "train.csv"), train_rows, seed)
+    test_path = write_synthetic_dataset(os.path.join(workdir, "test.csv"), test_rows, seed + 1)
+    ensemble_pipeline, report = train_from_dataset(train_path, version="bench", directory=os.path.join(workdir, "models"),
+                                                   distill=True)
+    snapshot = ensemble_pipeline.active_model()
+    engine, student = snapshot.engine, snapshot.student
+    X = _held_out_matrix(ensemble_pipeline, test_path)
+    X_scaled = snapshot.transform(X)
+    x = X_scaled[:1]
+
+    results = {"train_rows": report["rows_labeled"], "held_out_rows": len(X), "student_fit": student.fit_stats}
+    results["agreement"] = student_agreement(student.predict_proba(X_scaled),
+                                             engine.calibrate(engine.member_probabilities(X_scaled))[0])
+    results["memory_bytes"] = {
+        "teacher_sklearn_pickle": _pickled_bytes(snapshot.calibrated_model),
+        "teacher_compiled_arrays": int(sum(np.asarray(a).nbytes for a in engine.arrays.values())),
+        "student_arrays": student.nbytes,
+    }
+    results["model_latency"] = {
+        "teacher_compiled": measure(lambda: engine.calibrate(engine.member_probabilities(x)), iterations),
+        "student": measure(lambda: student.predict_proba(x), iterations),
+    }
+
+    scans = {}
+    for mode in ("single_pass", "distilled"):
+        ensemble_pipeline.scoring_mode = mode
+        rows = iter(np.tile(X, (2, 1)))
+        scans[mode] = measure(lambda: ensemble_pipeline.predict_signal_batch(next(rows)[None, :]), iterations)
+    results["scan_latency"] = scans
+    results["scan_latency_saved_ms"] = round(scans["single_pass"]["mean_ms"] - scans["distilled"]["mean_ms"], 3)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distilled student vs ensemble teacher: latency, memory, agreement.")
+    parser.add_argument("--train-rows", type=int, default=3000)
+    parser.add_argument("--test-rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.train_rows, args.test_rows, args.iterations)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    agreement = results["agreement"]
+    print(f"student: {agreement['decision_agreement']:.2%} decision agreement, mean |diff| {agreement['mean_abs_diff']:.4f}; "
+          f"{results['memory_bytes']['student_arrays']} vs {results['memory_bytes']['teacher_compiled_arrays']} bytes; "
+          f"saved {results['scan_latency_saved_ms']} ms/scan", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
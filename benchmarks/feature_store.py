@@ -0,0 +1,121 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import measure
+from benchmarks.training import write_synthetic_dataset
+
+def _record(i, n_patients, rng):
+    return {
+        "timestamp": f"2026-{1 + i % 12:02d}-{1 + i % 28:02d}T{i % 24:02d}:00:00.{i:06d}",
+        "vocal_twin_hash": f"{int(rng.integers(0, n_patients)):016x}",
+        "jitter": float(rng.gamma(2.0, 0.4)),
+        "shimmer": float(rng.gamma(3.0, 1.0)),
+        "clinical_label": "PENDING_VALIDATION",
+    }
+
+def run(rows=50000, patients=2000, writers=8, writes_per_writer=250, iterations=1000, seed=0):
+    """
+    Feature store vs the legacy CSV: bulk import, single-record appends and write-behind
+    enqueues, concurrent group-committed appends from several threads, and longitudinal
+    per-patient queries (which on the CSV means parsing the whole file).
+    """
+    from feature_store import FeatureStore
+    from dataset_manager import DATASET_HEADER
+    from write_behind import WriteBehindQueue
+
+    workdir = tempfile.mkdtemp(prefix="nuros_store_bench_")
+    csv_path = write_synthetic_dataset(os.path.join(workdir, "dataset.csv"), rows, seed)
+    store = FeatureStore(os.path.join(workdir, "features.db"))
+    rng = np.random.default_rng(seed)
+
+    start = time.perf_counter()
+    store.import_csv(csv_path)
+    results = {"rows": rows, "import_sec": round(time.perf_counter() - start, 3)}
+
+    counter = iter(range(10 ** 9))
+
+    def csv_append():
+        record = _record(next(counter), patients, rng)
+        with open(csv_path, "a", newline="") as f:
+            csv.writer(f).writerow([record.get(column, "") for column in DATASET_HEADER])
+
+    results["append_latency"] = {
+        "csv": measure(csv_append, iterations),
+        "store": measure(lambda: store.append(_record(next(counter), patients, rng)), iterations),
+    }
+    writer = WriteBehindQueue(store, spool_path=os.path.join(workdir, "features.spool"))
+    writer.start()
+    results["append_latency"]["write_behind_enqueue"] = measure(
+        lambda: writer.enqueue(_record(next(counter), patients, rng)), iterations)
+    start = time.perf_counter()
+    writer.close()
+    results["write_behind"] = dict(writer.metrics(), close_sec=round(time.perf_counter() - start, 3))
+
+    before = dict(store.stats)
+
+    def write(k):
+        local_rng = np.random.default_rng(seed + k)
+        for i in range(writes_per_writer):
+            store.append(_record(k * writes_per_writer + i, patients, local_rng))
+
+    threads = [threading.Thread(target=write, args=(k,)) for k in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    transactions = store.stats["transactions"] - before["transactions"]
+    results["concurrent_appends"] = {
+        "writers": writers,
+        "rows": writers * writes_per_writer,
+        "rows_per_sec": round(writers * writes_per_writer / wall, 1),
+        "transactions": transactions,
+        "mean_group_size": round(writers * writes_per_writer / max(transactions, 1), 2),
+    }
+
+    with open(csv_path, newline="") as f:
+        patient = next(csv.DictReader(f))["vocal_twin_hash"]
+
+    def csv_history():
+        with open(csv_path, newline="") as f:
+            return [row for row in csv.DictReader(f) if row["vocal_twin_hash"] == patient]
+
+    results["history_latency"] = {
+        "csv_full_scan": measure(csv_history, max(iterations // 100, 5)),
+        "store_indexed": measure(lambda: store.patient_history(patient), iterations),
+    }
+    results["records"] = store.count()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="SQLite feature store vs append-only CSV: writes and longitudinal queries.")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, writers=args.writers, iterations=args.iterations)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    history = results["history_latency"]
+    print(f"history query: {history['store_indexed']['mean_ms']} ms indexed vs {history['csv_full_scan']['mean_ms']} ms CSV scan; "
+          f"{results['concurrent_appends']['rows_per_sec']} concurrent appends/s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
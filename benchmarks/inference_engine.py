@@ -0,0 +1,59 @@
+import argparse
+import json
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import measure
+
+def run(n_rows=2000, iterations=200, seed=0):
+    """
+    Parity and latency of the compiled NumPy engine against the sklearn ensemble.
+    """
+    from ml_pipeline import pipeline, FEATURE_SCHEMA
+    from inference_engine import parity_check
+
+    engine = pipeline.export_engine()
+    rng = np.random.default_rng(seed)
+    X = rng.normal(pipeline.scaler.mean_, pipeline.scaler.scale_ * 1.5, size=(n_rows, len(FEATURE_SCHEMA)))
+    x = X[:1]
+
+    def sklearn_single():
+        pipeline.calibrated_model.predict_proba(pipeline.scaler.transform(x))
+
+    def sklearn_batch():
+        pipeline.calibrated_model.predict_proba(pipeline.scaler.transform(X))
+
+    max_abs_diff = parity_check(pipeline, engine, X)
+    return {
+        "parity_max_abs_diff": max_abs_diff,
+        "parity_ok": max_abs_diff < 1e-9,
+        "rows": n_rows,
+        "sklearn_single": measure(sklearn_single, iterations),
+        "engine_single": measure(lambda: engine.predict_proba(x), iterations),
+        "sklearn_batch": measure(sklearn_batch, max(1, iterations // 20)),
+        "engine_batch": measure(lambda: engine.predict_proba(X), max(1, iterations // 20)),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compiled inference engine parity + latency benchmark.")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, args.iterations)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    print(f"parity max |diff| = {results['parity_max_abs_diff']:.3e}; single-row p50: sklearn "
+          f"{results['sklearn_single']['p50_ms']} ms vs engine {results['engine_single']['p50_ms']} ms", file=sys.stderr)
+    return 0 if results["parity_ok"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
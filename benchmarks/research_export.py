@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import measure
+from benchmarks.training import write_synthetic_dataset
+
+def run(rows=200000, months=12, iterations=10, seed=0):
+    """
+    Cohort statistic (mean jitter/shimmer per gender for one month and task) computed
+    by loading the CSV into pandas vs scanning the partitioned Parquet export with
+    column projection and partition pruning. Also times a full and an incremental export.
+    """
+    import pandas as pd
+    import pyarrow.dataset as ds
+    from feature_store import FeatureStore
+    from research_export import export_dataset, open_dataset
+
+    workdir = tempfile.mkdtemp(prefix="nuros_export_bench_")
+    rng = np.random.default_rng(seed)
+    csv_path = write_synthetic_dataset(os.path.join(workdir, "dataset.csv"), rows, seed)
+    frame = pd.read_csv(csv_path)
+    month_index = rng.integers(0, months, rows)
+    frame["timestamp"] = [f"2025-{1 + m:02d}-15T12:00:00" for m in month_index]
+    frame.to_csv(csv_path, index=False)
+
+    store = FeatureStore(os.path.join(workdir, "features.db"))
+    store.import_csv(csv_path)
+    out_dir = os.path.join(workdir, "parquet")
+    results = {"rows": rows, "full_export": export_dataset(store, out_dir, incremental=False)}
+    store.append_many([{"timestamp": "2025-12-31T00:00:00", "vocal_twin_hash": f"new{i}", "task_type": "Free Speech"}
+                       for i in range(1000)])
+    results["incremental_export"] = export_dataset(store, out_dir)
+
+    def csv_cohort():
+        df = pd.read_csv(csv_path)
+        df = df[(df["timestamp"].str.startswith("2025-03")) & (df["task_type"] == "Sustained Vowel")]
+        return df.groupby("gender")[["jitter", "shimmer"]].mean()
+
+    def parquet_cohort():
+        table = open_dataset(out_dir).to_table(
+            columns=["gender", "jitter", "shimmer"],
+            filter=(ds.field("month") == "2025-03") & (ds.field("task_type") == "Sustained Vowel"))
+        return table.group_by("gender").aggregate([("jitter", "mean"), ("shimmer", "mean")])
+
+    expected = csv_cohort()
+    got = {row["gender"]: row["jitter_mean"] for row in parquet_cohort().to_pylist()}
+    results["max_abs_diff"] = max(abs(expected.loc[g, "jitter"] - got[g]) for g in got)
+    results["cohort_query"] = {
+        "csv_pandas": measure(csv_cohort, iterations),
+        "parquet_pruned": measure(parquet_cohort, iterations),
+    }
+    results["bytes"] = {
+        "csv": os.path.getsize(csv_path),
+        "parquet": sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(out_dir)
+                       for name in names if name.endswith(".parquet")),
+    }
+    results["rows_exported"] = open_dataset(out_dir).count_rows()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cohort query latency: pandas over the CSV vs the Parquet export.")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--output", default="-")
+    args = parser.parse_args(argv)
+
+    results = run(args.rows, iterations=args.iterations)
+    text = json.dumps(results, indent=2, default=float)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w") as f:
+            f.write(text)
+    query = results["cohort_query"]
+    print(f"cohort query: {query['parquet_pruned']['mean_ms']} ms Parquet vs {query['csv_pandas']['mean_ms']} ms CSV; "
+          f"{results['bytes']['parquet']} vs {results['bytes']['csv']} bytes", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
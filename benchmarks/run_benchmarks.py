@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic_voice import synthesize_wav_bytes
+
+def measure(fn, iterations, warmup=1):
+    """
+    Runs `fn` warmup + iterations times and returns latency percentiles and throughput.
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    wall = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {
+        "iterations": iterations,
+        "mean_ms": round(float(np.mean(ms)), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(np.max(ms)), 3),
+        "throughput_per_sec": round(iterations / wall, 3) if wall > 0 else 0.0
+    }
+
+def _report_inputs(features, analysis):
+    # generate_report renders a condition -> {modality: {"risk": ...}} table
+    risk_level = {"Flagged": "High", "Elevated": "Medium", "High": "High", "Moderate": "Medium"}
+    risk_data = {"Acoustic Signals": {}}
+    explanations = {"Acoustic Signals": {}}
+    for signal, value in analysis["disease_risks"].items():
+        risk_data["Acoustic Signals"][signal] = {"risk": risk_level.get(value, "Low"), "confidence": 90.0}
+        explanations["Acoustic Signals"][signal] = analysis["explanations"][signal]
+    return risk_data, explanations
+
+def run_suite(iterations=10, duration=3.0, seed=0, only=None):
+    """
+    Benchmarks each pipeline stage on a synthetic recording. Returns the results dict.
+    """
+    from audio_analysis import extract_features, load_audio
+    from audio_quality import validate_audio_quality
+    from ml_pipeline import pipeline
+    from risk_scoring import calculate_risk
+    from report_agent import generate_report, encrypt_pdf
+
+    voice = dict(duration=duration, f0=190.0, jitter_percent=0.8, shimmer_percent=3.0, noise_db=-30.0, seed=seed)
+    wav_bytes = synthesize_wav_bytes(**voice)
+    audio = load_audio(wav_bytes)
+    features = extract_features(audio)
+    if not pipeline.is_trained:
+        pipeline.train_mock_model()
+    analysis = calculate_risk(features, "benchmark.wav")
+    risk_data, explanations = _report_inputs(features, analysis)
+    workdir = tempfile.mkdtemp(prefix="nuros_bench_")
+    report_path = os.path.join(workdir, "bench_report.pdf")
+
+    def report_and_encrypt():
+        raw_pdf = generate_report("PAT-BENCH", "2026-01-01 00:00:00", analysis["stability_score"], risk_data,
+                                  explanations, features=features, output_filename=report_path)
+        encrypt_pdf(raw_pdf, "NR-0000-X")
+
+    cases = {
+        "validate_audio_quality": (lambda: validate_audio_quality(wav_bytes), iterations),
+        "extract_features": (lambda: extract_features(audio), iterations),
+        "predict_signal": (lambda: pipeline.predict_signal(features, "benchmark.wav"), iterations * 10),
+        "calculate_risk": (lambda: calculate_risk(features, "benchmark.wav"), iterations * 10),
+        "generate_report_encrypt_pdf": (report_and_encrypt, max(1, iterations // 2)),
+    }
+
+    results = {}
+    for name, (fn, n) in cases.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(fn, n)
+        print(f"{name:32s} p50={results[name]['p50_ms']:10.3f} ms  p99={results[name]['p99_ms']:10.3f} ms  "
+              f"{results[name]['throughput_per_sec']:8.2f}/s", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": iterations,
+            "synthetic_voice": voice
+        },
+        "results": results
+    }
+
+def compare_to_baseline(current, baseline, tolerance=0.15):
+    """
+    Flags any benchmark whose p50 latency regressed by more than `tolerance` (fractional).
+    """
+    comparison = {}
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("p50_ms"):
+            continue
+        ratio = result["p50_ms"] / base["p50_ms"]
+        comparison[name] = {
+            "baseline_p50_ms": base["p50_ms"],
+            "current_p50_ms": result["p50_ms"],
+            "ratio": round(ratio, 3),
+            "regressed": ratio > 1 + tolerance
+        }
+    return comparison
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Nuros pipeline latency/throughput benchmarks on synthetic voices.")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=3.0, help="Synthetic recording length (seconds)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="Run only these benchmark names")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Stored results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p50 slowdown before flagging")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.iterations, args.duration, args.seed, args.only)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            current["comparison"] = compare_to_baseline(current, json.load(f), args.tolerance)
+        for name, row in current["comparison"].items():
+            flag = "REGRESSION" if row["regressed"] else "ok"
+            print(f"{name:32s} x{row['ratio']:.3f} vs baseline  {flag}", file=sys.stderr)
+            if row["regressed"]:
+                exit_code = 1
+
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+import io
+import numpy as np
+import scipy.signal
+import soundfile as sf
+
+DEFAULT_FORMANTS = ((700.0, 90.0), (1220.0, 110.0), (2600.0, 160.0))
+
+def rosenberg_pulse(n_samples, open_quotient=0.6, closing_quotient=0.4):
+    """
+    One period of a Rosenberg glottal flow pulse (rising opening phase, falling closing phase).
+    """
+    pulse = np.zeros(n_samples)
+    n_open = max(1, int(open_quotient * n_samples))
+    n_close = max(1, int(closing_quotient * n_open))
+    n_rise = n_open - n_close
+    if n_rise > 0:
+        pulse[:n_rise] = 0.5 * (1 - np.cos(np.pi * np.arange(n_rise) / n_rise))
+    pulse[n_rise:n_open] = np.cos(0.5 * np.pi * np.arange(n_close) / n_close)
+    return pulse
+
+def synthesize_voice(duration=3.0, f0=180.0, jitter_percent=0.5, shimmer_percent=2.0, noise_db=-35.0,
+                     sr=48000, formants=DEFAULT_FORMANTS, vibrato_hz=0.0, lead_silence=0.3, seed=0):
+    """
+    Generates a sustained synthetic vowel from a glottal pulse train.
+
+    Each cycle's period is perturbed by `jitter_percent` and its amplitude by
+    `shimmer_percent` (both as relative standard deviations, matching the local
+    jitter/shimmer definitions). The source is shaped by a cascade of formant
+    resonators and mixed with white noise at `noise_db` relative to the voiced RMS.
+    `lead_silence` seconds of near-silence on each side let the SNR gate see a noise floor.
+    Returns (y, sr) with y as float32.
+    """
+    rng = np.random.default_rng(seed)
+    n_voiced = int(duration * sr)
+    source = np.zeros(n_voiced + sr // 10)
+
+    position = 0
+    t = 0.0
+    while position < n_voiced:
+        cycle_f0 = f0 * (1 + 0.02 * np.sin(2 * np.pi * vibrato_hz * t)) if vibrato_hz else f0
+        period = (1.0 / cycle_f0) * (1 + rng.normal(0, jitter_percent / 100))
+        n_period = max(8, int(round(period * sr)))
+        amplitude = max(0.0, 1 + rng.normal(0, shimmer_percent / 100))
+        pulse = rosenberg_pulse(n_period)
+        end = min(position + n_period, len(source))
+        source[position:end] += amplitude * pulse[:end - position]
+        position += n_period
+        t += n_period / sr
+    source = source[:n_voiced]
+
+    # Glottal flow derivative excites the vocal tract
+    voiced = np.diff(source, prepend=0.0)
+    for frequency, bandwidth in formants:
+        r = np.exp(-np.pi * bandwidth / sr)
+        theta = 2 * np.pi * frequency / sr
+        voiced = scipy.signal.lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], voiced)
+
+    voiced *= 0.3 / (np.max(np.abs(voiced)) + 1e-12)
+    voiced_rms = np.sqrt(np.mean(voiced ** 2))
+    noise_rms = voiced_rms * 10 ** (noise_db / 20)
+
+    n_silence = int(lead_silence * sr)
+    y = np.concatenate([np.zeros(n_silence), voiced, np.zeros(n_silence)])
+    y += rng.normal(0, noise_rms, len(y))
+    return np.clip(y, -1.0, 1.0).astype(np.float32), sr
+
+def synthesize_wav_bytes(**kwargs):
+    """
+    Same as synthesize_voice, encoded as 16-bit PCM WAV bytes (what the app receives from an upload).
+    """
+    y, sr = synthesize_voice(**kwargs)
+    buffer = io.BytesIO()
+    sf.write(buffer, y, sr, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
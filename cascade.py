@@ -0,0 +1,72 @@
+import numpy as np
+from inference_engine import _sigmoid
+
+# Screen probabilities inside [low, high] are ambiguous and go on to the full ensemble
+DEFAULT_AMBIGUITY_BAND = (0.2, 0.8)
+
+class LinearScreen:
+    """
+    Cheap first stage of the cascade: one linear model over the scaled fused vector
+    (the fold-averaged LR member) followed by a Platt sigmoid fitted so its output
+    tracks the full ensemble's calibrated probability.
+    """
+
+    def __init__(self, coef, intercept, a=1.0, b=0.0, fit_stats=None):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.a = float(a)
+        self.b = float(b)
+        self.fit_stats = fit_stats or {}
+
+    def logit(self, X_scaled):
+        return X_scaled @ self.coef + self.intercept
+
+    def predict_proba(self, X_scaled):
+        return _sigmoid(self.a * self.logit(X_scaled) + self.b)
+
+    def explain(self, X_scaled):
+        """
+        Exact linear attributions (N, D) in probability units, comparable to AttributionEngine's.
+        """
+        p = self.predict_proba(X_scaled)
+        return (self.a * p * (1.0 - p))[:, None] * (X_scaled * self.coef)
+
+def _fit_platt(z, targets, iterations=50):
+    # Newton's method on the cross-entropy of sigmoid(a * z + b) against soft targets
+    a, b = 1.0, 0.0
+    for _ in range(iterations):
+        p = _sigmoid(a * z + b)
+        error = p - targets
+        weight = np.maximum(p * (1.0 - p), 1e-12)
+        gradient = np.array([error @ z, error.sum()])
+        hessian = np.array([[weight @ (z * z), weight @ z], [weight @ z, weight.sum()]]) + 1e-9 * np.eye(2)
+        step = np.linalg.solve(hessian, gradient)
+        a, b = a - step[0], b - step[1]
+        if np.abs(step).max() < 1e-10:
+            break
+    return a, b
+
+def fit_screen(engine, X_scaled=None, n_probes=4096, seed=0):
+    """
+    Builds a LinearScreen for a CompiledEnsemble. The Platt step is fitted to the ensemble's
+    calibrated probabilities on `X_scaled` (e.g. training rows) or, when no data is at hand,
+    on standard-normal probes in scaled space.
+    """
+    n_folds = engine.n_folds
+    coef = np.mean([engine.arrays[f"f{fold}_lr_coef"] for fold in range(n_folds)], axis=0)
+    intercept = float(np.mean([engine.arrays[f"f{fold}_lr_intercept"] for fold in range(n_folds)]))
+    source = "data"
+    if X_scaled is None:
+        X_scaled = np.random.default_rng(seed).standard_normal((n_probes, coef.shape[0]))
+        source = "probes"
+
+    targets = engine.calibrate(engine.member_probabilities(X_scaled))[0]
+    z = X_scaled @ coef + intercept
+    a, b = _fit_platt(z, targets)
+    screen = LinearScreen(coef, intercept, a, b)
+    screen.fit_stats = {
+        "source": source,
+        "rows": int(X_scaled.shape[0]),
+        "mean_abs_diff": float(np.mean(np.abs(screen.predict_proba(X_scaled) - targets))),
+    }
+    return screen
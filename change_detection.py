@@ -0,0 +1,292 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import numpy as np
+from scipy.special import ndtri, stdtr
+from feature_store import FeatureStore, feature_store
+from baseline_service import BASELINE_FEATURES, BASELINE_LABELS, FEATURE_KEYS, MIN_CV, feature_vector
+
+# Scans that seed a patient's reference before monitoring starts (again after every alarm)
+WARMUP_SCANS = 5
+# CUSUM allowance in standard deviations (the multivariate norm needs a wider one than a single feature)
+CUSUM_K = 1.0
+# Alarm threshold on the multivariate CUSUM norm: ~550 in-control scans between false alarms
+# for 8 features, ~4 scans to flag a 1.5 SD shift in 3 of them (simulated)
+MCUSUM_H = 8.0
+# Per-feature CUSUM level reported as a contributing driver
+FEATURE_H = 4.0
+# Bound on a single scan's standardized residual, so one corrupted recording cannot alarm alone
+Z_CLIP = 4.0
+
+_D = len(FEATURE_KEYS)
+_STATE_FIELDS = ("scans", "n_ref", "alarms")
+# Flat float64 layout of one patient's state: 3 counters + reference mean/M2 + CUSUM accumulators
+STATE_SIZE = len(_STATE_FIELDS) + 5 * _D
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS change_state (patient_hash TEXT PRIMARY KEY, state BLOB NOT NULL, updated_at TEXT)",
+    "CREATE TABLE IF NOT EXISTS change_alerts (id INTEGER PRIMARY KEY AUTOINCREMENT, patient_hash TEXT NOT NULL, "
+    "record_id INTEGER, timestamp TEXT, scan INTEGER, statistic REAL, drivers TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_change_alerts_patient ON change_alerts (patient_hash, timestamp)",
+]
+_UPSERT_STATE = ("INSERT INTO change_state VALUES (?, ?, ?) ON CONFLICT(patient_hash) DO UPDATE SET "
+                 "state = excluded.state, updated_at = excluded.updated_at")
+
+class ChangeState:
+    """
+    Change-detection state for P patients (P = 1 online) as arrays with a leading
+    patient axis: scan count, reference sample size, alarm count, running (Welford)
+    reference mean and M2, two-sided per-feature CUSUMs (s_pos, s_neg) and the multivariate
+    CUSUM vector s_vec. One patient serializes to STATE_SIZE float64s.
+    """
+
+    def __init__(self, n_patients=1):
+        self.scans = np.zeros(n_patients)
+        self.n_ref = np.zeros(n_patients)
+        self.alarms = np.zeros(n_patients)
+        self.mean = np.zeros((n_patients, _D))
+        self.m2 = np.zeros((n_patients, _D))
+        self.s_pos = np.zeros((n_patients, _D))
+        self.s_neg = np.zeros((n_patients, _D))
+        self.s_vec = np.zeros((n_patients, _D))
+
+    def to_array(self):
+        return np.hstack([self.scans[:, None], self.n_ref[:, None], self.alarms[:, None],
+                          self.mean, self.m2, self.s_pos, self.s_neg, self.s_vec])
+
+    @classmethod
+    def from_array(cls, array):
+        array = np.atleast_2d(np.asarray(array, dtype=np.float64))
+        state = cls(len(array))
+        state.scans, state.n_ref, state.alarms = array[:, 0].copy(), array[:, 1].copy(), array[:, 2].copy()
+        blocks = np.split(array[:, 3:], 5, axis=1)
+        state.mean, state.m2, state.s_pos, state.s_neg, state.s_vec = (block.copy() for block in blocks)
+        return state
+
+    def to_bytes(self):
+        return self.to_array()[0].tobytes()
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls.from_array(np.frombuffer(data, dtype=np.float64))
+
+def step(state, rows, X, k=CUSUM_K, h=MCUSUM_H):
+    """
+    Feeds one scan to each patient in `rows` (indices into `state`), X (len(rows), D),
+    in O(D) per patient. Self-starting scheme: once a patient has WARMUP_SCANS scans,
+    each new one is standardized against the running mean and standard deviation of
+    their earlier in-control scans (predictive residual, t to normal transformed), which
+    feed per-feature two-sided CUSUMs and Crosier's multivariate CUSUM, whose norm is
+    the alarm statistic. The reference then absorbs the scan; an alarm resets the
+    accumulators and restarts the reference from the alarming scan.
+    Returns (statistic, alarm, feature_statistics) for the given rows.
+    """
+    n_ref, mean, m2 = state.n_ref[rows], state.mean[rows], state.m2[rows]
+    X = np.where(np.isnan(X), mean, X)
+    monitoring = n_ref >= WARMUP_SCANS
+
+    n = np.maximum(n_ref, 2)[:, None]
+    floor = MIN_CV * np.abs(mean)
+    std = np.sqrt(np.maximum(m2 / (n - 1), floor * floor) + 1e-12)
+    residual = (X - mean) / (std * np.sqrt(1.0 + 1.0 / n))
+    z = np.clip(ndtri(stdtr(n - 1, residual)), -Z_CLIP, Z_CLIP)
+    s_pos = np.maximum(0.0, state.s_pos[rows] + z - k)
+    s_neg = np.maximum(0.0, state.s_neg[rows] - z - k)
+    v = state.s_vec[rows] + z
+    c = np.linalg.norm(v, axis=1)
+    s_vec = v * np.where(c > k, 1.0 - k / np.maximum(c, 1e-12), 0.0)[:, None]
+    statistic = np.where(monitoring, np.linalg.norm(s_vec, axis=1), 0.0)
+    feature_statistics = np.where(monitoring[:, None], np.maximum(s_pos, s_neg), 0.0)
+    alarm = statistic > h
+
+    # Welford update of the reference; alarmed rows restart it from this scan
+    restart = alarm[:, None]
+    n_new = np.where(alarm, 0.0, n_ref) + 1
+    mean_prev = np.where(restart, 0.0, mean)
+    delta = X - mean_prev
+    mean_new = mean_prev + delta / n_new[:, None]
+    m2_new = np.where(restart, 0.0, m2) + delta * (X - mean_new)
+
+    accumulate = (monitoring & ~alarm)[:, None]
+    state.scans[rows] += 1
+    state.alarms[rows] += alarm
+    state.n_ref[rows] = n_new
+    state.mean[rows] = mean_new
+    state.m2[rows] = m2_new
+    state.s_pos[rows] = np.where(accumulate, s_pos, 0.0)
+    state.s_neg[rows] = np.where(accumulate, s_neg, 0.0)
+    state.s_vec[rows] = np.where(accumulate, s_vec, 0.0)
+    return statistic, alarm, feature_statistics
+
+def drivers(feature_statistics, top_k=3):
+    """
+    Labels of the features whose CUSUM exceeds FEATURE_H, strongest first (at most top_k).
+    """
+    order = np.argsort(feature_statistics)[::-1][:top_k]
+    return [BASELINE_LABELS[FEATURE_KEYS[i]] for i in order if feature_statistics[i] >= FEATURE_H]
+
+class ChangeDetector:
+    """
+    Online change-point detection over each patient's full scan history, keyed by the
+    anonymized patient hash. The per-patient state (ChangeState, STATE_SIZE float64s)
+    lives in the feature store database; each scan is one read-modify-write of that row
+    in O(D), never a refit over the history. Alarms are appended to change_alerts.
+    backfill() replays the whole research store, vectorized across patients.
+    """
+
+    def __init__(self, store=feature_store, k=CUSUM_K, h=MCUSUM_H):
+        self.store = store
+        self.k = k
+        self.h = h
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        conn = self.store.connection()
+        if not self._initialized:
+            with self._lock:
+                for statement in _SCHEMA:
+                    conn.execute(statement)
+                self._initialized = True
+        return conn
+
+    def get(self, patient_hash):
+        row = self._connect().execute("SELECT state FROM change_state WHERE patient_hash = ?", (patient_hash,)).fetchone()
+        return ChangeState.from_bytes(row["state"]) if row else None
+
+    def update(self, patient_hash, features, timestamp=None, record_id=None):
+        """
+        Feeds one scan (features dict keyed like FEATURE_KEYS) and returns the result:
+        alarm flag, multivariate statistic and threshold, per-feature CUSUMs and drivers.
+        """
+        conn = self._connect()
+        timestamp = timestamp or time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT state FROM change_state WHERE patient_hash = ?", (patient_hash,)).fetchone()
+            state = ChangeState.from_bytes(row["state"]) if row else ChangeState()
+            monitoring = bool(state.n_ref[0] >= WARMUP_SCANS)
+            statistic, alarm, feature_statistics = step(state, np.array([0]), feature_vector(features)[None, :],
+                                                        self.k, self.h)
+            result = {
+                "alarm": bool(alarm[0]),
+                "statistic": float(statistic[0]),
+                "threshold": self.h,
+                "scan": int(state.scans[0]),
+                "monitoring": monitoring,
+                "feature_statistics": {key: float(feature_statistics[0, i]) for i, key in enumerate(FEATURE_KEYS)},
+                "drivers": drivers(feature_statistics[0]),
+            }
+            conn.execute(_UPSERT_STATE, (patient_hash, state.to_bytes(), timestamp))
+            if result["alarm"]:
+                conn.execute("INSERT INTO change_alerts (patient_hash, record_id, timestamp, scan, statistic, drivers) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", (patient_hash, record_id, timestamp, result["scan"],
+                                                           result["statistic"], json.dumps(result["drivers"])))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def alerts(self, patient_hash):
+        rows = self._connect().execute("SELECT * FROM change_alerts WHERE patient_hash = ? ORDER BY timestamp",
+                                       (patient_hash,)).fetchall()
+        return [dict(row, drivers=json.loads(row["drivers"])) for row in rows]
+
+    def backfill(self, chunk_size=200000, persist=True):
+        """
+        Replays every research record (in insertion order per patient) through the
+        detector and, with `persist`, replaces the stored states and alerts of the
+        replayed patients; patients with no stored records (online scans only) keep
+        theirs. Patients are processed together: iteration t feeds the t-th scan of every
+        patient that has one as a single vectorized step. Returns a summary with the alert list.
+        """
+        start = time.perf_counter()
+        columns = list(BASELINE_FEATURES.values())
+        patients, codes, ids, timestamps, parts = {}, [], [], [], []
+        for records in self.store.iter_records(chunk_size=chunk_size):
+            codes.extend(patients.setdefault(r["vocal_twin_hash"], len(patients)) for r in records)
+            ids.extend(r["id"] for r in records)
+            timestamps.extend(r.get("timestamp") for r in records)
+            parts.append(np.array([[np.nan if r.get(c) is None else r[c] for c in columns] for r in records],
+                                  dtype=np.float64).reshape(len(records), len(columns)))
+        X = np.vstack(parts) if parts else np.empty((0, _D))
+        codes = np.asarray(codes, dtype=np.int64)
+        load_sec = time.perf_counter() - start
+
+        # Position of every record within its patient's sequence; records come in id order
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes, minlength=len(patients))
+        group_start = np.repeat(np.cumsum(counts) - counts, counts)
+        position = np.empty(len(codes), dtype=np.int64)
+        position[order] = np.arange(len(codes)) - group_start
+        by_position = np.argsort(position, kind="stable")
+        boundaries = np.cumsum(np.bincount(position, minlength=int(counts.max()) if len(counts) else 0))
+
+        state = ChangeState(len(patients))
+        alerts = []
+        hashes = list(patients)
+        begin = 0
+        for end in boundaries:
+            batch = by_position[begin:end]
+            begin = end
+            statistic, alarm, feature_statistics = step(state, codes[batch], X[batch], self.k, self.h)
+            for i in np.flatnonzero(alarm):
+                record = batch[i]
+                alerts.append({
+                    "patient_hash": hashes[codes[record]],
+                    "record_id": int(ids[record]),
+                    "timestamp": timestamps[record],
+                    "scan": int(position[record] + 1),
+                    "statistic": float(statistic[i]),
+                    "drivers": drivers(feature_statistics[i]),
+                })
+        replay_sec = time.perf_counter() - start - load_sec
+
+        if persist:
+            self._persist(hashes, state, alerts, timestamps, codes)
+        return {
+            "records": len(codes),
+            "patients": len(patients),
+            "alerts": alerts,
+            "load_sec": round(load_sec, 3),
+            "replay_sec": round(replay_sec, 3),
+        }
+
+    def _persist(self, hashes, state, alerts, timestamps, codes):
+        last_seen = {}
+        for record, code in enumerate(codes):
+            last_seen[code] = timestamps[record]
+        array = state.to_array()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM change_alerts WHERE patient_hash = ?", [(h,) for h in hashes])
+            conn.executemany(_UPSERT_STATE, [(h, array[i].tobytes(), last_seen.get(i)) for i, h in enumerate(hashes)])
+            conn.executemany("INSERT INTO change_alerts (patient_hash, record_id, timestamp, scan, statistic, drivers) "
+                             "VALUES (?, ?, ?, ?, ?, ?)",
+                             [(a["patient_hash"], a["record_id"], a["timestamp"], a["scan"], a["statistic"],
+                               json.dumps(a["drivers"])) for a in alerts])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill change-point alerts over the research feature store.")
+    parser.add_argument("--store", default=feature_store.path)
+    parser.add_argument("--dry-run", action="store_true", help="Report alerts without replacing stored states")
+    args = parser.parse_args(argv)
+
+    summary = ChangeDetector(FeatureStore(args.store)).backfill(persist=not args.dry_run)
+    print(f"{summary['records']} records, {summary['patients']} patients: {len(summary['alerts'])} alerts "
+          f"(load {summary['load_sec']}s, replay {summary['replay_sec']}s)", file=sys.stderr)
+    return 0
+
+# Singleton instance
+change_detector = ChangeDetector()
+
+if __name__ == "__main__":
+    sys.exit(main())
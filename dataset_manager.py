@@ -1,44 +1,65 @@
-import csv
 import os
 import hashlib
 from datetime import datetime
+from feature_store import feature_store
+from write_behind import research_writer
 
+# Legacy append-only CSV; records now live in feature_store and this file is imported once
 DATASET_FILE = "validation_dataset.csv"
 
+DATASET_HEADER = [
+    "timestamp",
+    "vocal_twin_hash",
+    "age_normalized",
+    "gender",
+    "task_type",
+    "jitter",
+    "shimmer",
+    "hnr",
+    "f0_std",
+    "f1_mean",
+    "f2_mean",
+    "spectral_centroid",
+    "cpp",
+    "snr_db",
+    "calibrated_score",
+    "clinical_label" # To be filled later by researchers
+]
+
+_initialized = False
+
 def initialize_dataset():
-    if not os.path.exists(DATASET_FILE):
-        with open(DATASET_FILE, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                "timestamp",
-                "vocal_twin_hash",
-                "age_normalized",
-                "gender",
-                "task_type",
-                "jitter",
-                "shimmer",
-                "hnr",
-                "f0_std",
-                "f1_mean",
-                "f2_mean",
-                "spectral_centroid",
-                "cpp",
-                "snr_db",
-                "calibrated_score",
-                "clinical_label" # To be filled later by researchers
-            ])
+    """
+    Creates the feature store schema and migrates a legacy CSV dataset into it (once per file).
+    """
+    global _initialized
+    if _initialized:
+        return
+    feature_store.initialize()
+    if os.path.exists(DATASET_FILE):
+        feature_store.import_csv(DATASET_FILE)
+    _initialized = True
+
+def anonymized_patient_hash(demographic_data):
+    """
+    Salted, truncated SHA-256 of the patient's email and name: the Vocal Twin key used
+    to track longitudinal changes without PII.
+    """
+    salt = "nuros_research_2026"
+    raw_id = f"{demographic_data.get('email', '')}{demographic_data.get('name', '')}{salt}"
+    return hashlib.sha256(raw_id.encode()).hexdigest()[:16]
 
-def store_anonymized_features(features, quality_metrics, ensemble_results, demographic_data):
+def store_anonymized_features(features, quality_metrics, ensemble_results, demographic_data, background=False):
     """
-    Stores strictly anonymized acoustic features to the CSV.
+    Stores strictly anonymized acoustic features in the research feature store.
     No raw audio is stored. PII is stripped.
+    With background=True the record is handed to the write-behind queue and
+    committed by its writer thread instead of before returning.
     """
     initialize_dataset()
     
     # Hash demographics to track longitudinal changes without PII
-    salt = "nuros_research_2026"
-    raw_id = f"{demographic_data.get('email', '')}{demographic_data.get('name', '')}{salt}"
-    patient_hash = hashlib.sha256(raw_id.encode()).hexdigest()[:16]
+    patient_hash = anonymized_patient_hash(demographic_data)
     
     age = demographic_data.get('age', 30)
     # Basic normalization: standardizing age
@@ -62,9 +83,16 @@ def store_anonymized_features(features, quality_metrics, ensemble_results, demog
         ensemble_results.get("calibrated_score", 0.0) if ensemble_results else 0.0,
         "PENDING_VALIDATION"
     ]
-    
-    with open(DATASET_FILE, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(row)
-        
+
+    record = dict(zip(DATASET_HEADER, row))
+    # Spectral model inputs outside the fixed schema, kept in the store's extras so
+    # training sees the same ZCR / MFCC values the ensemble is served
+    record["zcr"] = features.get("zcr")
+    for i, value in enumerate(features.get("mfcc_mean") or []):
+        record[f"mfcc_{i}"] = value
+    if background:
+        research_writer.enqueue(record)
+    else:
+        feature_store.append(record)
+
     return True
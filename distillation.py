@@ -0,0 +1,126 @@
+import time
+import numpy as np
+from sklearn.neural_network import MLPRegressor
+from inference_engine import _sigmoid, _ACTIVATIONS
+from attribution import _ACTIVATION_GRADIENTS
+
+# Teacher probabilities are learned as clipped logits
+LOGIT_CLIP = 8.0
+
+class StudentModel:
+    """
+    Compact single-network stand-in for the calibrated ensemble, served in NumPy: a small
+    MLP over the scaled fused vector that regresses the teacher's calibrated logit.
+    """
+
+    def __init__(self, weights, biases, activation="relu", fit_stats=None):
+        self.weights = [np.asarray(W, dtype=np.float64) for W in weights]
+        self.biases = [np.asarray(b, dtype=np.float64) for b in biases]
+        self.activation = activation
+        self.fit_stats = fit_stats or {}
+
+    @property
+    def residual_variance(self):
+        """
+        Mean squared student - teacher probability gap on the distillation holdout: the
+        uncertainty the student adds on top of the ensemble (NaN if it was not measured).
+        """
+        return self.fit_stats.get("holdout", {}).get("mean_sq_diff", float("nan"))
+
+    @property
+    def nbytes(self):
+        return sum(W.nbytes for W in self.weights) + sum(b.nbytes for b in self.biases)
+
+    def _forward(self, X_scaled):
+        activation = _ACTIVATIONS[self.activation]
+        h = X_scaled
+        pre_activations = []
+        for i, (W, b) in enumerate(zip(self.weights, self.biases)):
+            z = h @ W + b
+            if i < len(self.weights) - 1:
+                pre_activations.append(z)
+                h = activation(z)
+            else:
+                h = z
+        return h[:, 0], pre_activations
+
+    def predict_proba(self, X_scaled):
+        return _sigmoid(self._forward(X_scaled)[0])
+
+    def explain(self, X_scaled):
+        """
+        Gradient x input attributions (N, D) in probability units.
+        """
+        logit, pre_activations = self._forward(X_scaled)
+        gradient = _ACTIVATION_GRADIENTS[self.activation]
+        grad = np.broadcast_to(self.weights[-1][:, 0], (X_scaled.shape[0], self.weights[-1].shape[0]))
+        for i in range(len(self.weights) - 2, -1, -1):
+            grad = (grad * gradient(pre_activations[i])) @ self.weights[i].T
+        p = _sigmoid(logit)
+        return (p * (1.0 - p))[:, None] * grad * X_scaled
+
+def augment(X_scaled, n_augmented, noise=0.3, seed=0):
+    """
+    Augmented scaled vectors around the real ones: one third Gaussian-jittered copies,
+    one third mixup of random pairs, one third standard-normal probes covering the
+    scaled input space (so the student stays close to the teacher off the data manifold).
+    """
+    rng = np.random.default_rng(seed)
+    n_jitter = n_mixup = n_augmented // 3
+    n_probe = n_augmented - n_jitter - n_mixup
+    parts = [rng.standard_normal((n_probe, X_scaled.shape[1]))]
+    if len(X_scaled):
+        base = X_scaled[rng.integers(0, len(X_scaled), n_jitter)]
+        parts.append(base + rng.normal(0, noise, base.shape))
+        left = X_scaled[rng.integers(0, len(X_scaled), n_mixup)]
+        right = X_scaled[rng.integers(0, len(X_scaled), n_mixup)]
+        lam = rng.beta(0.4, 0.4, (n_mixup, 1))
+        parts.append(lam * left + (1 - lam) * right)
+    return np.vstack(parts)
+
+def distill(engine, X_scaled=None, n_augmented=20000, hidden_layer_sizes=(32,), holdout=0.1, seed=0):
+    """
+    Trains a StudentModel on a CompiledEnsemble's calibrated probabilities over real
+    scaled vectors `X_scaled` (optional) plus augmented ones. A random `holdout` share is
+    kept out of the fit to report student/teacher agreement.
+    """
+    real = np.empty((0, engine.mean.shape[0])) if X_scaled is None else np.asarray(X_scaled, dtype=np.float64)
+    X = np.vstack([real, augment(real, n_augmented, seed=seed)])
+    start = time.perf_counter()
+    teacher = engine.calibrate(engine.member_probabilities(X))[0]
+    teacher_sec = time.perf_counter() - start
+    eps = _sigmoid(-LOGIT_CLIP)
+    p = np.clip(teacher, eps, 1 - eps)
+    targets = np.log(p / (1 - p))
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(X))
+    n_holdout = int(len(X) * holdout)
+    test, train = order[:n_holdout], order[n_holdout:]
+
+    regressor = MLPRegressor(hidden_layer_sizes=hidden_layer_sizes, activation="relu", alpha=1e-4,
+                             max_iter=300, early_stopping=True, random_state=seed)
+    start = time.perf_counter()
+    regressor.fit(X[train], targets[train])
+    fit_sec = time.perf_counter() - start
+
+    student = StudentModel(regressor.coefs_, regressor.intercepts_, regressor.activation)
+    agreement = student_agreement(student.predict_proba(X[test]), teacher[test])
+    student.fit_stats = {
+        "real_rows": len(real),
+        "augmented_rows": len(X) - len(real),
+        "hidden_layer_sizes": list(hidden_layer_sizes),
+        "teacher_label_sec": round(teacher_sec, 3),
+        "fit_sec": round(fit_sec, 3),
+        "holdout": agreement,
+    }
+    return student
+
+def student_agreement(student_probs, teacher_probs, threshold=0.5):
+    return {
+        "rows": int(len(teacher_probs)),
+        "mean_abs_diff": float(np.mean(np.abs(student_probs - teacher_probs))),
+        "mean_sq_diff": float(np.mean((student_probs - teacher_probs) ** 2)),
+        "max_abs_diff": float(np.max(np.abs(student_probs - teacher_probs))) if len(teacher_probs) else 0.0,
+        "decision_agreement": float(np.mean((student_probs >= threshold) == (teacher_probs >= threshold))),
+    }
@@ -0,0 +1,148 @@
+import threading
+import numpy as np
+from scipy.stats import norm
+
+# Quantile bins per feature (reference deciles)
+N_BINS = 10
+# Population stability index thresholds
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+# Live observations needed before drift is reported
+MIN_OBSERVATIONS = 30
+_EPS = 1e-6
+
+class ReferenceSketch:
+    """
+    Training-time distribution of every fused-vector element: mean, standard deviation,
+    interior quantile edges (D, N_BINS - 1) and the share of training rows in each of
+    the N_BINS bins. Stored with the model artifact.
+    """
+
+    def __init__(self, mean, std, edges, proportions, source="data"):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.std = np.asarray(std, dtype=np.float64)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.proportions = np.asarray(proportions, dtype=np.float64)
+        self.source = source
+
+def bin_index(X, edges):
+    # Bin of every element: number of interior edges strictly below it, O(D * N_BINS)
+    return (X[..., :, None] > edges).sum(axis=-1)
+
+def reference_from_data(X):
+    """
+    Reference sketch from raw fused training vectors X (N, D).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    edges = np.quantile(X, np.arange(1, N_BINS) / N_BINS, axis=0).T
+    bins = bin_index(X, edges)
+    proportions = np.stack([(bins == b).mean(axis=0) for b in range(N_BINS)], axis=1)
+    return ReferenceSketch(X.mean(axis=0), X.std(axis=0), edges, proportions, source="data")
+
+def reference_from_scaler(scaler):
+    """
+    Gaussian reference from a fitted StandardScaler, for artifacts stored without one.
+    Constant training columns put all their mass in the first bin.
+    """
+    std = np.sqrt(scaler.var_)
+    edges = scaler.mean_[:, None] + std[:, None] * norm.ppf(np.arange(1, N_BINS) / N_BINS)[None, :]
+    proportions = np.full((len(std), N_BINS), 1.0 / N_BINS)
+    constant = std == 0
+    proportions[constant] = 0.0
+    proportions[constant, 0] = 1.0
+    return ReferenceSketch(scaler.mean_, std, edges, proportions, source="scaler")
+
+class DriftMonitor:
+    """
+    Constant-memory streaming sketch of live fused vectors compared with a ReferenceSketch.
+
+    Per feature it keeps running moments and bin proportions over the reference quantile
+    edges. Each observation costs O(D * N_BINS). With `half_life` (in observations) the
+    sketch weights recent scans exponentially, otherwise it is cumulative (exact mean,
+    variance and bin shares). Drift scores per feature: population stability index of
+    the bin shares, mean shift in reference standard deviations, and standard-deviation
+    ratio.
+    """
+
+    def __init__(self, reference, feature_names=None, half_life=None):
+        self.reference = reference
+        self.feature_names = list(feature_names) if feature_names is not None else [f"f{i}" for i in range(len(reference.mean))]
+        self.min_alpha = 1.0 - 0.5 ** (1.0 / half_life) if half_life else 0.0
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        dim = len(self.reference.mean)
+        self.count = 0
+        self.mean = np.zeros(dim)
+        self.var = np.zeros(dim)
+        self.proportions = np.zeros((dim, N_BINS))
+
+    def update(self, x):
+        """
+        Adds one fused vector (D,).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        bins = bin_index(x, self.reference.edges)
+        with self._lock:
+            self.count += 1
+            alpha = max(1.0 / self.count, self.min_alpha)
+            diff = x - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.var = (1.0 - alpha) * (self.var + diff * increment)
+            self.proportions *= 1.0 - alpha
+            self.proportions[np.arange(len(x)), bins] += alpha
+
+    def update_batch(self, X):
+        for x in np.atleast_2d(X):
+            self.update(x)
+
+    def scores(self):
+        """
+        Per-feature drift arrays: psi, mean_shift, std_ratio (all length D).
+        """
+        with self._lock:
+            mean, var, proportions = self.mean.copy(), self.var.copy(), self.proportions.copy()
+        ref = self.reference
+        ref_std = np.where(ref.std > 0, ref.std, 1.0)
+        live = np.clip(proportions, _EPS, None)
+        expected = np.clip(ref.proportions, _EPS, None)
+        return {
+            "psi": ((live - expected) * np.log(live / expected)).sum(axis=1),
+            "mean_shift": np.abs(mean - ref.mean) / ref_std,
+            "std_ratio": np.sqrt(var) / ref_std,
+        }
+
+    def report(self, top_k=10):
+        """
+        Drift summary: overall status plus the `top_k` features ranked by PSI.
+        """
+        if self.count < MIN_OBSERVATIONS:
+            return {"status": "insufficient_data", "observations": self.count, "features": []}
+        scores = self.scores()
+        order = np.argsort(scores["psi"])[::-1][:top_k]
+        features = [
+            {
+                "feature": self.feature_names[i],
+                "psi": round(float(scores["psi"][i]), 4),
+                "mean_shift": round(float(scores["mean_shift"][i]), 4),
+                "std_ratio": round(float(scores["std_ratio"][i]), 4),
+                "status": drift_status(scores["psi"][i]),
+            }
+            for i in order
+        ]
+        return {
+            "status": drift_status(scores["psi"].max()),
+            "observations": self.count,
+            "reference": self.reference.source,
+            "drifted_features": int((scores["psi"] >= PSI_SIGNIFICANT).sum()),
+            "features": features,
+        }
+
+def drift_status(psi):
+    if psi >= PSI_SIGNIFICANT:
+        return "significant_drift"
+    if psi >= PSI_MODERATE:
+        return "moderate_drift"
+    return "stable"
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within this process
+    fcntl = None
+
+DEFAULT_EMBEDDING_DIM = 128
+
+def content_key(audio):
+    """
+    Process-stable SHA-256 of a recording's content.
+
+    Accepts raw bytes, a file-like object, a path, a (y, sr) tuple or a sample array.
+    Strings that are not existing files (e.g. the "mock.wav" placeholder) are hashed
+    as names, so they still map to one stable embedding.
+    """
+    digest = hashlib.sha256()
+    if isinstance(audio, tuple):
+        y, sr = audio
+        digest.update(np.ascontiguousarray(y, dtype=np.float32).tobytes())
+        digest.update(f"|sr={int(sr)}".encode())
+    elif isinstance(audio, np.ndarray):
+        digest.update(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    elif isinstance(audio, (bytes, bytearray, memoryview)):
+        digest.update(bytes(audio))
+    elif hasattr(audio, "read"):
+        audio.seek(0)
+        digest.update(audio.read())
+        audio.seek(0)
+    elif isinstance(audio, (str, os.PathLike)) and os.path.isfile(audio):
+        with open(audio, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    else:
+        digest.update(f"name:{audio}".encode())
+    return digest.hexdigest()
+
+class EmbeddingBackend:
+    """
+    Interface for embedding encoders. Subclasses set a unique `name` (it namespaces
+    the on-disk store, so bump it whenever the encoder's outputs change), the output
+    `dim`, and implement `embed_batch`.
+    """
+    name = "base"
+    dim = DEFAULT_EMBEDDING_DIM
+    batch_size = 32
+
+    def embed_batch(self, items):
+        """
+        Embeds a list of (content_key, audio) pairs. Returns an (N, dim) array.
+        """
+        raise NotImplementedError
+
+class MockEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic stand-in for pooled wav2vec hidden states.
+    Each vector is drawn from a private RNG seeded by the content key, so it is the same
+    in every process and leaves NumPy's global random state untouched.
+    In production this would be replaced by a `transformers.Wav2Vec2Model` backend.
+    """
+    name = "mock-v1"
+
+    def __init__(self, dim=DEFAULT_EMBEDDING_DIM, scale=0.1):
+        self.dim = dim
+        self.scale = scale
+
+    def embed_batch(self, items):
+        out = np.empty((len(items), self.dim))
+        for i, (key, _) in enumerate(items):
+            rng = np.random.default_rng(int(key[:16], 16))
+            out[i] = rng.normal(loc=0.0, scale=self.scale, size=self.dim)
+        return out
+
+class EmbeddingStore:
+    """
+    Content-addressed embedding store in front of an EmbeddingBackend.
+
+    Without a directory it keeps a bounded in-memory LRU. With one, embeddings live in
+    <dir>/<backend name>/ as an append-only float32 matrix (`vectors.f32`, read through
+    a read-only memory map) plus `keys.txt` holding one content key per row. Rows are
+    only committed once their key line is written, so a torn append is truncated away on
+    the next write. Missing embeddings are computed in `backend.batch_size` batches, and
+    recordings already stored are never re-embedded.
+    """
+
+    def __init__(self, backend=None, directory=None, max_memory_entries=4096):
+        self.backend = backend or MockEmbeddingBackend()
+        self.directory = os.path.join(directory, self.backend.name) if directory else None
+        self.max_memory_entries = max_memory_entries
+        self._memory = OrderedDict()
+        self._index = {}
+        self._keys_offset = 0
+        self._vectors = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "batches": 0}
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._check_meta()
+            self._refresh()
+
+    @property
+    def dim(self):
+        return self.backend.dim
+
+    # --- Disk tier ---
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _check_meta(self):
+        meta = {"backend": self.backend.name, "dim": self.dim, "dtype": "float32"}
+        path = self._path("meta.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                stored = json.load(f)
+            if stored != meta:
+                raise ValueError(f"Embedding store at '{self.directory}' holds {stored}, backend produces {meta}.")
+            return
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, path)
+
+    def _refresh(self):
+        # Picks up complete key lines appended since the last read (by this or another process)
+        keys_path = self._path("keys.txt")
+        if not os.path.exists(keys_path):
+            return
+        with open(keys_path, "rb") as f:
+            f.seek(self._keys_offset)
+            tail = f.read()
+        complete = tail[:tail.rfind(b"\n") + 1]
+        if not complete:
+            return
+        for key in complete.decode().splitlines():
+            self._index.setdefault(key, len(self._index))
+        self._keys_offset += len(complete)
+        self._vectors = np.memmap(self._path("vectors.f32"), dtype=np.float32, mode="r",
+                                  shape=(len(self._index), self.dim))
+
+    def _append(self, keys, vectors):
+        with open(self._path("store.lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self._refresh()
+            rows = [i for i, key in enumerate(keys) if key not in self._index]
+            if not rows:
+                return
+            row_bytes = self.dim * np.dtype(np.float32).itemsize
+            with open(self._path("vectors.f32"), "ab") as f:
+                f.truncate(len(self._index) * row_bytes)
+                f.write(np.ascontiguousarray(vectors[rows], dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._path("keys.txt"), "ab") as f:
+                f.truncate(self._keys_offset)
+                f.write("".join(f"{keys[i]}\n" for i in rows).encode())
+            self._refresh()
+
+    # --- Memory tier ---
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key):
+        if self.directory:
+            row = self._index.get(key)
+            return None if row is None else self._vectors[row]
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    # --- Public API ---
+    def get_many(self, audios):
+        """
+        Returns an (N, dim) float64 matrix of embeddings for N recordings, computing
+        only the ones not yet stored.
+        """
+        audios = list(audios)
+        keys = [content_key(audio) for audio in audios]
+        with self._lock:
+            if self.directory:
+                self._refresh()
+            missing = OrderedDict((key, audio) for key, audio in zip(keys, audios) if self._lookup(key) is None)
+            self.stats["hits"] += len(keys) - sum(key in missing for key in keys)
+            self.stats["misses"] += sum(key in missing for key in keys)
+
+        if missing:
+            items = list(missing.items())
+            for start in range(0, len(items), self.backend.batch_size):
+                batch = items[start:start + self.backend.batch_size]
+                vectors = np.asarray(self.backend.embed_batch(batch), dtype=np.float32)
+                if vectors.shape != (len(batch), self.dim):
+                    raise ValueError(f"Backend '{self.backend.name}' returned {vectors.shape}, expected {(len(batch), self.dim)}.")
+                batch_keys = [key for key, _ in batch]
+                with self._lock:
+                    self.stats["batches"] += 1
+                    if self.directory:
+                        self._append(batch_keys, vectors)
+                    else:
+                        for key, vector in zip(batch_keys, vectors):
+                            self._remember(key, vector)
+
+        out = np.empty((len(keys), self.dim))
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    # Evicted from a small memory tier within this call
+                    vector = np.asarray(self.backend.embed_batch([(key, audios[i])]), dtype=np.float32)[0]
+                out[i] = vector
+        return out
+
+    def get(self, audio):
+        return self.get_many([audio])[0]
+
+    def __len__(self):
+        return len(self._index) if self.directory else len(self._memory)
+
+# Singleton instance (set NUROS_EMBEDDING_DIR to persist embeddings across processes)
+embedding_store = EmbeddingStore(directory=os.environ.get("NUROS_EMBEDDING_DIR"))
@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from audio_analysis import EXTRACTOR_VERSION
+
+class FeatureCache:
+    """
+    Content-addressed cache for per-recording analysis results.
+
+    Keys are the SHA-256 of the raw audio bytes plus the extractor version (and a
+    namespace such as "features:<profile>" or "risk:<life stage>:<profile>:<model version>"), so identical uploads hit
+    regardless of filename or session. A bounded in-memory LRU serves repeat
+    Streamlit reruns; an optional on-disk tier of zlib-compressed JSON records
+    survives restarts and is evicted oldest-first once it exceeds `max_disk_bytes`.
+    Cached values are shared, so callers should treat them as read-only.
+    """
+
+    def __init__(self, max_entries=128, disk_dir=None, max_disk_bytes=256 * 1024 * 1024, version=EXTRACTOR_VERSION):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.version = version
+        self._memory = OrderedDict()
+        self._disk_sizes = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "disk_evictions": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._index_disk()
+
+    def key(self, audio_bytes, namespace="features"):
+        digest = hashlib.sha256()
+        digest.update(bytes(audio_bytes))
+        digest.update(f"|{self.version}|{namespace}".encode())
+        return digest.hexdigest()
+
+    # --- Disk tier ---
+    def _record_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.rec")
+
+    def _index_disk(self):
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if name.endswith(".rec"):
+                path = os.path.join(self.disk_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk_sizes[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key):
+        if not self.disk_dir or key not in self._disk_sizes:
+            return None
+        try:
+            with open(self._record_path(key), "rb") as f:
+                value = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            # Unreadable record: drop it from the index and the disk so it is rewritten on the next put
+            self._disk_bytes -= self._disk_sizes.pop(key, 0)
+            try:
+                os.remove(self._record_path(key))
+            except OSError:
+                pass
+            return None
+        self._disk_sizes.move_to_end(key)
+        os.utime(self._record_path(key))
+        return value
+
+    def _write_disk(self, key, value):
+        if not self.disk_dir:
+            return
+        record = zlib.compress(json.dumps(value, separators=(",", ":"), default=float).encode())
+        tmp_path = self._record_path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(record)
+        os.replace(tmp_path, self._record_path(key))
+        self._disk_bytes += len(record) - self._disk_sizes.get(key, 0)
+        self._disk_sizes[key] = len(record)
+        self._disk_sizes.move_to_end(key)
+
+        while self._disk_bytes > self.max_disk_bytes and len(self._disk_sizes) > 1:
+            old_key, old_size = self._disk_sizes.popitem(last=False)
+            self._disk_bytes -= old_size
+            try:
+                os.remove(self._record_path(old_key))
+            except OSError:
+                pass
+            self.stats["disk_evictions"] += 1
+
+    # --- Public API ---
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return self._memory[key]
+
+            value = self._read_disk(key)
+            if value is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(key, value)
+                return value
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+            self._write_disk(key, value)
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get_or_compute(self, audio_bytes, compute, namespace="features"):
+        """
+        Returns the cached result for these audio bytes, or runs `compute()` and stores it.
+        """
+        key = self.key(audio_bytes, namespace)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._disk_sizes):
+                try:
+                    os.remove(self._record_path(key))
+                except OSError:
+                    pass
+            self._disk_sizes.clear()
+            self._disk_bytes = 0
+
+    def hit_rate(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+# Singleton instance (set NUROS_FEATURE_CACHE_DIR to enable the on-disk tier)
+feature_cache = FeatureCache(disk_dir=os.environ.get("NUROS_FEATURE_CACHE_DIR"))
@@ -0,0 +1,90 @@
+import numpy as np
+import librosa
+
+
+class SpectralFeatureGraph:
+    """
+    Shared-intermediate feature graph for the librosa spectral stage.
+
+    The STFT magnitude, power and mel spectrograms are computed once on first use
+    and every spectral feature is derived from them, instead of each librosa call
+    running its own STFT over the same signal. The graph counts how many times each
+    intermediate was computed and reused so the saving is visible in traces.
+    """
+
+    def __init__(self, y, sr, n_fft=2048, hop_length=512, n_mels=128):
+        self.y = y
+        self.sr = sr
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.n_mels = n_mels
+        self._nodes = {}
+        self._computed = []
+        self._reuse_counts = {}
+
+    def _get(self, name, compute):
+        if name in self._nodes:
+            self._reuse_counts[name] = self._reuse_counts.get(name, 0) + 1
+            return self._nodes[name]
+        value = compute()
+        self._nodes[name] = value
+        self._computed.append(name)
+        return value
+
+    # --- Shared intermediates ---
+    @property
+    def stft_magnitude(self):
+        return self._get("stft_magnitude", lambda: np.abs(
+            librosa.stft(self.y, n_fft=self.n_fft, hop_length=self.hop_length)
+        ))
+
+    @property
+    def power_spectrogram(self):
+        return self._get("power_spectrogram", lambda: self.stft_magnitude ** 2)
+
+    @property
+    def mel_spectrogram(self):
+        return self._get("mel_spectrogram", lambda: librosa.feature.melspectrogram(
+            S=self.power_spectrogram, sr=self.sr, n_fft=self.n_fft, n_mels=self.n_mels
+        ))
+
+    @property
+    def log_mel_spectrogram(self):
+        return self._get("log_mel_spectrogram", lambda: librosa.power_to_db(self.mel_spectrogram))
+
+    # --- Derived features ---
+    def mfcc(self, n_mfcc=40):
+        return self._get(f"mfcc_{n_mfcc}", lambda: librosa.feature.mfcc(
+            S=self.log_mel_spectrogram, sr=self.sr, n_mfcc=n_mfcc
+        ))
+
+    def spectral_centroid(self):
+        return librosa.feature.spectral_centroid(
+            S=self.stft_magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0]
+
+    def spectral_rolloff(self):
+        return librosa.feature.spectral_rolloff(
+            S=self.stft_magnitude, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )[0]
+
+    def spectral_flux(self):
+        # onset_strength(y=...) builds a dB mel spectrogram internally; hand it ours
+        return librosa.onset.onset_strength(
+            S=self.log_mel_spectrogram, sr=self.sr, hop_length=self.hop_length
+        )
+
+    def chroma(self):
+        return librosa.feature.chroma_stft(
+            S=self.power_spectrogram, sr=self.sr, n_fft=self.n_fft, hop_length=self.hop_length
+        )
+
+    def report(self):
+        """
+        Summarises which intermediates were computed and how often each was reused.
+        """
+        return {
+            "computed": list(self._computed),
+            "reused": dict(self._reuse_counts),
+            "stft_passes": 1 if "stft_magnitude" in self._nodes else 0
+        }
@@ -0,0 +1,339 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+FEATURE_STORE_FILE = "validation_dataset.db"
+
+# Research record columns and their SQLite types, migrated from the validation_dataset.csv header
+RECORD_COLUMNS = [
+    ("timestamp", "TEXT NOT NULL"),
+    ("vocal_twin_hash", "TEXT NOT NULL"),
+    ("age_normalized", "REAL"),
+    ("gender", "TEXT"),
+    ("task_type", "TEXT"),
+    ("jitter", "REAL"),
+    ("shimmer", "REAL"),
+    ("hnr", "REAL"),
+    ("f0_std", "REAL"),
+    ("f1_mean", "REAL"),
+    ("f2_mean", "REAL"),
+    ("spectral_centroid", "REAL"),
+    ("cpp", "REAL"),
+    ("snr_db", "REAL"),
+    ("calibrated_score", "REAL"),
+    ("clinical_label", "TEXT"),
+]
+RECORD_FIELDS = [name for name, _ in RECORD_COLUMNS]
+_REAL_FIELDS = {name for name, kind in RECORD_COLUMNS if kind == "REAL"}
+
+SCHEMA_VERSION = 2
+
+# Next label sequence number: label_seq orders records by when they were (last) labeled,
+# so label consumers page forward from a cursor instead of re-reading unlabeled rows
+_NEXT_LABEL_SEQ = "CASE WHEN ? IS NULL THEN NULL ELSE (SELECT COALESCE(MAX(label_seq), 0) + 1 FROM records) END"
+
+# vocal_twin_hash is the anonymized patient hash, so (vocal_twin_hash, timestamp) serves
+# both per-patient lookups and ordered longitudinal range scans
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS records (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+    + ", ".join(f"{name} {kind}" for name, kind in RECORD_COLUMNS)
+    + ", extras TEXT, label_seq INTEGER)",
+    "CREATE INDEX IF NOT EXISTS idx_records_patient_time ON records (vocal_twin_hash, timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (timestamp)",
+    "CREATE INDEX IF NOT EXISTS idx_records_label ON records (clinical_label)",
+    "CREATE INDEX IF NOT EXISTS idx_records_label_seq ON records (label_seq)",
+    "CREATE TABLE IF NOT EXISTS imports (source_sha256 TEXT PRIMARY KEY, path TEXT, rows INTEGER, imported_at REAL)",
+]
+
+def _coerce(name, value):
+    if value is None or value == "":
+        return None
+    if name in _REAL_FIELDS:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    return str(value)
+
+class _CommitGroup:
+    # Rows appended while another thread held the write lock, committed together
+    def __init__(self):
+        self.rows = []
+        self.done = False
+        self.error = None
+
+class FeatureStore:
+    """
+    Embedded SQLite store for the anonymized research records that used to be appended
+    to validation_dataset.csv.
+
+    The database runs in WAL mode, so Streamlit sessions in other threads or processes
+    read while one writes, and concurrent writers queue on SQLite's lock (busy_timeout)
+    instead of interleaving partial CSV lines. Each thread gets its own connection.
+    Writes are group-committed: rows appended by concurrent threads are collected and
+    the first writer to take the lock commits all of them in one transaction. Columns
+    outside the fixed schema (e.g. mfcc_<i>, audio_ref) are kept as JSON in `extras`
+    and merged back into the row dicts on read.
+    """
+
+    def __init__(self, path=FEATURE_STORE_FILE, busy_timeout_ms=10000, synchronous="NORMAL"):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._group = _CommitGroup()
+        self._initialized = False
+        self.stats = {"rows_written": 0, "transactions": 0, "max_group_size": 0, "commit_sec": 0.0}
+
+    # --- Connections ---
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            self._local.conn = conn
+        if not self._initialized:
+            self.initialize(conn)
+        return conn
+
+    def connection(self):
+        """
+        This thread's connection, for services keeping their own tables in the store database.
+        """
+        return self._connect()
+
+    def initialize(self, conn=None):
+        conn = conn or self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+            if columns and "label_seq" not in columns:
+                # Version 1 stores: rows labeled before the migration are sequenced in id order
+                conn.execute("ALTER TABLE records ADD COLUMN label_seq INTEGER")
+                conn.execute("UPDATE records SET label_seq = id WHERE clinical_label IS NOT NULL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._initialized = True
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # --- Writes ---
+    def _to_row(self, record):
+        extras = {key: value for key, value in record.items() if key not in RECORD_FIELDS and key not in ("id", "label_seq")}
+        row = [_coerce(name, record.get(name)) for name in RECORD_FIELDS]
+        row.append(json.dumps(extras, default=float) if extras else None)
+        row.append(row[RECORD_FIELDS.index("clinical_label")])
+        return row
+
+    def _insert(self, conn, rows):
+        placeholders = ", ".join("?" * (len(RECORD_FIELDS) + 1))
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(f"INSERT INTO records ({', '.join(RECORD_FIELDS)}, extras, label_seq) "
+                             f"VALUES ({placeholders}, {_NEXT_LABEL_SEQ})", rows)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.stats["rows_written"] += len(rows)
+        self.stats["transactions"] += 1
+        self.stats["max_group_size"] = max(self.stats["max_group_size"], len(rows))
+        self.stats["commit_sec"] += time.perf_counter() - start
+
+    def append(self, record):
+        """
+        Adds one record (dict keyed by RECORD_FIELDS plus optional extras) and returns
+        once it is committed, possibly as part of another thread's group.
+        """
+        row = self._to_row(record)
+        with self._pending_lock:
+            group = self._group
+            group.rows.append(row)
+        with self._write_lock:
+            if not group.done:
+                with self._pending_lock:
+                    self._group = _CommitGroup()
+                try:
+                    self._insert(self._connect(), group.rows)
+                except BaseException as exc:
+                    group.error = exc
+                    raise
+                finally:
+                    group.done = True
+            elif group.error is not None:
+                raise group.error
+
+    def append_many(self, records):
+        """
+        Adds a batch of records in a single transaction. Returns the number written.
+        """
+        rows = [self._to_row(record) for record in records]
+        if rows:
+            with self._write_lock:
+                self._insert(self._connect(), rows)
+        return len(rows)
+
+    def set_label(self, record_id, clinical_label):
+        """
+        Sets (or clears, with None) a record's clinical_label and moves it to the end of the
+        label sequence, so iter_labeled consumers see it on their next pull.
+        """
+        clinical_label = _coerce("clinical_label", clinical_label)
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute(f"UPDATE records SET clinical_label = ?, label_seq = {_NEXT_LABEL_SEQ} WHERE id = ?",
+                         (clinical_label, clinical_label, record_id))
+
+    # --- Reads ---
+    @staticmethod
+    def _to_dict(row):
+        record = dict(row)
+        extras = record.pop("extras", None)
+        if extras:
+            record.update(json.loads(extras))
+        return record
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def label_cursor(self):
+        """
+        Highest label sequence number so far (0 if nothing is labeled); see iter_labeled.
+        """
+        return self._connect().execute("SELECT COALESCE(MAX(label_seq), 0) FROM records").fetchone()[0]
+
+    def labels_for(self, record_ids, batch_size=10000):
+        """
+        Current clinical_label of each record id, as a dict.
+        """
+        conn = self._connect()
+        labels = {}
+        for start in range(0, len(record_ids), batch_size):
+            batch = record_ids[start:start + batch_size]
+            labels.update(conn.execute(f"SELECT id, clinical_label FROM records WHERE id IN ({', '.join('?' * len(batch))})",
+                                       batch).fetchall())
+        return labels
+
+    def patient_history(self, patient_hash, since=None, until=None, limit=None):
+        """
+        A patient's records in time order, optionally within [since, until) ISO timestamps
+        and capped at the `limit` most recent. Served from the (vocal_twin_hash, timestamp) index.
+        """
+        clauses, params = ["vocal_twin_hash = ?"], [patient_hash]
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        query = f"SELECT * FROM records WHERE {' AND '.join(clauses)} ORDER BY timestamp DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        rows = self._connect().execute(query, params).fetchall()
+        return [self._to_dict(row) for row in reversed(rows)]
+
+    def iter_records(self, where=None, params=(), chunk_size=10000, after_id=0):
+        """
+        Streams records (dicts, including `id`) in insertion order, `chunk_size` per list,
+        paging on the primary key so no cursor is held open between chunks.
+        """
+        conn = self._connect()
+        condition = f"id > ? AND ({where})" if where else "id > ?"
+        last_id = after_id
+        while True:
+            rows = conn.execute(f"SELECT * FROM records WHERE {condition} ORDER BY id LIMIT ?",
+                                (last_id, *params, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1]["id"]
+            yield [self._to_dict(row) for row in rows]
+
+    def iter_labeled(self, after_seq=0, chunk_size=10000):
+        """
+        Streams the records labeled (or relabeled) after label sequence number `after_seq`,
+        in labeling order, paging on the label_seq index. Each row carries its `label_seq`.
+        """
+        conn = self._connect()
+        last_seq = after_seq
+        while True:
+            rows = conn.execute("SELECT * FROM records WHERE label_seq > ? ORDER BY label_seq LIMIT ?",
+                                (last_seq, chunk_size)).fetchall()
+            if not rows:
+                return
+            last_seq = rows[-1]["label_seq"]
+            yield [self._to_dict(row) for row in rows]
+
+    # --- CSV import ---
+    def import_csv(self, csv_path, batch_size=5000, force=False):
+        """
+        One-shot import of a validation_dataset.csv-style file. The file's SHA-256 is
+        recorded, so importing the same file again is a no-op unless `force`. Returns
+        the number of rows imported.
+        """
+        digest = hashlib.sha256()
+        with open(csv_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        source = digest.hexdigest()
+        conn = self._connect()
+        if not force and conn.execute("SELECT 1 FROM imports WHERE source_sha256 = ?", (source,)).fetchone():
+            return 0
+
+        imported = 0
+        with open(csv_path, newline="") as f:
+            batch = []
+            for record in csv.DictReader(f):
+                batch.append(record)
+                if len(batch) == batch_size:
+                    imported += self.append_many(batch)
+                    batch = []
+            imported += self.append_many(batch)
+        with self._write_lock:
+            conn.execute("INSERT OR REPLACE INTO imports VALUES (?, ?, ?, ?)",
+                         (source, os.path.abspath(csv_path), imported, time.time()))
+        return imported
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import validation_dataset.csv files into the SQLite feature store.")
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--store", default=os.environ.get("NUROS_FEATURE_STORE", FEATURE_STORE_FILE))
+    parser.add_argument("--force", action="store_true", help="Re-import files already imported")
+    args = parser.parse_args(argv)
+
+    store = FeatureStore(args.store)
+    for path in args.csv:
+        start = time.perf_counter()
+        rows = store.import_csv(path, force=args.force)
+        print(f"{path}: {rows} rows imported in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    print(f"{args.store}: {store.count()} records", file=sys.stderr)
+    return 0
+
+# Singleton instance (NUROS_FEATURE_STORE overrides the database path)
+feature_store = FeatureStore(os.environ.get("NUROS_FEATURE_STORE", FEATURE_STORE_FILE))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import numpy as np
+
+# Serving-side engine: pure NumPy. scikit-learn is only needed to compile (see compile_ensemble).
+
+MEMBER_NAMES = ("xgb", "lr", "nn")
+
+# exp(-z) overflows float64 beyond |z| ~ 709; the sigmoid is already 0 or 1 to double precision well before that
+_LOGIT_LIMIT = 500.0
+
+def untrained_columns(scaler):
+    """
+    Boolean mask of the columns that were constant in the scaler's training data (e.g. the
+    placeholder embedding of dataset rows without audio). The ensemble never learned from
+    them, so served rows hold them at their scaled training value of 0.
+    """
+    var = getattr(scaler, "var_", None)
+    if var is None:
+        return np.zeros(np.shape(scaler.mean_), dtype=bool)
+    return np.sqrt(var) < 10 * np.finfo(np.float64).eps
+
+def masked_transform(scaler, X):
+    """
+    scaler.transform(X) with untrained columns held at 0, as served.
+    """
+    X_scaled = scaler.transform(X)
+    untrained = untrained_columns(scaler)
+    if untrained.any():
+        X_scaled[:, untrained] = 0.0
+    return X_scaled
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -_LOGIT_LIMIT, _LOGIT_LIMIT)))
+
+_ACTIVATIONS = {
+    "relu": lambda z: np.maximum(z, 0.0),
+    "tanh": np.tanh,
+    "logistic": _sigmoid,
+    "identity": lambda z: z,
+}
+
+class CompiledEnsemble:
+    """
+    Compact, sklearn-free inference engine for the calibrated voting ensemble.
+
+    Holds the scaler as mean/scale arrays (plus the untrained-column mask), each CV fold's members as plain arrays
+    (logistic-regression weights, MLP dense layers, gradient-boosted trees flattened
+    into node arrays) and each fold's sigmoid calibrator as an (a, b) pair. Every
+    member is evaluated once per fold, so per-member and per-fold probabilities come
+    out of the same pass as the calibrated score.
+    """
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.mean = arrays["scaler_mean"]
+        self.scale = arrays["scaler_scale"]
+        # Engines exported before the mask was compiled in have no "untrained" array
+        self.untrained = arrays["untrained"] if "untrained" in arrays else np.zeros(self.mean.shape, dtype=bool)
+        self.n_folds = int(arrays["n_folds"])
+        self.mlp_activation = str(arrays["mlp_activation"])
+        self.voting_weights = arrays["voting_weights"]
+        self.calibration = arrays["calibration"]  # (n_folds, 2): a, b
+
+    # --- Members ---
+    def _gbt_raw(self, fold, X_scaled):
+        a = self.arrays
+        feature = a[f"f{fold}_gbt_feature"]
+        threshold = a[f"f{fold}_gbt_threshold"]
+        left = a[f"f{fold}_gbt_left"]
+        right = a[f"f{fold}_gbt_right"]
+        value = a[f"f{fold}_gbt_value"]
+        roots = a[f"f{fold}_gbt_roots"]
+
+        # sklearn trees compare float32 inputs against float64 thresholds
+        X32 = X_scaled.astype(np.float32).astype(np.float64)
+        rows = np.arange(X32.shape[0])[:, None]
+        node = np.broadcast_to(roots, (X32.shape[0], roots.shape[0])).copy()
+        for _ in range(int(a[f"f{fold}_gbt_max_depth"])):
+            is_split = left[node] >= 0
+            if not is_split.any():
+                break
+            go_left = X32[rows, feature[node]] <= threshold[node]
+            node = np.where(is_split, np.where(go_left, left[node], right[node]), node)
+        return a[f"f{fold}_gbt_init"] + a[f"f{fold}_gbt_learning_rate"] * value[node].sum(axis=1)
+
+    def _lr_logit(self, fold, X_scaled):
+        return X_scaled @ self.arrays[f"f{fold}_lr_coef"] + self.arrays[f"f{fold}_lr_intercept"]
+
+    def _mlp_forward(self, fold, X_scaled):
+        """
+        Returns (output logit, list of hidden pre-activations).
+        """
+        activation = _ACTIVATIONS[self.mlp_activation]
+        n_layers = int(self.arrays[f"f{fold}_mlp_n_layers"])
+        h = X_scaled
+        pre_activations = []
+        for i in range(n_layers):
+            z = h @ self.arrays[f"f{fold}_mlp_W{i}"] + self.arrays[f"f{fold}_mlp_b{i}"]
+            if i < n_layers - 1:
+                pre_activations.append(z)
+                h = activation(z)
+            else:
+                h = z
+        return h[:, 0], pre_activations
+
+    def member_probabilities(self, X_scaled):
+        """
+        Positive-class probability of every member in every fold: shape (n_folds, n_members, N).
+        """
+        out = np.empty((self.n_folds, len(MEMBER_NAMES), X_scaled.shape[0]))
+        for fold in range(self.n_folds):
+            out[fold, 0] = _sigmoid(self._gbt_raw(fold, X_scaled))
+            out[fold, 1] = _sigmoid(self._lr_logit(fold, X_scaled))
+            out[fold, 2] = _sigmoid(self._mlp_forward(fold, X_scaled)[0])
+        return out
+
+    # --- Ensemble ---
+    def transform(self, X):
+        X_scaled = (np.atleast_2d(np.asarray(X, dtype=np.float64)) - self.mean) / self.scale
+        if self.untrained.any():
+            X_scaled[:, self.untrained] = 0.0
+        return X_scaled
+
+    def calibrate(self, member_probs):
+        """
+        Soft vote inside each fold, sigmoid-calibrate per fold, average across folds.
+        Returns (calibrated probability (N,), per-fold calibrated probabilities (n_folds, N)).
+        """
+        weights = self.voting_weights / self.voting_weights.sum()
+        fold_votes = np.einsum("fmn,m->fn", member_probs, weights)
+        a = self.calibration[:, 0:1]
+        b = self.calibration[:, 1:2]
+        fold_calibrated = _sigmoid(-(a * fold_votes + b))
+        return fold_calibrated.mean(axis=0), fold_calibrated
+
+    def predict_proba(self, X):
+        """
+        Calibrated positive-class probability for raw (unscaled) fused vectors.
+        """
+        return self.calibrate(self.member_probabilities(self.transform(X)))[0]
+
+    def save(self, path):
+        np.savez(path, **self.arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls({key: data[key] for key in data.files})
+
+def _flatten_gbt(gbt, n_features, prefix, arrays):
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in gbt.estimators_[:, 0]:
+        t = tree.tree_
+        roots.append(offset)
+        features.append(np.where(t.children_left >= 0, t.feature, 0))
+        thresholds.append(t.threshold)
+        lefts.append(np.where(t.children_left >= 0, t.children_left + offset, -1))
+        rights.append(np.where(t.children_right >= 0, t.children_right + offset, -1))
+        values.append(t.value[:, 0, 0])
+        offset += t.node_count
+
+    prior = gbt.init_.predict_proba(np.zeros((1, n_features)))[0, 1]
+    eps = np.finfo(np.float64).eps
+    prior = float(np.clip(prior, eps, 1 - eps))
+
+    arrays[f"{prefix}gbt_feature"] = np.concatenate(features).astype(np.int64)
+    arrays[f"{prefix}gbt_threshold"] = np.concatenate(thresholds).astype(np.float64)
+    arrays[f"{prefix}gbt_left"] = np.concatenate(lefts).astype(np.int64)
+    arrays[f"{prefix}gbt_right"] = np.concatenate(rights).astype(np.int64)
+    arrays[f"{prefix}gbt_value"] = np.concatenate(values).astype(np.float64)
+    arrays[f"{prefix}gbt_roots"] = np.array(roots, dtype=np.int64)
+    arrays[f"{prefix}gbt_max_depth"] = np.array(max(tree.tree_.max_depth for tree in gbt.estimators_[:, 0]))
+    arrays[f"{prefix}gbt_init"] = np.array(np.log(prior / (1 - prior)))
+    arrays[f"{prefix}gbt_learning_rate"] = np.array(float(gbt.learning_rate))
+    # Per-node training weights, used for path-based attributions
+    arrays[f"{prefix}gbt_weight"] = np.concatenate(
+        [tree.tree_.weighted_n_node_samples for tree in gbt.estimators_[:, 0]]
+    ).astype(np.float64)
+
+def compile_ensemble(ensemble_pipeline):
+    """
+    Compiles a fitted NurosEnsemblePipeline (scaler + CalibratedClassifierCV over the
+    GBT/LR/MLP VotingClassifier) into a CompiledEnsemble.
+    """
+    scaler = ensemble_pipeline.scaler
+    calibrated = ensemble_pipeline.calibrated_model
+    n_features = scaler.mean_.shape[0]
+
+    arrays = {
+        "scaler_mean": np.array(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.array(scaler.scale_, dtype=np.float64),
+        "untrained": untrained_columns(scaler),
+        "n_folds": np.array(len(calibrated.calibrated_classifiers_)),
+    }
+    calibration = []
+    for fold, calibrated_classifier in enumerate(calibrated.calibrated_classifiers_):
+        voting = calibrated_classifier.estimator
+        members = voting.named_estimators_
+        if tuple(members) != MEMBER_NAMES:
+            raise ValueError(f"Expected ensemble members {MEMBER_NAMES}, got {tuple(members)}.")
+        if list(voting.classes_) != [0, 1]:
+            raise ValueError("Compiled engine supports binary 0/1 targets only.")
+        prefix = f"f{fold}_"
+
+        _flatten_gbt(members["xgb"], n_features, prefix, arrays)
+
+        lr = members["lr"]
+        arrays[f"{prefix}lr_coef"] = np.array(lr.coef_[0], dtype=np.float64)
+        arrays[f"{prefix}lr_intercept"] = np.array(float(lr.intercept_[0]))
+
+        mlp = members["nn"]
+        if mlp.out_activation_ != "logistic":
+            raise ValueError("Compiled engine expects a binary MLP with a logistic output.")
+        arrays[f"{prefix}mlp_n_layers"] = np.array(len(mlp.coefs_))
+        for i, (W, b) in enumerate(zip(mlp.coefs_, mlp.intercepts_)):
+            arrays[f"{prefix}mlp_W{i}"] = np.array(W, dtype=np.float64)
+            arrays[f"{prefix}mlp_b{i}"] = np.array(b, dtype=np.float64)
+        arrays["mlp_activation"] = np.array(mlp.activation)
+
+        weights = voting.weights if voting.weights is not None else [1.0] * len(MEMBER_NAMES)
+        arrays["voting_weights"] = np.array(weights, dtype=np.float64)
+
+        calibrator = calibrated_classifier.calibrators[0]
+        calibration.append([calibrator.a_, calibrator.b_])
+
+    arrays["calibration"] = np.array(calibration, dtype=np.float64)
+    return CompiledEnsemble(arrays)
+
+def parity_check(ensemble_pipeline, engine, X):
+    """
+    Max absolute difference between sklearn's calibrated probabilities (on served, masked
+    inputs) and the engine's for raw fused vectors X (N, D). Expected to be below 1e-9.
+    """
+    X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+    reference = ensemble_pipeline.calibrated_model.predict_proba(masked_transform(ensemble_pipeline.scaler, X))[:, 1]
+    return float(np.max(np.abs(reference - engine.predict_proba(X))))
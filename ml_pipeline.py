@@ -4,8 +4,111 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.neural_network import MLPClassifier
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.preprocessing import StandardScaler
-import joblib
-import os
+from sklearn.base import clone
+import threading
+from functools import cached_property
+from profiling import resolve_trace, profile_request
+from inference_engine import compile_ensemble, masked_transform, MEMBER_NAMES
+from model_store import save_artifact, load_artifact, latest_version, model_dir, ModelSchemaMismatch
+from embedding_store import embedding_store
+from attribution import AttributionEngine, top_drivers
+from online_learning import OnlineUpdater
+from cascade import fit_screen, DEFAULT_AMBIGUITY_BAND
+from drift_monitor import DriftMonitor, reference_from_scaler
+from distillation import distill
+
+# The ensemble is trained on 22 acoustic inputs: 9 core measures + the first 13 MFCC means
+N_MODEL_MFCC = 13
+EMBEDDING_DIM = 128
+
+# Number of drivers reported per prediction
+N_TOP_DRIVERS = 3
+
+# (feature key, default when missing) in fused-vector order
+CORE_FEATURES = [
+    ("jitter_percent", 0.5),
+    ("shimmer_percent", 2.0),
+    ("hnr_db", 20.0),
+    ("f0_std", 15.0),
+    ("f1_mean", 500.0),
+    ("f2_mean", 1500.0),
+    ("spectral_centroid", 1000.0),
+    ("zcr", 0.05),
+    ("cpp", 15.0),
+]
+
+# Ordered names of every column of the fused vector; stored artifacts are tied to its hash
+FEATURE_SCHEMA = (
+    [name for name, _ in CORE_FEATURES]
+    + [f"mfcc_{i}" for i in range(N_MODEL_MFCC)]
+    + [f"embedding_{i}" for i in range(EMBEDDING_DIM)]
+)
+
+# Human-readable driver names for attributions; embedding dimensions are reported as one driver
+CORE_FEATURE_LABELS = {
+    "jitter_percent": "Jitter (Micro-Tremor)",
+    "shimmer_percent": "Shimmer (Amplitude Instability)",
+    "hnr_db": "HNR (Breath Noise)",
+    "f0_std": "F0 Variance (Prosody)",
+    "f1_mean": "F1 (Jaw Opening)",
+    "f2_mean": "F2 (Tongue Position)",
+    "spectral_centroid": "Spectral Centroid (Brightness)",
+    "zcr": "Zero-Crossing Rate (Noisiness)",
+    "cpp": "CPP (Voice Periodicity)",
+}
+FEATURE_LABELS = (
+    [CORE_FEATURE_LABELS[name] for name, _ in CORE_FEATURES]
+    + [f"MFCC_{i} (Vocal Tract Shape)" for i in range(N_MODEL_MFCC)]
+    + [f"embedding_{i}" for i in range(EMBEDDING_DIM)]
+)
+DRIVER_GROUPS = {"Deep Embedding (wav2vec)": list(range(len(CORE_FEATURES) + N_MODEL_MFCC, len(FEATURE_SCHEMA)))}
+
+class ModelSnapshot:
+    """
+    One fitted model version as served: scaler, calibrated ensemble, and the compiled
+    engine / attribution structures derived from them. Requests take a snapshot once and
+    use it throughout, so a hot swap never mixes two versions within one prediction.
+    `extras` holds optional artifact components fitted at training time ("screen",
+    "drift_reference", "student"); missing screen / reference are derived on first use.
+    `metadata` is the artifact manifest's metadata (e.g. the dataset label cursor).
+    """
+
+    def __init__(self, scaler, calibrated_model, version=None, extras=None, metadata=None):
+        self.scaler = scaler
+        self.calibrated_model = calibrated_model
+        self.version = version
+        self.extras = dict(extras or {})
+        self.metadata = dict(metadata or {})
+        self.engine = compile_ensemble(self)
+        self.attributor = AttributionEngine(self.engine)
+
+    def transform(self, X):
+        """
+        Scales raw fused rows, with untrained columns held at their (scaled) training value of 0
+        (see inference_engine.untrained_columns); the compiled engine applies the same mask.
+        """
+        return masked_transform(self.scaler, X)
+
+    @cached_property
+    def screen(self):
+        """
+        Linear first stage for cascade scoring (fitted on probes if none was stored with the model).
+        """
+        return self.extras.get("screen") or fit_screen(self.engine)
+
+    @property
+    def student(self):
+        """
+        Distilled student network, if one was fitted for this version.
+        """
+        return self.extras.get("student")
+
+    @cached_property
+    def drift_reference(self):
+        """
+        Training distribution sketch for drift monitoring (Gaussian from the scaler if none was stored).
+        """
+        return self.extras.get("drift_reference") or reference_from_scaler(self.scaler)
 
 class NurosEnsemblePipeline:
     def __init__(self):
@@ -31,39 +134,46 @@ class NurosEnsemblePipeline:
         self.calibrated_model = CalibratedClassifierCV(self.ensemble, method='sigmoid', cv=3)
         
         self.is_trained = False
+        self.model_version = None
+
+        # "single_pass": every member evaluated once per calibrated fold (compiled engine);
+        # "legacy": sklearn predict_proba + re-run of fold 0's members for the variance;
+        # "cascade": linear screen first, single_pass ensemble only inside cascade_band;
+        # "distilled": compact student network only (see distill_student), ensemble if none is fitted
+        self.scoring_mode = "single_pass"
+        self.cascade_band = DEFAULT_AMBIGUITY_BAND
+
+        # Live input drift against the served model's training distribution (fed by predict_signal)
+        self.monitor_drift = True
+        self.drift_monitor = None
+        self._active = None
+        self._swap_lock = threading.Lock()
+        self.updater = None
         
         # Mapping for mock deep learning embeddings
         self.dl_mock_enabled = True
+        self.embedding_store = embedding_store
 
     def get_wav2vec_embeddings(self, audio_path):
         """
-        Extracts deep learning embeddings.
-        Currently MOCKED to prevent downloading heavy multi-GB HuggingFace models locally.
+        Extracts deep learning embeddings, looked up by audio content hash in the embedding store.
+        Currently MOCKED (see MockEmbeddingBackend) to prevent downloading heavy multi-GB HuggingFace models locally.
         In production, this would use: `transformers.Wav2Vec2Processor` and `Wav2Vec2Model`.
         """
-        # Returns a mock 128-dimensional embedding vector representing the pooled hidden states
-        np.random.seed(hash(audio_path) % 2**32)
-        return np.random.normal(loc=0.0, scale=0.1, size=(128,))
+        if self.embedding_store.dim != EMBEDDING_DIM:
+            raise ValueError(f"Embedding backend produces {self.embedding_store.dim} dims, model expects {EMBEDDING_DIM}.")
+        return self.embedding_store.get(audio_path)
 
     def combine_features(self, acoustic_features, dl_embeddings):
         """
         Fuses handcrafted acoustic features (jitter, shimmer, MFCCs) with DL embeddings.
         """
         # Extract numerical values from the acoustic features dict
-        core_features = [
-            acoustic_features.get("jitter_percent", 0.5),
-            acoustic_features.get("shimmer_percent", 2.0),
-            acoustic_features.get("hnr_db", 20.0),
-            acoustic_features.get("f0_std", 15.0),
-            acoustic_features.get("f1_mean", 500.0),
-            acoustic_features.get("f2_mean", 1500.0),
-            acoustic_features.get("spectral_centroid", 1000.0),
-            acoustic_features.get("zcr", 0.05),
-            acoustic_features.get("cpp", 15.0)
-        ]
+        core_features = [acoustic_features.get(name, default) for name, default in CORE_FEATURES]
         
-        # Add MFCC mean array if available
-        mfccs = acoustic_features.get("mfcc_mean", np.zeros(13).tolist())
+        # Add MFCC mean array if available (truncated/padded to the trained width)
+        mfccs = list(acoustic_features.get("mfcc_mean", np.zeros(N_MODEL_MFCC).tolist()))[:N_MODEL_MFCC]
+        mfccs += [0.0] * (N_MODEL_MFCC - len(mfccs))
         core_features.extend(mfccs)
         
         # Concatenate with DL embeddings
@@ -76,59 +186,364 @@ class NurosEnsemblePipeline:
         """
         print("Training Nuros Ensemble Pipeline...")
         # Generate dummy dataset with 150 features (22 acoustic + 128 embedding)
-        X_train = np.random.rand(100, 150)
+        X_train = np.random.rand(100, len(FEATURE_SCHEMA))
         # Binary target: 0 = Healthy/Normal, 1 = Elevated Risk Signal
         y_train = np.random.randint(0, 2, 100)
         
-        X_scaled = self.scaler.fit_transform(X_train)
-        self.calibrated_model.fit(X_scaled, y_train)
-        self.is_trained = True
+        # Fit fresh copies and swap them in, so the served model is never half-trained
+        scaler = clone(self.scaler)
+        calibrated_model = clone(self.calibrated_model)
+        X_scaled = scaler.fit_transform(X_train)
+        calibrated_model.fit(X_scaled, y_train)
+        self.swap_model(scaler, calibrated_model)
         print("Ensemble calibrated and ready.")
 
-    def predict_signal(self, acoustic_features, audio_path):
+    def model_bundle(self):
+        bundle = {"scaler": self.scaler, "calibrated_model": self.calibrated_model}
+        snapshot = self._active
+        if snapshot is not None and snapshot.calibrated_model is self.calibrated_model:
+            bundle.update(snapshot.extras)
+        return bundle
+
+    def save_model(self, version=None, directory=None, metadata=None):
         """
-        Returns a calibrated score (0-100), uncertainty interval, and top features.
+        Persists the fitted scaler + calibrated ensemble as a versioned artifact.
         """
-        if not self.is_trained:
-            self.train_mock_model()
+        manifest = save_artifact(self.model_bundle(), FEATURE_SCHEMA, version=version, directory=directory, metadata=metadata)
+        self.model_version = manifest["version"]
+        snapshot = self._active
+        if snapshot is not None and snapshot.calibrated_model is self.calibrated_model:
+            snapshot.version = manifest["version"]
+        return manifest
 
-        dl_embeddings = self.get_wav2vec_embeddings(audio_path)
-        fused_vector = self.combine_features(acoustic_features, dl_embeddings)
-        
-        # Reshape for prediction
-        X = fused_vector.reshape(1, -1)
-        X_scaled = self.scaler.transform(X)
-        
-        # Calibrated Probability
-        prob = self.calibrated_model.predict_proba(X_scaled)[0][1]
-        calibrated_score = prob * 100
-        
-        # Uncertainty Estimation (variance across the ensemble estimators)
-        # We access the underlying fitted ensemble to get individual predictions
-        ensemble_model = self.calibrated_model.calibrated_classifiers_[0].estimator
-        preds = []
-        for name, estimator in ensemble_model.named_estimators_.items():
-            # Using predict_proba if available
-            preds.append(estimator.predict_proba(X_scaled)[0][1])
-            
-        variance = np.var(preds)
-        
-        if variance < 0.01:
-            confidence = "High Confidence"
-        elif variance < 0.05:
-            confidence = "Medium Confidence"
+    def load_model(self, version=None, directory=None, mmap=True):
+        """
+        Loads a stored artifact (latest by default). Raises ModelSchemaMismatch if it was
+        trained on a different fused-feature schema.
+        """
+        bundle, manifest = load_artifact(FEATURE_SCHEMA, version=version, directory=directory, mmap=mmap)
+        extras = {name: component for name, component in bundle.items() if name not in ("scaler", "calibrated_model")}
+        self.swap_model(bundle["scaler"], bundle["calibrated_model"], manifest["version"], extras, manifest.get("metadata"))
+        return manifest
+
+    def swap_model(self, scaler, calibrated_model, version=None, extras=None, metadata=None):
+        """
+        Atomically replaces the served model. The new version is compiled before the swap,
+        and in-flight requests finish on the snapshot they already hold.
+        """
+        snapshot = ModelSnapshot(scaler, calibrated_model, version, extras, metadata)
+        with self._swap_lock:
+            self._active = snapshot
+            self.scaler = scaler
+            self.calibrated_model = calibrated_model
+            self.model_version = version
+            self.is_trained = True
+        return snapshot
+
+    def active_model(self):
+        """
+        Snapshot of the served model (rebuilt if scaler / calibrated_model were reassigned directly).
+        """
+        snapshot = self._active
+        if snapshot is None or snapshot.calibrated_model is not self.calibrated_model or snapshot.scaler is not self.scaler:
+            with self._swap_lock:
+                snapshot = self._active
+                if snapshot is None or snapshot.calibrated_model is not self.calibrated_model or snapshot.scaler is not self.scaler:
+                    snapshot = self._active = ModelSnapshot(self.scaler, self.calibrated_model, self.model_version)
+        return snapshot
+
+    def export_engine(self, path=None):
+        """
+        Compiles the fitted ensemble into an sklearn-free CompiledEnsemble (optionally saved as .npz).
+        """
+        self.ensure_model()
+        engine = compile_ensemble(self)
+        if path:
+            engine.save(path)
+        return engine
+
+    def partial_fit(self, acoustic_features, labels, audio_paths=None, **updater_options):
+        """
+        Incremental update from newly labeled recordings (feature dicts or a fused matrix).
+        The first call creates the pipeline's OnlineUpdater with `updater_options`.
+        """
+        if self.updater is None:
+            self.updater = OnlineUpdater(self, **updater_options)
+        if isinstance(acoustic_features, np.ndarray):
+            X = np.atleast_2d(acoustic_features)
+        else:
+            X = self.fuse_batch(list(acoustic_features), audio_paths)
+        self.updater.partial_fit(X, labels)
+        return self.updater.stats
+
+    def distill_student(self, X=None, **distill_options):
+        """
+        Distills the served ensemble into a compact student (see distillation.distill) over raw
+        fused vectors X (optional) plus augmented ones, and swaps it in with the current version.
+        Returns the student; select it with scoring_mode = "distilled".
+        """
+        self.ensure_model()
+        snapshot = self.active_model()
+        X_scaled = None if X is None else snapshot.transform(np.atleast_2d(X))
+        student = distill(snapshot.engine, X_scaled, **distill_options)
+        extras = dict(snapshot.extras, student=student, screen=snapshot.screen, drift_reference=snapshot.drift_reference)
+        self.swap_model(snapshot.scaler, snapshot.calibrated_model, snapshot.version, extras, snapshot.metadata)
+        return student
+
+    def drift_report(self, top_k=10):
+        """
+        Per-feature drift of the scans seen since the served model was loaded.
+        """
+        monitor = self.drift_monitor
+        if monitor is None:
+            return {"status": "insufficient_data", "observations": 0, "features": []}
+        return monitor.report(top_k)
+
+    def _monitor_drift(self, fused_vector, snapshot):
+        monitor = self.drift_monitor
+        if monitor is None or monitor.reference is not snapshot.drift_reference:
+            # A new model version brings its own reference; start a fresh sketch
+            monitor = self.drift_monitor = DriftMonitor(snapshot.drift_reference, FEATURE_SCHEMA)
+        monitor.update(fused_vector)
+
+    def compiled_engine(self):
+        """
+        Compiled engine for the model currently served.
+        """
+        return self.active_model().engine
+
+    def attribution_engine(self):
+        return self.active_model().attributor
+
+    def explain_scaled(self, X_scaled, top_k=N_TOP_DRIVERS, snapshot=None, paths=None):
+        """
+        Top drivers of each scaled fused row: a list of {driver label: contribution} dicts,
+        ordered by magnitude (contributions in probability units, relative to the training mean).
+        Each row is explained by the model that scored it (`paths`, default "ensemble").
+        """
+        snapshot = snapshot or self.active_model()
+        if paths is None or (paths == "ensemble").all():
+            attributions = snapshot.attributor.explain_scaled(X_scaled)
         else:
-            confidence = "Low Confidence (High Uncertainty)"
+            attributions = np.empty(X_scaled.shape)
+            explainers = {"ensemble": snapshot.attributor.explain_scaled}
+            for path in np.unique(paths):
+                rows = paths == path
+                explain = explainers.get(path) or getattr(snapshot, path).explain
+                attributions[rows] = explain(X_scaled[rows])
+        return [dict(top_drivers(row, FEATURE_LABELS, DRIVER_GROUPS, top_k)) for row in attributions]
 
-        # Mock SHAP explainability
-        top_features = ["Jitter (Micro-Tremor)", "F0 Variance (Prosody)", "MFCC_2 (Vocal Tract Shape)"]
+    def _score_scaled(self, X_scaled, trace, snapshot):
+        """
+        Scores a scaled (N, D) matrix. Returns per-row calibrated probability, uncertainty
+        variance, fold variance, per-member probabilities (member name -> (N,)) and the
+        path that produced each score ("ensemble", "screen" or "student").
+        """
+        n_rows = X_scaled.shape[0]
+        if self.scoring_mode == "distilled" and snapshot.student is not None:
+            with trace.stage("student_inference"):
+                probs = snapshot.student.predict_proba(X_scaled)
+            # No member disagreement is measured: the uncertainty reported is the student's
+            # distillation residual against the ensemble, and there are no folds
+            variances = np.full(n_rows, snapshot.student.residual_variance)
+            members = {name: np.full(n_rows, np.nan) for name in MEMBER_NAMES}
+            return probs, variances, np.full(n_rows, np.nan), members, np.full(n_rows, "student")
+        if self.scoring_mode != "cascade":
+            return self._ensemble_scaled(X_scaled, trace, snapshot) + (np.full(n_rows, "ensemble"),)
+
+        with trace.stage("screen"):
+            probs = snapshot.screen.predict_proba(X_scaled)
+            low, high = self.cascade_band
+            ambiguous = (probs >= low) & (probs <= high)
+        # Screened rows skip the ensemble: no member disagreement was measured for them, so
+        # their uncertainty is NaN (and their band "Screened"), never a fabricated zero
+        variances = np.full(n_rows, np.nan)
+        fold_variances = np.full(n_rows, np.nan)
+        members = {name: np.full(n_rows, np.nan) for name in MEMBER_NAMES}
+        if ambiguous.any():
+            ensemble_probs, ensemble_variances, ensemble_fold_variances, ensemble_members = \
+                self._ensemble_scaled(X_scaled[ambiguous], trace, snapshot)
+            probs[ambiguous] = ensemble_probs
+            variances[ambiguous] = ensemble_variances
+            fold_variances[ambiguous] = ensemble_fold_variances
+            for name, member_probs in ensemble_members.items():
+                members[name][ambiguous] = member_probs
+        return probs, variances, fold_variances, members, np.where(ambiguous, "ensemble", "screen")
+
+    def _ensemble_scaled(self, X_scaled, trace, snapshot):
+        """
+        Full calibrated ensemble plus uncertainty: (probs, variances, fold variances, members).
+        """
+        if self.scoring_mode == "legacy":
+            with trace.stage("ensemble_inference"):
+                probs = snapshot.calibrated_model.predict_proba(X_scaled)[:, 1]
+            with trace.stage("uncertainty"):
+                # Variance across the members of the first calibrated fold
+                ensemble_model = snapshot.calibrated_model.calibrated_classifiers_[0].estimator
+                member_probs = np.vstack([
+                    estimator.predict_proba(X_scaled)[:, 1]
+                    for estimator in ensemble_model.named_estimators_.values()
+                ])
+                variances = member_probs.var(axis=0)
+            members = dict(zip(ensemble_model.named_estimators_, member_probs))
+            return probs, variances, np.zeros_like(probs), members
+
+        engine = snapshot.engine
+        with trace.stage("ensemble_inference"):
+            # One traversal: every member in every fold, shape (folds, members, N)
+            fold_member_probs = engine.member_probabilities(X_scaled)
+            probs, fold_calibrated = engine.calibrate(fold_member_probs)
+        with trace.stage("uncertainty"):
+            n_rows = X_scaled.shape[0]
+            # Disagreement across all fold x member predictions, not just fold 0's members
+            variances = fold_member_probs.reshape(-1, n_rows).var(axis=0)
+            fold_variances = fold_calibrated.var(axis=0)
+            members = dict(zip(MEMBER_NAMES, fold_member_probs.mean(axis=0)))
+        return probs, variances, fold_variances, members
+
+    def load_model_if_available(self, directory=None):
+        """
+        Startup hook: loads the latest compatible artifact if one exists. Returns True on success.
+        """
+        if latest_version(directory) is None:
+            return False
+        try:
+            self.load_model(directory=directory)
+            return True
+        except (ModelSchemaMismatch, OSError) as e:
+            print(f"Stored model not loaded: {e}")
+            return False
+
+    def ensure_model(self):
+        """
+        Makes sure a fitted model is in memory: stored artifact first, training as a last resort.
+        A freshly trained model is persisted so later processes skip the cold-start fit.
+        """
+        if self.is_trained or self.load_model_if_available():
+            return
+        self.train_mock_model()
+        try:
+            self.save_model(metadata={"source": "train_mock_model"})
+        except OSError as e:
+            print(f"Trained model not persisted ({model_dir()}): {e}")
+
+    def predict_signal(self, acoustic_features, audio_path, trace=None, on_stage=None):
+        """
+        Returns a calibrated score (0-100), uncertainty interval, and top features (with their attributions).
+        Stage timings are returned under "stage_timings" (and recorded on `trace` if given).
+        """
+        trace = resolve_trace(trace, on_stage)
+        with profile_request("predict_signal"):
+            if not self.is_trained:
+                with trace.stage("model_loading"):
+                    self.ensure_model()
+            snapshot = self.active_model()
+
+            with trace.stage("embedding"):
+                dl_embeddings = self.get_wav2vec_embeddings(audio_path)
+            with trace.stage("feature_fusion"):
+                fused_vector = self.combine_features(acoustic_features, dl_embeddings)
+                
+                # Reshape for prediction
+                X = fused_vector.reshape(1, -1)
+                X_scaled = snapshot.transform(X)
+
+            if self.monitor_drift:
+                with trace.stage("drift_monitor"):
+                    self._monitor_drift(fused_vector, snapshot)
+            
+            probs, variances, fold_variances, members, paths = self._score_scaled(X_scaled, trace, snapshot)
+            calibrated_score = probs[0] * 100
+            variance = variances[0]
+            
+            confidence = confidence_band(variance, paths[0])
+
+            with trace.stage("attribution"):
+                attributions = self.explain_scaled(X_scaled, snapshot=snapshot, paths=paths)[0]
         
         return {
             "calibrated_score": float(calibrated_score),
             "uncertainty_variance": float(variance),
             "confidence_band": confidence,
-            "top_contributing_features": top_features
+            "top_contributing_features": list(attributions),
+            "feature_attributions": attributions,
+            "fold_variance": float(fold_variances[0]),
+            "member_probabilities": {name: float(p[0]) for name, p in members.items()} if paths[0] == "ensemble" else {},
+            "inference_path": str(paths[0]),
+            "model_version": snapshot.version,
+            "stage_timings": trace.as_dict()
+        }
+
+    def fuse_batch(self, acoustic_features_list, audio_paths=None):
+        """
+        Builds the (N, D) fused matrix for N feature dicts (missing embeddings for `audio_paths` computed in one batch).
+        """
+        if audio_paths is None:
+            audio_paths = ["mock.wav"] * len(acoustic_features_list)
+        embeddings = self.embedding_store.get_many(audio_paths)
+        X = np.empty((len(acoustic_features_list), len(FEATURE_SCHEMA)))
+        for i, features in enumerate(acoustic_features_list):
+            X[i] = self.combine_features(features, embeddings[i])
+        return X
+
+    def predict_signal_batch(self, acoustic_features, audio_paths=None, trace=None, on_stage=None):
+        """
+        Scores N recordings at once. `acoustic_features` is either a list of feature dicts
+        (fused with embeddings for `audio_paths`) or an already fused (N, D) matrix.
+        Returns the same keys as predict_signal, each holding one entry per row, computed
+        with a single scaler pass and one scoring pass over the whole matrix.
+        """
+        trace = resolve_trace(trace, on_stage)
+        with profile_request("predict_signal_batch"):
+            if not self.is_trained:
+                with trace.stage("model_loading"):
+                    self.ensure_model()
+            snapshot = self.active_model()
+
+            with trace.stage("feature_fusion"):
+                if isinstance(acoustic_features, np.ndarray):
+                    X = np.atleast_2d(np.asarray(acoustic_features, dtype=float))
+                else:
+                    X = self.fuse_batch(list(acoustic_features), audio_paths)
+                if X.shape[1] != len(FEATURE_SCHEMA):
+                    raise ValueError(f"Expected {len(FEATURE_SCHEMA)} fused features per row, got {X.shape[1]}.")
+                X_scaled = snapshot.transform(X)
+
+            probs, variances, fold_variances, members, paths = self._score_scaled(X_scaled, trace, snapshot)
+
+            with trace.stage("attribution"):
+                attributions = self.explain_scaled(X_scaled, snapshot=snapshot, paths=paths)
+
+        return {
+            "calibrated_score": probs * 100,
+            "uncertainty_variance": variances,
+            "confidence_band": [confidence_band(v, path) for v, path in zip(variances, paths)],
+            "top_contributing_features": [list(row) for row in attributions],
+            "feature_attributions": attributions,
+            "fold_variance": fold_variances,
+            "member_probabilities": members,
+            "inference_path": paths.tolist(),
+            "model_version": snapshot.version,
+            "stage_timings": trace.as_dict()
         }
 
-# Singleton instance
+def confidence_band(variance, path="ensemble"):
+    """
+    Maps ensemble disagreement (variance of member probabilities) to a confidence label.
+    Rows the cascade screen scored on its own (`path` "screen") have no measured
+    disagreement and are labelled "Screened"; rows scored by the distilled student
+    ("student") carry its distillation residual instead and are labelled "Distilled".
+    """
+    if path == "screen":
+        return "Screened"
+    if path == "student":
+        return "Distilled"
+    if variance < 0.01:
+        return "High Confidence"
+    elif variance < 0.05:
+        return "Medium Confidence"
+    return "Low Confidence (High Uncertainty)"
+
+# Singleton instance (loads the latest stored artifact at startup when one exists)
 pipeline = NurosEnsemblePipeline()
+pipeline.load_model_if_available()
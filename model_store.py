@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+import threading
+import warnings
+from datetime import datetime, timedelta
+import joblib
+import sklearn
+
+# Override the artifact directory (default: ./models)
+MODEL_DIR_ENV = "NUROS_MODEL_DIR"
+DEFAULT_MODEL_DIR = "models"
+MODEL_FILE = "model.joblib"
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+REPORT_FILE = "training_report.json"
+
+class ModelSchemaMismatch(ValueError):
+    """
+    Raised when a stored artifact was trained on a different fused-feature layout.
+    """
+
+def model_dir(directory=None):
+    return directory or os.environ.get(MODEL_DIR_ENV, DEFAULT_MODEL_DIR)
+
+def schema_hash(feature_names):
+    """
+    Stable fingerprint of the ordered fused-feature schema the model consumes.
+    """
+    payload = json.dumps(list(feature_names), separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+# Version ids are UTC timestamps; microseconds keep back-to-back publishes distinct and sortable
+VERSION_FORMAT = "%Y%m%d-%H%M%S-%f"
+_version_lock = threading.Lock()
+_last_version = None
+
+def new_version():
+    """
+    A new version id, strictly increasing within the process even for same-microsecond calls.
+    """
+    global _last_version
+    with _version_lock:
+        now = datetime.utcnow()
+        if _last_version is not None and now <= _last_version:
+            now = _last_version + timedelta(microseconds=1)
+        _last_version = now
+        return now.strftime(VERSION_FORMAT)
+
+def save_artifact(bundle, feature_names, version=None, directory=None, metadata=None):
+    """
+    Persists a fitted model bundle (e.g. {"scaler": ..., "calibrated_model": ...}) as
+    <dir>/<version>/model.joblib plus a manifest, then points LATEST at it.
+    The bundle is stored uncompressed so its NumPy arrays can be memory-mapped on load.
+    Returns the manifest.
+    """
+    directory = model_dir(directory)
+    version = version or new_version()
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    joblib.dump(bundle, os.path.join(version_dir, MODEL_FILE))
+    manifest = {
+        "version": version,
+        "schema_hash": schema_hash(feature_names),
+        "n_features": len(feature_names),
+        "created_at": datetime.utcnow().isoformat(),
+        "sklearn_version": sklearn.__version__,
+        "components": sorted(bundle),
+    }
+    if metadata:
+        manifest["metadata"] = metadata
+    _write_atomic(os.path.join(version_dir, MANIFEST_FILE), json.dumps(manifest, indent=2))
+    _write_atomic(os.path.join(directory, LATEST_FILE), version)
+    return manifest
+
+def save_report(version, report, directory=None):
+    """
+    Writes a JSON report (e.g. training timings and metrics) next to a stored version.
+    """
+    path = os.path.join(model_dir(directory), version, REPORT_FILE)
+    _write_atomic(path, json.dumps(report, indent=2, default=float))
+    return path
+
+def latest_version(directory=None):
+    path = os.path.join(model_dir(directory), LATEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read().strip() or None
+
+def list_versions(directory=None):
+    directory = model_dir(directory)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.exists(os.path.join(directory, name, MANIFEST_FILE))
+    )
+
+def load_manifest(version=None, directory=None):
+    directory = model_dir(directory)
+    version = version or latest_version(directory)
+    if version is None:
+        raise FileNotFoundError(f"No model artifact found in '{directory}'.")
+    with open(os.path.join(directory, version, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+def load_artifact(feature_names, version=None, directory=None, mmap=True):
+    """
+    Loads a stored bundle, refusing it if its schema hash does not match `feature_names`.
+    With mmap=True the arrays are memory-mapped read-only, so worker processes loading
+    the same version share those pages instead of each holding a private copy.
+    Returns (bundle, manifest).
+    """
+    directory = model_dir(directory)
+    manifest = load_manifest(version, directory)
+    expected = schema_hash(feature_names)
+    if manifest["schema_hash"] != expected:
+        raise ModelSchemaMismatch(
+            f"Model '{manifest['version']}' expects feature schema {manifest['schema_hash']} "
+            f"({manifest['n_features']} features), but the pipeline produces {expected} ({len(feature_names)} features)."
+        )
+    if manifest.get("sklearn_version") != sklearn.__version__:
+        warnings.warn(
+            f"Model '{manifest['version']}' was saved with scikit-learn {manifest.get('sklearn_version')}, "
+            f"running {sklearn.__version__}."
+        )
+
+    bundle = joblib.load(os.path.join(directory, manifest["version"], MODEL_FILE), mmap_mode="r" if mmap else None)
+    return bundle, manifest
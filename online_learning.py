@@ -0,0 +1,348 @@
+import copy
+import os
+import threading
+from collections import deque
+import numpy as np
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.frozen import FrozenEstimator
+from types import SimpleNamespace
+from model_store import new_version
+from inference_engine import compile_ensemble, masked_transform
+from cascade import fit_screen
+from distillation import distill
+
+class RunningMoments:
+    """
+    Per-feature count, mean and sum of squared deviations (Welford), merged one batch at
+    a time with the parallel form of the update so a batch costs O(N * D) vectorized.
+    """
+
+    def __init__(self, count, mean, m2):
+        self.count = float(count)
+        self.mean = np.array(mean, dtype=np.float64)
+        self.m2 = np.array(m2, dtype=np.float64)
+
+    @classmethod
+    def from_scaler(cls, scaler):
+        count = float(np.max(scaler.n_samples_seen_))
+        return cls(count, scaler.mean_, scaler.var_ * count)
+
+    def update(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        n = X.shape[0]
+        if n == 0:
+            return
+        batch_mean = X.mean(axis=0)
+        batch_m2 = ((X - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def variance(self):
+        return self.m2 / self.count if self.count else np.zeros_like(self.m2)
+
+    def to_scaler(self, template):
+        """
+        A fitted StandardScaler (configured like `template`) holding these moments.
+        """
+        scaler = clone(template)
+        std = np.sqrt(self.variance)
+        scaler.mean_ = self.mean.copy()
+        scaler.var_ = self.variance.copy()
+        scaler.scale_ = np.where(std < 10 * np.finfo(np.float64).eps, 1.0, std)
+        scaler.n_samples_seen_ = int(self.count)
+        scaler.n_features_in_ = self.mean.shape[0]
+        return scaler
+
+def _set_tree_thresholds(tree, feature_ratio, feature_offset):
+    # Tree nodes are only writable through the pickle state
+    state = tree.__getstate__()
+    nodes = state["nodes"].copy()
+    split = nodes["left_child"] != -1
+    features = nodes["feature"][split]
+    nodes["threshold"][split] = (nodes["threshold"][split] - feature_offset[features]) / feature_ratio[features]
+    state["nodes"] = nodes
+    tree.__setstate__(state)
+
+def reparameterize_members(voting, old_scaler, new_scaler):
+    """
+    Rewrites a fitted VotingClassifier's members for new scaler statistics so every
+    member computes exactly the same function of the raw fused vector as before.
+    With x_old = x_new * r + c (r = s_new / s_old, c = (m_new - m_old) / s_old):
+    LR weights and the MLP input layer absorb r and c, and GBT split thresholds move to
+    (t - c) / r.
+    """
+    ratio = new_scaler.scale_ / old_scaler.scale_
+    offset = (new_scaler.mean_ - old_scaler.mean_) / old_scaler.scale_
+    members = voting.named_estimators_
+
+    lr = members["lr"]
+    lr.intercept_ = np.array(lr.intercept_ + lr.coef_ @ offset)
+    lr.coef_ = np.array(lr.coef_ * ratio)
+
+    mlp = members["nn"]
+    mlp.intercepts_[0] = np.array(mlp.intercepts_[0] + offset @ mlp.coefs_[0])
+    mlp.coefs_[0] = np.array(mlp.coefs_[0] * ratio[:, None])
+
+    for tree in members["xgb"].estimators_[:, 0]:
+        _set_tree_thresholds(tree.tree_, ratio, offset)
+
+def _lr_partial_fit(lr, X_scaled, y, n_seen, learning_rate, epochs):
+    # Gradient steps on sklearn's objective (C * log-loss + L2 / 2), per-row normalized
+    w = np.array(lr.coef_[0], dtype=np.float64)
+    b = float(lr.intercept_[0])
+    for _ in range(epochs):
+        p = 1.0 / (1.0 + np.exp(-(X_scaled @ w + b)))
+        error = p - y
+        w -= learning_rate * (X_scaled.T @ error / len(y) + w / (lr.C * n_seen))
+        b -= learning_rate * error.mean()
+    lr.coef_ = w[None, :]
+    lr.intercept_ = np.array([b])
+
+class OnlineUpdater:
+    """
+    Incremental updates of a NurosEnsemblePipeline as clinical labels arrive.
+
+    Works on a private copy of the served model:
+      - scaler statistics are updated with RunningMoments, and every member is
+        re-expressed for the new statistics so the update alone changes no prediction;
+      - each fold's LR takes a few gradient steps and each fold's MLP a partial_fit on
+        the new batch (the boosted trees stay frozen until the next full retrain);
+      - every `recalibrate_every` labels (or on the schedule started with `start`) the
+        fold calibrators are refitted on the most recent `calibration_window` labeled
+        rows, and the copy is published with the pipeline's atomic `swap_model`.
+    The cascade screen and the distilled student approximate one particular ensemble, so
+    each publish refits them on the updated one (the student only if the base version
+    had one); the drift reference is carried over unchanged. Published versions also record
+    the label source position (dataset and label cursor) of the rows they include, so a
+    restarted DatasetLabelSource resumes after them.
+    The serving process keeps answering on the previous version until the swap.
+    """
+
+    def __init__(self, ensemble_pipeline, recalibrate_every=200, calibration_window=2000,
+                 lr_learning_rate=0.05, lr_epochs=5, directory=None, save=True):
+        self.pipeline = ensemble_pipeline
+        self.recalibrate_every = recalibrate_every
+        self.lr_learning_rate = lr_learning_rate
+        self.lr_epochs = lr_epochs
+        self.directory = directory
+        self.save = save
+        self._window_X = deque(maxlen=calibration_window)
+        self._window_y = deque(maxlen=calibration_window)
+        self._working = None
+        self._moments = None
+        self._base_version = None
+        self._extras = {}
+        self._distill = False
+        self._label_position = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.pending = 0
+        self.stats = {"rows_seen": 0, "batches": 0, "recalibrations": 0, "published": []}
+
+    def _ensure_working(self):
+        if self._working is None:
+            self.pipeline.ensure_model()
+            snapshot = self.pipeline.active_model()
+            self._working = (copy.deepcopy(snapshot.scaler), copy.deepcopy(snapshot.calibrated_model))
+            self._moments = RunningMoments.from_scaler(snapshot.scaler)
+            self._base_version = snapshot.version
+            # The training distribution reference still applies; screen and student are refitted at publish
+            if "drift_reference" in snapshot.extras:
+                self._extras = {"drift_reference": snapshot.extras["drift_reference"]}
+            self._distill = snapshot.student is not None
+            self._label_position = {key: snapshot.metadata[key] for key in ("dataset", "label_cursor") if key in snapshot.metadata}
+
+    def partial_fit(self, X, y, label_position=None):
+        """
+        Updates the working model from a labeled batch of raw fused vectors X (N, D) and
+        0/1 labels y. Recalibrates and publishes once enough labels have accumulated.
+        `label_position` is the label source position after this batch (see
+        DatasetLabelSource.position), persisted with the next published version.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        y = np.asarray(y, dtype=np.int64)
+        with self._lock:
+            self._ensure_working()
+            scaler, model = self._working
+            self._moments.update(X)
+            new_scaler = self._moments.to_scaler(scaler)
+            X_scaled = masked_transform(new_scaler, X)
+            for fold_classifier in model.calibrated_classifiers_:
+                voting = fold_classifier.estimator
+                reparameterize_members(voting, scaler, new_scaler)
+                members = voting.named_estimators_
+                _lr_partial_fit(members["lr"], X_scaled, y, self._moments.count, self.lr_learning_rate, self.lr_epochs)
+                members["nn"].partial_fit(X_scaled, y)
+            self._working = (new_scaler, model)
+            if label_position:
+                self._label_position = dict(label_position)
+
+            self._window_X.extend(X)
+            self._window_y.extend(y)
+            self.pending += len(y)
+            self.stats["rows_seen"] += len(y)
+            self.stats["batches"] += 1
+            due = self.recalibrate_every and self.pending >= self.recalibrate_every
+        if due:
+            self.recalibrate()
+
+    def recalibrate(self, publish=True):
+        """
+        Refits every fold's sigmoid calibrator on the recent labeled window, then publishes.
+        Skipped (returns False) until the window holds both classes.
+        """
+        with self._lock:
+            if self._working is None or len(set(self._window_y)) < 2:
+                return False
+            scaler, model = self._working
+            X_scaled = masked_transform(scaler, np.array(self._window_X))
+            y = np.array(self._window_y)
+            for fold_classifier in model.calibrated_classifiers_:
+                refit = CalibratedClassifierCV(FrozenEstimator(fold_classifier.estimator), method="sigmoid").fit(X_scaled, y)
+                fold_classifier.calibrators = refit.calibrated_classifiers_[0].calibrators
+            self.pending = 0
+            self.stats["recalibrations"] += 1
+            scaler, model = copy.deepcopy(self._working)
+            label_position = dict(self._label_position)
+        if publish:
+            self.publish(scaler, model, X_scaled=X_scaled, label_position=label_position)
+        return True
+
+    def refit_extras(self, scaler, calibrated_model, X_scaled=None):
+        """
+        Cascade screen, and the distilled student when the base version had one, fitted
+        against the given (updated) ensemble on scaled rows X_scaled (probes if None).
+        """
+        engine = compile_ensemble(SimpleNamespace(scaler=scaler, calibrated_model=calibrated_model))
+        extras = {"screen": fit_screen(engine, X_scaled)}
+        if self._distill:
+            extras["student"] = distill(engine, X_scaled)
+        return extras
+
+    def publish(self, scaler, calibrated_model, version=None, X_scaled=None, label_position=None):
+        """
+        Hot-swaps the given model into the pipeline, together with a screen / student
+        refitted for it, and (optionally) stores it as a new version. The version's metadata
+        carries `label_position` (the updater's current one if None).
+        """
+        version = version or new_version()
+        extras = dict(self._extras, **self.refit_extras(scaler, calibrated_model, X_scaled))
+        metadata = {
+            "source": "online_update",
+            "base_version": self._base_version,
+            "rows_seen": self.stats["rows_seen"],
+            **(self._label_position if label_position is None else label_position),
+        }
+        self.pipeline.swap_model(scaler, calibrated_model, version, extras, metadata)
+        if self.save:
+            try:
+                self.pipeline.save_model(version=version, directory=self.directory, metadata=metadata)
+            except OSError as e:
+                print(f"Online update not persisted: {e}")
+        self.stats["published"].append(version)
+        return version
+
+    # --- Schedule ---
+    def start(self, interval_sec=3600, source=None):
+        """
+        Background schedule: every `interval_sec`, pulls new labeled rows from `source`
+        (a callable returning (X, y), e.g. DatasetLabelSource) and recalibrates/publishes
+        if any labels arrived since the last publish.
+        """
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval_sec):
+                try:
+                    if source is not None:
+                        X, y = source()
+                        if len(y):
+                            self.partial_fit(X, y, label_position=getattr(source, "position", None))
+                    if self.pending:
+                        self.recalibrate()
+                except Exception as e:
+                    print(f"Scheduled model update failed: {e}")
+
+        self._thread = threading.Thread(target=loop, name="nuros-online-updater", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+class DatasetLabelSource:
+    """
+    Returns the research-dataset rows labeled since the last call, as fused (X, y).
+    Feature store rows are read in labeling order from a label-sequence cursor (see
+    FeatureStore.iter_labeled), so rows labeled or relabeled after they were stored are
+    picked up without re-reading unlabeled ones. A CSV has no label sequence and is
+    treated as append-only: its rows are consumed once, by row number.
+    Unless given, the cursor starts at the served model's "label_cursor" metadata for the
+    same dataset (set by train_from_dataset and by every OnlineUpdater publish), so rows
+    the model already learned from are not fed to it again.
+    """
+
+    def __init__(self, ensemble_pipeline, dataset_path=None, chunk_size=10000, cursor=None):
+        from feature_store import feature_store
+        from training import dataset_store
+        self.pipeline = ensemble_pipeline
+        self.dataset_path = os.path.abspath(dataset_path or feature_store.path)
+        self.chunk_size = chunk_size
+        self.cursor = cursor
+        self.store = dataset_store(self.dataset_path)
+
+    @property
+    def position(self):
+        return {"dataset": self.dataset_path, "label_cursor": self.cursor}
+
+    def _published_cursor(self):
+        self.pipeline.ensure_model()
+        metadata = self.pipeline.active_model().metadata
+        if metadata.get("dataset") == self.dataset_path:
+            return int(metadata.get("label_cursor", 0))
+        return 0
+
+    def _new_chunks(self):
+        # Yields (rows, cursor after the chunk)
+        if self.store is not None:
+            for rows in self.store.iter_labeled(self.cursor, self.chunk_size):
+                yield rows, rows[-1]["label_seq"]
+            return
+        from training import iter_dataset
+        row_id = 0
+        for chunk in iter_dataset(self.dataset_path, self.chunk_size):
+            first_id, row_id = row_id, row_id + len(chunk)
+            if row_id > self.cursor:
+                yield chunk[max(self.cursor - first_id, 0):], row_id
+
+    def __call__(self):
+        from training import fuse_rows, parse_label
+        if self.cursor is None:
+            self.cursor = self._published_cursor()
+        X_parts, y_parts = [], []
+        cursor = self.cursor
+        for rows, cursor in self._new_chunks():
+            labeled, labels = [], []
+            for row in rows:
+                label = parse_label(row.get("clinical_label"))
+                if label is not None:
+                    labeled.append(row)
+                    labels.append(label)
+            if labeled:
+                X_parts.append(fuse_rows(labeled, self.pipeline))
+                y_parts.append(np.array(labels))
+        # Advanced only once every chunk is fused, so a failed pull is retried in full
+        self.cursor = cursor
+        if not X_parts:
+            return np.empty((0, 0)), np.empty(0, dtype=np.int64)
+        return np.vstack(X_parts), np.concatenate(y_parts)
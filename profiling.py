@@ -0,0 +1,92 @@
+import cProfile
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+# Set to a directory path to write one cProfile dump per top-level request
+PROFILE_DIR_ENV = "NUROS_PROFILE_DIR"
+
+_active = threading.local()
+
+class PipelineTrace:
+    """
+    Structured per-stage timing for one analysis request.
+
+    Stages are timed with `with trace.stage("pitch"): ...`. Times are exclusive, so a
+    stage that triggers another (e.g. jitter forcing the PointProcess) is not double
+    counted, and repeated entries of the same stage accumulate. The optional callback
+    is invoked as callback(stage_name, seconds) every time a stage finishes.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._stages = {}
+        self._stack = []
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield self
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            exclusive = elapsed - child_time
+
+            entry = self._stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += exclusive
+            entry["calls"] += 1
+            if self.callback is not None:
+                self.callback(name, exclusive)
+
+    def seconds(self, name):
+        return self._stages.get(name, {}).get("seconds", 0.0)
+
+    def as_dict(self):
+        stages = [
+            {"stage": name, "ms": round(entry["seconds"] * 1000, 3), "calls": entry["calls"]}
+            for name, entry in self._stages.items()
+        ]
+        return {
+            "stages": stages,
+            "total_ms": round(sum(entry["seconds"] for entry in self._stages.values()) * 1000, 3)
+        }
+
+def resolve_trace(trace=None, callback=None):
+    """
+    Returns the caller's trace, or a fresh one wired to `callback`.
+    """
+    if trace is None:
+        return PipelineTrace(callback)
+    if callback is not None and trace.callback is None:
+        trace.callback = callback
+    return trace
+
+@contextmanager
+def profile_request(name):
+    """
+    Writes a cProfile dump for this request to $NUROS_PROFILE_DIR when that variable is set.
+    Nested requests (calculate_risk -> predict_signal) are covered by the outermost dump.
+    """
+    profile_dir = os.environ.get(PROFILE_DIR_ENV)
+    if not profile_dir or getattr(_active, "profiling", False):
+        yield
+        return
+
+    os.makedirs(profile_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    _active.profiling = True
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        _active.profiling = False
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        profiler.dump_stats(os.path.join(profile_dir, f"{name}-{stamp}-{uuid.uuid4().hex[:8]}.prof"))
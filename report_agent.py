@@ -9,6 +9,7 @@ from pypdf import PdfReader, PdfWriter
 import matplotlib.pyplot as plt
 import numpy as np
 import qrcode
+from profiling import resolve_trace, profile_request
 
 class PDF(FPDF):
     def header(self):
@@ -109,7 +110,16 @@ def generate_qr_code(patient_id, output_path="qr_code.png"):
     img.save(output_path)
     return output_path
 
-def generate_report(patient_id, date, stability_score, risk_data, explanations, profile=None, features=None, scribe_text="", output_filename="nuros_report.pdf"):
+def generate_report(patient_id, date, stability_score, risk_data, explanations, profile=None, features=None, scribe_text="", output_filename="nuros_report.pdf", trace=None, on_stage=None):
+    """
+    Renders the PDF report. Rendering time is recorded on `trace` (charts, layout and
+    PDF write as separate stages) and reported to `on_stage(stage, seconds)` if given.
+    """
+    trace = resolve_trace(trace, on_stage)
+    with profile_request("generate_report"), trace.stage("report_layout"):
+        return _render_report(patient_id, date, stability_score, risk_data, explanations, profile, features, scribe_text, output_filename, trace)
+
+def _render_report(patient_id, date, stability_score, risk_data, explanations, profile, features, scribe_text, output_filename, trace):
     if profile is None: profile = {}
     if features is None: features = {}
     
@@ -164,9 +174,10 @@ def generate_report(patient_id, date, stability_score, risk_data, explanations,
     
     # --- GRAPHS ROW ---
     y_before_graphs = pdf.get_y()
-    graph_path = generate_3d_graph(features)
-    spark_path = generate_sparkline(stability_score)
-    qr_path = generate_qr_code(patient_id)
+    with trace.stage("report_charts"):
+        graph_path = generate_3d_graph(features)
+        spark_path = generate_sparkline(stability_score)
+        qr_path = generate_qr_code(patient_id)
     
     pdf.image(graph_path, x=15, y=y_before_graphs, w=60)
     
@@ -257,7 +268,8 @@ def generate_report(patient_id, date, stability_score, risk_data, explanations,
     pdf.set_font('Helvetica', 'B', 8)
     pdf.cell(165, 20, "PHYSICIAN VERIFICATION ->", 0, 0, 'R')
     
-    pdf.output(output_filename)
+    with trace.stage("report_write"):
+        pdf.output(output_filename)
     # Clean up temp files
     for p in [graph_path, spark_path, qr_path]:
         if os.path.exists(p): os.remove(p)
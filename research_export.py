@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import time
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from feature_store import FeatureStore, feature_store
+
+EXPORT_DIR = "research_parquet"
+STATE_FILE = "_export_state.json"
+
+ACOUSTIC_COLUMNS = ["jitter", "shimmer", "hnr", "f0_std", "f1_mean", "f2_mean", "spectral_centroid", "cpp", "snr_db"]
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Export columns; month and task_type are hive partition keys (directory names, read back as categories)
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("timestamp", pa.timestamp("us")),
+        ("vocal_twin_hash", pa.string()),
+        ("age_normalized", pa.float32()),
+        ("gender", CATEGORY),
+    ]
+    + [(name, pa.float32()) for name in ACOUSTIC_COLUMNS]
+    + [
+        ("calibrated_score", pa.float32()),
+        ("clinical_label", CATEGORY),
+        ("month", pa.string()),
+        ("task_type", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([("month", pa.string()), ("task_type", pa.string())]), flavor="hive")
+
+# Rows per Parquet row group; each carries min/max/null-count statistics for pushdown
+ROW_GROUP_SIZE = 64 * 1024
+
+def _timestamps(values):
+    try:
+        return np.array(values, dtype="datetime64[us]")
+    except ValueError:
+        out = np.empty(len(values), dtype="datetime64[us]")
+        for i, value in enumerate(values):
+            try:
+                out[i] = np.datetime64(value, "us")
+            except ValueError:
+                out[i] = np.datetime64("NaT")
+        return out
+
+def _float32(records, column):
+    return np.array([np.nan if r.get(column) is None else r[column] for r in records], dtype=np.float32)
+
+def records_to_table(records):
+    """
+    Typed Arrow table for a list of feature store records, sorted by patient and time
+    so every row group's min/max statistics on vocal_twin_hash and timestamp are tight.
+    """
+    timestamps = _timestamps([r.get("timestamp") or "NaT" for r in records])
+    months = np.datetime_as_string(timestamps.astype("datetime64[M]"))
+    arrays = {
+        "id": pa.array([r["id"] for r in records], pa.int64()),
+        "timestamp": pa.array(timestamps, pa.timestamp("us")),
+        "vocal_twin_hash": pa.array([r.get("vocal_twin_hash") for r in records], pa.string()),
+        "age_normalized": pa.array(_float32(records, "age_normalized"), from_pandas=True),
+        "gender": pa.array([r.get("gender") or "Unknown" for r in records]).dictionary_encode(),
+        "calibrated_score": pa.array(_float32(records, "calibrated_score"), from_pandas=True),
+        "clinical_label": pa.array([r.get("clinical_label") for r in records], pa.string()).dictionary_encode(),
+        "month": pa.array(np.where(months == "NaT", "unknown", months).tolist(), pa.string()),
+        "task_type": pa.array([r.get("task_type") or "Unknown" for r in records], pa.string()),
+    }
+    for column in ACOUSTIC_COLUMNS:
+        arrays[column] = pa.array(_float32(records, column), from_pandas=True)
+    table = pa.table([arrays[field.name] for field in EXPORT_SCHEMA], schema=EXPORT_SCHEMA)
+    return table.sort_by([("vocal_twin_hash", "ascending"), ("timestamp", "ascending")])
+
+def _read_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"last_id": 0, "runs": []}
+
+def _write_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+def _write(table, out_dir, basename):
+    ds.write_dataset(
+        table, out_dir, format="parquet", partitioning=PARTITIONING, basename_template=basename + "-{i}.parquet",
+        existing_data_behavior="overwrite_or_ignore", max_rows_per_group=ROW_GROUP_SIZE,
+        min_rows_per_group=min(ROW_GROUP_SIZE, max(len(table), 1)),
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd", write_statistics=True),
+    )
+
+def export_dataset(store=feature_store, out_dir=EXPORT_DIR, incremental=True, chunk_size=200000):
+    """
+    Converts feature store records to Parquet files under `out_dir`, hive-partitioned by
+    month=YYYY-MM/task_type=<task>, with float32 acoustic columns, dictionary-encoded
+    (categorical) gender, task and label, and row-group statistics.
+
+    Incremental runs convert only records with an id above the last exported one and
+    add them as new files; a full run (incremental=False) rebuilds the directory.
+    Labels assigned after a record was exported are picked up by a full run or by
+    compact(..., store=...). Returns a summary of the run.
+    """
+    if isinstance(store, str):
+        store = FeatureStore(store)
+    state = _read_state(out_dir) if incremental else {"last_id": 0, "runs": []}
+    if not incremental and os.path.exists(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    after_id, rows = state["last_id"], 0
+    for chunk_index, records in enumerate(store.iter_records(chunk_size=chunk_size, after_id=after_id)):
+        _write(records_to_table(records), out_dir, f"part-{after_id:012d}-{chunk_index:05d}")
+        rows += len(records)
+        state["last_id"] = records[-1]["id"]
+    summary = {"from_id": after_id, "to_id": state["last_id"], "rows": rows,
+               "seconds": round(time.perf_counter() - start, 3), "finished_at": time.time()}
+    if rows:
+        state["runs"].append(summary)
+    _write_state(out_dir, state)
+    return summary
+
+def open_dataset(out_dir=EXPORT_DIR):
+    """
+    The export as a pyarrow Dataset. Filters on month/task_type prune directories,
+    other predicates are pushed down to row-group statistics, e.g.
+    open_dataset().to_table(columns=["jitter"], filter=(ds.field("month") == "2026-01")).
+    """
+    return ds.dataset(out_dir, format="parquet", partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+                      exclude_invalid_files=True)
+
+def compact(out_dir=EXPORT_DIR, store=None):
+    """
+    Rewrites each partition's incremental files as one sorted file with full-size row
+    groups. With `store`, clinical labels are refreshed from it on the way.
+    The compacted file is renamed into place before its sources are deleted, so a crash
+    can only leave duplicate rows (dropped by id on the next compaction), never lose any.
+    """
+    if isinstance(store, str):
+        store = FeatureStore(store)
+    start = time.perf_counter()
+    partitions = 0
+    for directory, _, files in sorted(os.walk(out_dir)):
+        parts = sorted(name for name in files if name.endswith(".parquet"))
+        if not parts or (len(parts) < 2 and store is None):
+            continue
+        table = pa.concat_tables(pq.read_table(os.path.join(directory, name), partitioning=None) for name in parts)
+        _, first = np.unique(table.column("id").to_numpy(), return_index=True)
+        if len(first) < len(table):
+            table = table.take(np.sort(first))
+        if store is not None:
+            table = _refresh_labels(table, store)
+        table = table.sort_by([("vocal_twin_hash", "ascending"), ("timestamp", "ascending")])
+        tmp_path = os.path.join(directory, "compacted.parquet.tmp")
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE, compression="zstd", write_statistics=True)
+        compacted = "part-compacted-0.parquet"
+        os.replace(tmp_path, os.path.join(directory, compacted))
+        for name in parts:
+            if name != compacted:
+                os.remove(os.path.join(directory, name))
+        partitions += 1
+    return {"partitions_rewritten": partitions, "seconds": round(time.perf_counter() - start, 3)}
+
+def _refresh_labels(table, store):
+    ids = table.column("id").to_numpy()
+    labels = store.labels_for(ids.tolist())
+    refreshed = pa.array([labels.get(int(i)) for i in ids], pa.string()).dictionary_encode()
+    return table.set_column(table.schema.get_field_index("clinical_label"), "clinical_label", refreshed)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the research feature store to partitioned Parquet.")
+    parser.add_argument("--store", default=feature_store.path)
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--full", action="store_true", help="Rebuild the export instead of appending new records")
+    parser.add_argument("--compact", action="store_true", help="Merge each partition's files afterwards")
+    parser.add_argument("--refresh-labels", action="store_true", help="With --compact, re-read clinical labels")
+    args = parser.parse_args(argv)
+
+    summary = export_dataset(args.store, args.out, incremental=not args.full)
+    print(f"exported {summary['rows']} records (ids {summary['from_id']}..{summary['to_id']}) "
+          f"in {summary['seconds']}s", file=sys.stderr)
+    if args.compact:
+        result = compact(args.out, args.store if args.refresh_labels else None)
+        print(f"compacted {result['partitions_rewritten']} partitions in {result['seconds']}s", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
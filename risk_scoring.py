@@ -1,15 +1,39 @@
 import random
 from womens_health import analyze_womens_health
 from ml_pipeline import pipeline
+from profiling import resolve_trace, profile_request
+from baseline_service import (PatientBaseline, multivariate_delta, MIN_SCANS, ALERT_P_VALUE, JITTER_DELTA_ALERT,
+                              BASELINE_LABELS)
 
-def calculate_risk(features, audio_path="mock.wav", mode="public"):
+def calculate_risk(features, audio_path="mock.wav", mode="public", trace=None, on_stage=None, life_stage=None):
     """
     Evaluates acoustic biomarkers using the Deep Learning Ensemble.
     Outputs safe 'Wellness Signals' for public, or 'Clinical Categories' for research mode.
     Strictly forbids disease probability percentages.
+    `audio_path` is the recording the deep embedding is computed from (a path, or the raw
+    bytes / decoded samples). With `life_stage`, the Women's Wellness calibration for that
+    stage is added under "womens_health".
+    Stage timings are recorded on `trace` if given, not returned, so cached results hold only scores.
     """
+    trace = resolve_trace(trace, on_stage)
+    with profile_request("calculate_risk"):
+        analysis = _calculate_risk(features, audio_path, mode, trace)
+        if life_stage is not None:
+            analysis["womens_health"] = analyze_womens_health(features, life_stage)
+        return analysis
+
+def risk_cache_namespace(life_stage, profile="full"):
+    """
+    feature_cache namespace for a risk result: the life stage, the extraction profile the
+    features came from and the served model version, so publishing a new model (load,
+    hot swap, online update) never serves scores cached under the previous one.
+    """
+    pipeline.ensure_model()
+    return f"risk:{life_stage}:{profile}:{pipeline.active_model().version}"
+
+def _calculate_risk(features, audio_path, mode, trace):
     # 1. Run through the ML Ensemble Pipeline
-    ensemble_results = pipeline.predict_signal(features, audio_path)
+    ensemble_results = pipeline.predict_signal(features, audio_path, trace=trace)
     calibrated_score = ensemble_results["calibrated_score"]
     confidence = ensemble_results["confidence_band"]
     top_features = ensemble_results["top_contributing_features"]
@@ -71,13 +95,42 @@ def calculate_risk(features, audio_path="mock.wav", mode="public"):
         "explainability_metrics": explainability
     }
 
-def calculate_longitudinal_delta(current_features, baseline_features):
+def calculate_longitudinal_delta(current_features, baseline_features, change=None):
     """
     Longitudinal tracking and change detection over time.
+    `baseline_features` is a Vocal Twin baseline from baseline_service (a PatientBaseline
+    or its {"n", "mean", "std"} dict), compared on every core measure at once; a flat
+    dict of baseline values falls back to the single jitter-ratio check. `change` is the
+    change_detection result for this scan; a change-point alarm takes precedence.
     """
+    if change and change["alarm"]:
+        drivers = ", ".join(change["drivers"]) or "multiple biomarkers"
+        return {
+            "alert": True,
+            "change_point": change,
+            "message": f"Longitudinal Tracking: Sustained change detected across recent scans (CUSUM {change['statistic']:.1f} > {change['threshold']:.1f}; {drivers}).",
+        }
+
     if not baseline_features:
         return {"alert": False, "message": "Baseline established. Insufficient longitudinal data for delta comparison."}
-        
+
+    if isinstance(baseline_features, PatientBaseline) or "mean" in baseline_features:
+        delta = multivariate_delta(current_features, baseline_features)
+        jitter_delta = delta["relative_change"].get("jitter_percent", 0.0)
+        drivers = sorted(delta["z_scores"].items(), key=lambda item: -abs(item[1]))[:3]
+        shifts = ", ".join(f"{BASELINE_LABELS[key]} {z:+.1f}σ" for key, z in drivers)
+        result = {"alert": False, "jitter_delta": jitter_delta, **delta}
+        if delta["n_baseline_scans"] < MIN_SCANS:
+            if jitter_delta > JITTER_DELTA_ALERT:
+                result.update(alert=True, message=f"Longitudinal Tracking: Detects >15% degradation in glottal stability (Jitter Delta: +{jitter_delta*100:.1f}%).")
+            else:
+                result["message"] = f"Longitudinal Tracking: Vocal Twin baseline building ({delta['n_baseline_scans']}/{MIN_SCANS} scans)."
+        elif delta["p_value"] < ALERT_P_VALUE or jitter_delta > JITTER_DELTA_ALERT:
+            result.update(alert=True, message=f"Longitudinal Tracking: Multi-biomarker deviation from the Vocal Twin baseline (D² = {delta['distance']:.1f} over {delta['n_baseline_scans']} scans; {shifts}).")
+        else:
+            result["message"] = "Longitudinal Tracking: Micro-fluctuations within nominal limits."
+        return result
+
     curr_jitter = current_features.get("jitter_percent", 0.0)
     base_jitter = baseline_features.get("jitter_percent", 0.0)
     
@@ -0,0 +1,69 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baseline_service import BASELINE_FEATURES
+from change_detection import ChangeDetector
+from feature_store import FeatureStore
+
+PATIENTS = ["patient-a", "patient-b", "patient-c"]
+
+def _histories(n_scans=24, seed=0):
+    # Interleaved scans; patient-a and patient-c shift three measures halfway through
+    rng = np.random.default_rng(seed)
+    center = {"jitter": 0.6, "shimmer": 2.5, "hnr": 20.0, "f0_std": 20.0, "f1_mean": 500.0,
+              "f2_mean": 1500.0, "spectral_centroid": 1200.0, "cpp": 15.0}
+    records = []
+    for scan in range(n_scans):
+        for p, patient_hash in enumerate(PATIENTS):
+            record = {column: value * (1.0 + 0.03 * rng.standard_normal()) for column, value in center.items()}
+            if patient_hash != "patient-b" and scan >= n_scans // 2:
+                record.update(jitter=record["jitter"] * 1.6, shimmer=record["shimmer"] * 1.4, hnr=record["hnr"] * 0.7)
+            record.update(vocal_twin_hash=patient_hash, timestamp=f"2026-01-{scan + 1:02d}T00:00:{p:02d}")
+            records.append(record)
+    return records
+
+def _features(record):
+    return {key: record[column] for key, column in BASELINE_FEATURES.items()}
+
+def _alert_fields(alerts):
+    return [(a["record_id"], a["timestamp"], a["scan"], round(a["statistic"], 9), a["drivers"]) for a in alerts]
+
+@pytest.fixture
+def stores(tmp_path):
+    records = _histories()
+    online, replayed = FeatureStore(str(tmp_path / "online.db")), FeatureStore(str(tmp_path / "replayed.db"))
+    online.append_many(records)
+    replayed.append_many(records)
+    return online, replayed
+
+def test_backfill_matches_online_updates(stores):
+    online, replayed = stores
+    online_detector, replay_detector = ChangeDetector(online), ChangeDetector(replayed)
+    for chunk in online.iter_records():
+        for record in chunk:
+            online_detector.update(record["vocal_twin_hash"], _features(record), record["timestamp"], record["id"])
+    summary = replay_detector.backfill(chunk_size=7)
+
+    assert summary["patients"] == len(PATIENTS)
+    assert any(alert["patient_hash"] == "patient-a" for alert in summary["alerts"])
+    for patient_hash in PATIENTS:
+        np.testing.assert_allclose(replay_detector.get(patient_hash).to_array(),
+                                   online_detector.get(patient_hash).to_array(), rtol=1e-12, atol=1e-12)
+        assert _alert_fields(replay_detector.alerts(patient_hash)) == _alert_fields(online_detector.alerts(patient_hash))
+
+def test_backfill_keeps_online_only_patients(stores):
+    _, replayed = stores
+    detector = ChangeDetector(replayed)
+    scans = [dict(_features(record), jitter_percent=record["jitter"] * (1.0 if i < 10 else 2.0))
+             for i, record in enumerate(_histories(seed=1)[::3])]
+    for i, features in enumerate(scans):
+        detector.update("online-only", features, f"2026-02-{i + 1:02d}T00:00:00")
+    state, alerts = detector.get("online-only").to_array(), detector.alerts("online-only")
+
+    detector.backfill()
+    np.testing.assert_array_equal(detector.get("online-only").to_array(), state)
+    assert detector.alerts("online-only") == alerts
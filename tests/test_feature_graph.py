@@ -0,0 +1,59 @@
+import os
+import sys
+import librosa
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_analysis import extract_features
+from benchmarks.synthetic_voice import synthesize_voice
+
+@pytest.fixture(scope="module")
+def voice():
+    y, sr = synthesize_voice(duration=2.0, seed=0)
+    features, graph_report = extract_features((y, sr), return_graph=True)
+    return y, sr, features, graph_report
+
+def _reference(y, sr):
+    # The pre-graph extractor: every librosa call runs its own STFT over the signal
+    mfccs = librosa.feature.mfcc(y=y, sr=sr, n_mfcc=40)
+    return {
+        "mfcc_mean": np.mean(mfccs, axis=1),
+        "mfcc_delta_mean": np.mean(librosa.feature.delta(mfccs), axis=1),
+        "mfcc_delta2_mean": np.mean(librosa.feature.delta(mfccs, order=2), axis=1),
+        "spectral_centroid": np.mean(librosa.feature.spectral_centroid(y=y, sr=sr)[0]),
+        "spectral_rolloff": np.mean(librosa.feature.spectral_rolloff(y=y, sr=sr)[0]),
+        "spectral_flux": np.mean(librosa.onset.onset_strength(y=y, sr=sr)),
+        "zcr": np.mean(librosa.feature.zero_crossing_rate(y)[0]),
+        "chroma_mean": np.mean(librosa.feature.chroma_stft(y=y, sr=sr), axis=1),
+    }
+
+@pytest.mark.parametrize("key", ["mfcc_mean", "mfcc_delta_mean", "mfcc_delta2_mean", "spectral_centroid",
+                                 "spectral_rolloff", "spectral_flux", "zcr", "chroma_mean"])
+def test_spectral_features_match_per_call_librosa(voice, key):
+    y, sr, features, _ = voice
+    expected = np.atleast_1d(_reference(y, sr)[key])
+    actual = np.atleast_1d(np.asarray(features[key], dtype=np.float64))
+    np.testing.assert_allclose(actual, expected, rtol=1e-4, atol=1e-4 * np.max(np.abs(expected)))
+
+def test_single_stft_pass(voice):
+    _, _, _, graph_report = voice
+    assert graph_report["stft_passes"] == 1
+    assert "mel_spectrogram" in graph_report["computed"]
+
+@pytest.mark.parametrize("key", ["mfcc_mean", "spectral_centroid", "zcr"])
+def test_fast_profile_keeps_model_inputs(voice, key):
+    y, sr, features, _ = voice
+    fast = extract_features((y, sr), profile="fast", lazy=True)
+    assert fast[key] == features[key]
+    assert len(fast["chroma_mean"]) == 12
+
+def test_fast_profile_features_score(voice):
+    from ml_pipeline import NurosEnsemblePipeline
+    y, sr, features, _ = voice
+    fast = extract_features((y, sr), profile="fast")
+    ensemble_pipeline = NurosEnsemblePipeline()
+    embedding = np.zeros(ensemble_pipeline.embedding_store.dim)
+    np.testing.assert_array_equal(ensemble_pipeline.combine_features(fast, embedding),
+                                  ensemble_pipeline.combine_features(features, embedding))
@@ -0,0 +1,69 @@
+import os
+import sys
+import warnings
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from inference_engine import MEMBER_NAMES, CompiledEnsemble, _sigmoid, compile_ensemble, masked_transform, parity_check
+from ml_pipeline import FEATURE_SCHEMA, ModelSnapshot, NurosEnsemblePipeline
+
+@pytest.fixture(scope="module")
+def fitted():
+    np.random.seed(0)
+    ensemble_pipeline = NurosEnsemblePipeline()
+    ensemble_pipeline.train_mock_model()
+    return ensemble_pipeline, compile_ensemble(ensemble_pipeline)
+
+def test_calibrated_parity_with_sklearn(fitted):
+    ensemble_pipeline, engine = fitted
+    X = np.random.default_rng(1).random((500, len(FEATURE_SCHEMA)))
+    assert parity_check(ensemble_pipeline, engine, X) < 1e-9
+
+def test_member_parity_with_sklearn(fitted):
+    ensemble_pipeline, engine = fitted
+    X_scaled = ensemble_pipeline.scaler.transform(np.random.default_rng(2).random((200, len(FEATURE_SCHEMA))))
+    fold_member_probs = engine.member_probabilities(X_scaled)
+    for fold, calibrated in enumerate(ensemble_pipeline.calibrated_model.calibrated_classifiers_):
+        members = calibrated.estimator.named_estimators_
+        for m, name in enumerate(MEMBER_NAMES):
+            np.testing.assert_allclose(fold_member_probs[fold, m], members[name].predict_proba(X_scaled)[:, 1],
+                                       rtol=0, atol=1e-9)
+
+def test_extreme_inputs_do_not_overflow(fitted):
+    ensemble_pipeline, engine = fitted
+    X = np.random.default_rng(3).normal(0.0, 1e6, (50, len(FEATURE_SCHEMA)))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        probs = engine.predict_proba(X)
+        assert parity_check(ensemble_pipeline, engine, X) < 1e-9
+    assert np.all((probs >= 0.0) & (probs <= 1.0))
+
+def test_sigmoid_saturates_without_warnings():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", RuntimeWarning)
+        p = _sigmoid(np.array([-1e6, -800.0, 0.0, 800.0, 1e6]))
+    np.testing.assert_allclose(p, [0.0, 0.0, 0.5, 1.0, 1.0], atol=1e-200)
+
+def test_untrained_columns_masked_in_compiled_engine(tmp_path):
+    # A column held constant in training (the placeholder embedding) must not move served scores
+    rng = np.random.default_rng(4)
+    X_train = rng.random((120, len(FEATURE_SCHEMA)))
+    X_train[:, -1] = 0.25
+    ensemble_pipeline = NurosEnsemblePipeline()
+    ensemble_pipeline.scaler.fit(X_train)
+    ensemble_pipeline.calibrated_model.fit(ensemble_pipeline.scaler.transform(X_train), rng.integers(0, 2, 120))
+    snapshot = ModelSnapshot(ensemble_pipeline.scaler, ensemble_pipeline.calibrated_model)
+
+    X = rng.random((50, len(FEATURE_SCHEMA)))
+    X[:, -1] = rng.normal(0.0, 100.0, 50)
+    served = ensemble_pipeline.calibrated_model.predict_proba(snapshot.transform(X))[:, 1]
+    np.testing.assert_allclose(snapshot.engine.predict_proba(X), served, rtol=0, atol=1e-9)
+    assert parity_check(ensemble_pipeline, snapshot.engine, X) < 1e-9
+    np.testing.assert_array_equal(masked_transform(ensemble_pipeline.scaler, X)[:, -1], 0.0)
+    assert np.all(snapshot.attributor.explain(X)[:, -1] == 0.0)
+
+    path = str(tmp_path / "engine.npz")
+    snapshot.engine.save(path)
+    np.testing.assert_allclose(CompiledEnsemble.load(path).predict_proba(X), served, rtol=0, atol=1e-9)
@@ -0,0 +1,357 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.frozen import FrozenEstimator
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss, roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder
+from sklearn.utils import Bunch
+from feature_store import FeatureStore, feature_store
+from ml_pipeline import NurosEnsemblePipeline, ModelSnapshot, CORE_FEATURES, N_MODEL_MFCC, FEATURE_SCHEMA
+from cascade import fit_screen
+from drift_monitor import reference_from_data
+from distillation import distill as distill_student
+from model_store import model_dir, save_report
+
+# Research dataset column -> fused-vector feature key
+DATASET_COLUMNS = {
+    "jitter": "jitter_percent",
+    "shimmer": "shimmer_percent",
+    "hnr": "hnr_db",
+    "f0_std": "f0_std",
+    "f1_mean": "f1_mean",
+    "f2_mean": "f2_mean",
+    "spectral_centroid": "spectral_centroid",
+    "zcr": "zcr",
+    "cpp": "cpp",
+}
+
+# Training rows sampled to fit the cascade screen's calibration and the drift reference
+REFERENCE_SAMPLE_ROWS = 20000
+
+# clinical_label values accepted as training targets; anything else (e.g. PENDING_VALIDATION) is skipped
+POSITIVE_LABELS = {"1", "positive", "elevated", "flagged"}
+NEGATIVE_LABELS = {"0", "negative", "healthy", "normal", "nominal"}
+
+CHECKPOINT_DIR = ".checkpoints"
+
+def parse_label(value):
+    value = (value or "").strip().lower()
+    if value in POSITIVE_LABELS:
+        return 1
+    if value in NEGATIVE_LABELS:
+        return 0
+    return None
+
+def _iter_csv(dataset_path, chunk_size):
+    with open(dataset_path, newline="") as f:
+        rows = []
+        for row in csv.DictReader(f):
+            rows.append(row)
+            if len(rows) == chunk_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+def dataset_store(dataset_path):
+    """
+    The FeatureStore behind `dataset_path` (the shared singleton for its own path), or None for a CSV.
+    """
+    if dataset_path.endswith(".csv"):
+        return None
+    return feature_store if os.path.abspath(dataset_path) == os.path.abspath(feature_store.path) else FeatureStore(dataset_path)
+
+def iter_dataset(dataset_path, chunk_size=10000):
+    """
+    Streams research records as lists of dicts, `chunk_size` at a time, from a CSV file
+    (".csv", e.g. a legacy export) or from a feature store database.
+    """
+    store = dataset_store(dataset_path)
+    if store is None:
+        return _iter_csv(dataset_path, chunk_size)
+    return store.iter_records(chunk_size=chunk_size)
+
+def iter_labeled_chunks(dataset_path, chunk_size=10000):
+    """
+    Streams the research dataset as lists of labeled rows (dicts), `chunk_size` at a time.
+    Yields (rows, labels, n_skipped) so unlabeled rows never reach memory in bulk.
+    """
+    rows, labels, skipped = [], [], 0
+    for chunk in iter_dataset(dataset_path, chunk_size):
+        for row in chunk:
+            label = parse_label(row.get("clinical_label"))
+            if label is None:
+                skipped += 1
+                continue
+            rows.append(row)
+            labels.append(label)
+            if len(rows) == chunk_size:
+                yield rows, labels, skipped
+                rows, labels, skipped = [], [], 0
+    if rows or skipped:
+        yield rows, labels, skipped
+
+def _column(rows, column, default):
+    out = np.full(len(rows), default, dtype=np.float64)
+    for i, row in enumerate(rows):
+        value = row.get(column)
+        if value not in (None, ""):
+            try:
+                out[i] = float(value)
+            except ValueError:
+                pass
+    return out
+
+def fuse_rows(rows, ensemble_pipeline):
+    """
+    Column-wise equivalent of combine_features for dataset rows: core measures from the
+    dataset columns (defaults when absent), ZCR and MFCC means from the zcr / mfcc_<i>
+    extras store_anonymized_features persists, and embeddings from the store keyed by an
+    optional audio_ref column. Raw audio is never stored in the dataset, so rows without
+    one share the placeholder embedding; columns left constant that way are held at their
+    training value when serving (inference_engine.untrained_columns).
+    """
+    X = np.empty((len(rows), len(FEATURE_SCHEMA)))
+    columns = {key: column for column, key in DATASET_COLUMNS.items()}
+    for j, (name, default) in enumerate(CORE_FEATURES):
+        X[:, j] = _column(rows, columns.get(name, name), default)
+    offset = len(CORE_FEATURES)
+    for i in range(N_MODEL_MFCC):
+        X[:, offset + i] = _column(rows, f"mfcc_{i}", 0.0)
+    audio_refs = [row.get("audio_ref") or "mock.wav" for row in rows]
+    X[:, offset + N_MODEL_MFCC:] = ensemble_pipeline.embedding_store.get_many(audio_refs)
+    return X
+
+def build_matrix(dataset_path, ensemble_pipeline, scaler, work_root, chunk_size=10000):
+    """
+    Streams dataset chunks into an on-disk float64 matrix while fitting `scaler`
+    incrementally, then standardizes the matrix in place chunk by chunk. Peak memory is
+    one chunk. Returns (run_dir, n_rows, n_skipped); run_dir is named by the content hash
+    of the fused data, so a rerun on unchanged data finds its earlier member checkpoints.
+    """
+    os.makedirs(work_root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix="build_", dir=work_root)
+    digest = hashlib.sha256()
+    n_rows, n_skipped = 0, 0
+    labels = []
+    with open(os.path.join(tmp_dir, "X.f64"), "wb") as f:
+        for rows, chunk_labels, skipped in iter_labeled_chunks(dataset_path, chunk_size):
+            n_skipped += skipped
+            if not rows:
+                continue
+            X_chunk = fuse_rows(rows, ensemble_pipeline)
+            scaler.partial_fit(X_chunk)
+            f.write(X_chunk.tobytes())
+            digest.update(X_chunk.tobytes())
+            labels.extend(chunk_labels)
+            n_rows += len(rows)
+    y = np.array(labels, dtype=np.int64)
+    digest.update(y.tobytes())
+
+    if n_rows:
+        X = np.memmap(os.path.join(tmp_dir, "X.f64"), dtype=np.float64, mode="r+", shape=(n_rows, len(FEATURE_SCHEMA)))
+        for start in range(0, n_rows, chunk_size):
+            X[start:start + chunk_size] = scaler.transform(X[start:start + chunk_size])
+        X.flush()
+        del X
+    np.save(os.path.join(tmp_dir, "y.npy"), y)
+
+    run_dir = os.path.join(work_root, digest.hexdigest()[:16])
+    if os.path.exists(run_dir):
+        shutil.rmtree(tmp_dir)
+    else:
+        os.replace(tmp_dir, run_dir)
+    return run_dir, n_rows, n_skipped
+
+def load_matrix(run_dir):
+    y = np.load(os.path.join(run_dir, "y.npy"))
+    X = np.memmap(os.path.join(run_dir, "X.f64"), dtype=np.float64, mode="r", shape=(len(y), len(FEATURE_SCHEMA)))
+    return X, y
+
+def _fit_member(run_dir, fold, name, estimator, train_idx):
+    """
+    Process-pool task: fits one member on one CV fold's training rows and checkpoints it.
+    """
+    checkpoint = os.path.join(run_dir, f"fold{fold}_{name}.joblib")
+    if os.path.exists(checkpoint):
+        return fold, name, 0.0, True
+    start = time.perf_counter()
+    X, y = load_matrix(run_dir)
+    estimator.fit(X[train_idx], y[train_idx])
+    tmp_path = checkpoint + ".tmp"
+    joblib.dump(estimator, tmp_path)
+    os.replace(tmp_path, checkpoint)
+    return fold, name, time.perf_counter() - start, False
+
+def _assemble_voting(template, members, y):
+    # A VotingClassifier over already fitted members (what VotingClassifier.fit would leave behind)
+    voting = clone(template)
+    names = [name for name, _ in template.estimators]
+    voting.estimators_ = [members[name] for name in names]
+    voting.named_estimators_ = Bunch(**{name: members[name] for name in names})
+    voting.le_ = LabelEncoder().fit(y)
+    voting.classes_ = voting.le_.classes_
+    return voting
+
+def _metrics(y_true, probs):
+    metrics = {
+        "brier": float(brier_score_loss(y_true, probs)),
+        "log_loss": float(log_loss(y_true, probs, labels=[0, 1])),
+        "accuracy": float(accuracy_score(y_true, probs >= 0.5)),
+        "positive_rate": float(np.mean(y_true)),
+    }
+    if len(np.unique(y_true)) == 2:
+        metrics["roc_auc"] = float(roc_auc_score(y_true, probs))
+    return metrics
+
+def train_from_dataset(dataset_path=feature_store.path, version=None, directory=None, workers=None,
+                       chunk_size=10000, keep_checkpoints=False, ensemble_pipeline=None, distill=False):
+    """
+    Fits the calibrated ensemble on the labeled rows of the research dataset.
+
+    Every (CV fold, member) pair is fitted in its own process, reading the standardized
+    matrix through a memory map and checkpointing the fitted member, so an interrupted
+    run resumes where it stopped. Each fold's members are then combined into a soft
+    VotingClassifier, sigmoid-calibrated on the fold's held-out rows, and the folds are
+    stored as one CalibratedClassifierCV, exactly the structure train_mock_model produces.
+    With distill=True a compact student is also distilled for the "distilled" serving mode.
+    Saves a versioned artifact plus a training report; returns (pipeline, report). Both
+    record the dataset's label cursor (store label sequence, or CSV row count) at training
+    time, where DatasetLabelSource resumes so online updates never replay training rows.
+    """
+    timings = {}
+    ensemble_pipeline = ensemble_pipeline or NurosEnsemblePipeline()
+    scaler = clone(ensemble_pipeline.scaler)
+    work_root = os.path.join(model_dir(directory), CHECKPOINT_DIR)
+
+    # Taken before reading, so rows labeled while the matrix is built are left to online updates
+    store = dataset_store(dataset_path)
+    label_cursor = store.label_cursor() if store is not None else None
+    start = time.perf_counter()
+    run_dir, n_rows, n_skipped = build_matrix(dataset_path, ensemble_pipeline, scaler, work_root, chunk_size)
+    timings["build_matrix"] = time.perf_counter() - start
+    if label_cursor is None:
+        label_cursor = n_rows + n_skipped
+    X, y = load_matrix(run_dir)
+    n_folds = ensemble_pipeline.calibrated_model.cv
+    if n_rows == 0 or len(np.unique(y)) < 2 or np.bincount(y).min() < n_folds:
+        raise ValueError(f"Need at least {n_folds} labeled rows of each class; found {np.bincount(y, minlength=2).tolist()}.")
+
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42).split(np.zeros(n_rows), y))
+    template = ensemble_pipeline.calibrated_model.estimator
+    member_seconds = {}
+    resumed = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_fit_member, run_dir, fold, name, clone(estimator), train_idx)
+            for fold, (train_idx, _) in enumerate(folds)
+            for name, estimator in template.estimators
+        ]
+        for future in as_completed(futures):
+            fold, name, seconds, was_checkpointed = future.result()
+            member_seconds[f"fold{fold}_{name}"] = round(seconds, 3)
+            if was_checkpointed:
+                resumed.append(f"fold{fold}_{name}")
+    timings["fit_members"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calibrated_classifiers = []
+    oof = np.empty(n_rows)
+    for fold, (_, test_idx) in enumerate(folds):
+        members = {
+            name: joblib.load(os.path.join(run_dir, f"fold{fold}_{name}.joblib"))
+            for name, _ in template.estimators
+        }
+        voting = _assemble_voting(template, members, y)
+        X_test, y_test = X[test_idx], y[test_idx]
+        calibrated = CalibratedClassifierCV(FrozenEstimator(voting), method="sigmoid").fit(X_test, y_test)
+        fold_classifier = calibrated.calibrated_classifiers_[0]
+        fold_classifier.estimator = voting
+        calibrated_classifiers.append(fold_classifier)
+        oof[test_idx] = fold_classifier.predict_proba(X_test)[:, 1]
+
+    model = clone(ensemble_pipeline.calibrated_model)
+    model.calibrated_classifiers_ = calibrated_classifiers
+    model.classes_ = calibrated_classifiers[0].classes
+    model.n_features_in_ = X.shape[1]
+    sample_rows = np.sort(np.random.default_rng(0).permutation(n_rows)[:REFERENCE_SAMPLE_ROWS])
+    X_sample = np.asarray(X[sample_rows])
+    engine = ModelSnapshot(scaler, model).engine
+    extras = {
+        "screen": fit_screen(engine, X_sample),
+        "drift_reference": reference_from_data(scaler.inverse_transform(X_sample)),
+    }
+    timings["calibrate"] = time.perf_counter() - start
+    if distill:
+        start = time.perf_counter()
+        extras["student"] = distill_student(engine, X_sample)
+        timings["distill"] = time.perf_counter() - start
+    # Calibrators were fitted on these same held-out rows, so calibration metrics are mildly optimistic
+    metrics = _metrics(y, oof)
+    metadata = {
+        "source": "train_from_dataset",
+        "dataset": os.path.abspath(dataset_path),
+        "label_cursor": label_cursor,
+        "n_rows": n_rows,
+        "metrics": metrics,
+    }
+    ensemble_pipeline.swap_model(scaler, model, extras=extras, metadata=metadata)
+    start = time.perf_counter()
+    manifest = ensemble_pipeline.save_model(version=version, directory=directory, metadata=metadata)
+    timings["save_artifact"] = time.perf_counter() - start
+
+    report = {
+        "version": manifest["version"],
+        "dataset": os.path.abspath(dataset_path),
+        "rows_labeled": n_rows,
+        "rows_skipped_unlabeled": n_skipped,
+        "label_cursor": label_cursor,
+        "class_counts": np.bincount(y, minlength=2).tolist(),
+        "folds": n_folds,
+        "workers": workers or os.cpu_count(),
+        "timings_sec": {stage: round(seconds, 3) for stage, seconds in timings.items()},
+        "member_fit_sec": dict(sorted(member_seconds.items())),
+        "resumed_from_checkpoint": sorted(resumed),
+        "cv_metrics": metrics,
+    }
+    if "student" in extras:
+        report["student"] = extras["student"].fit_stats
+    report["timings_sec"]["total"] = round(sum(timings.values()), 3)
+    save_report(manifest["version"], report, directory)
+
+    del X
+    if not keep_checkpoints:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return ensemble_pipeline, report
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the Nuros ensemble on labeled research dataset rows.")
+    parser.add_argument("--dataset", default=feature_store.path, help="Feature store database or a .csv export")
+    parser.add_argument("--version", default=None, help="Artifact version (default: UTC timestamp)")
+    parser.add_argument("--model-dir", default=None, help="Artifact directory (default: $NUROS_MODEL_DIR or ./models)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows fused per streaming chunk")
+    parser.add_argument("--keep-checkpoints", action="store_true", help="Keep the fused matrix and member checkpoints")
+    parser.add_argument("--distill", action="store_true", help="Also distill a compact student model")
+    args = parser.parse_args(argv)
+
+    _, report = train_from_dataset(args.dataset, args.version, args.model_dir, args.workers,
+                                   args.chunk_size, args.keep_checkpoints, distill=args.distill)
+    print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,296 @@
+import atexit
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from feature_store import feature_store
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, every process spools to its own file
+    fcntl = None
+
+SPOOL_FILE = "validation_dataset.spool"
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue in front of a FeatureStore, so persisting research records
+    never adds storage latency to a scan.
+
+    enqueue() appends the record to a local spool file (one JSON line, flushed to the OS)
+    and to an in-memory FIFO of at most `max_depth` records; when the FIFO is full the
+    caller blocks (backpressure) or gets queue.Full. A background writer thread drains
+    up to `batch_size` records per store transaction. After each committed batch the
+    spool's committed byte offset is recorded next to it, and the spool is truncated
+    whenever everything spooled is committed. On start, spooled records past that offset
+    (left by a crash) are replayed first; a crash between a commit and its offset update
+    can replay that batch again (at-least-once). close() drains the queue before returning.
+
+    A spool belongs to one process at a time: start() takes an exclusive lock on
+    <spool>.lock, and if another live process already holds it, spools to
+    <spool>.<pid> instead. Spools left by processes that died (their lock is free) are
+    replayed by the next process that starts.
+    """
+
+    def __init__(self, store=feature_store, max_depth=10000, batch_size=500, spool_path=SPOOL_FILE, fsync=False,
+                 retry_sec=1.0):
+        self.store = store
+        self.max_depth = max_depth
+        self.batch_size = batch_size
+        self.spool_path = spool_path
+        self.fsync = fsync
+        self.retry_sec = retry_sec
+        self._cond = threading.Condition()
+        self._buffer = deque()
+        self._spool = None
+        self._path = spool_path
+        self._lock_file = None
+        self._spooled_bytes = 0
+        self._committed_bytes = 0
+        self._in_flight = 0
+        self._thread = None
+        self._stopping = False
+        self.stats = {
+            "enqueued": 0, "committed": 0, "batches": 0, "recovered": 0, "blocked_puts": 0, "rejected": 0,
+            "errors": 0, "max_depth_seen": 0, "last_batch_size": 0, "flush_sec_total": 0.0, "flush_sec_max": 0.0,
+        }
+
+    # --- Spool ---
+    @property
+    def _offset_path(self):
+        return self._path + ".offset"
+
+    def _write_offset(self, offset):
+        tmp_path = self._offset_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp_path, self._offset_path)
+
+    @staticmethod
+    def _read_offset(path):
+        try:
+            with open(path + ".offset") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    @staticmethod
+    def _claim(path):
+        # Exclusive lock on <path>.lock, or None while another live process holds it
+        lock_file = open(path + ".lock", "a")
+        if fcntl:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return None
+        return lock_file
+
+    def _replay(self, path):
+        # Appends records spooled at `path` past its committed offset to the store
+        if not os.path.exists(path):
+            return 0
+        records = []
+        with open(path, "rb") as f:
+            f.seek(self._read_offset(path))
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break  # torn final line
+        for start in range(0, len(records), self.batch_size):
+            self.store.append_many(records[start:start + self.batch_size])
+        self.stats["recovered"] += len(records)
+        return len(records)
+
+    def _recover(self):
+        # Replays this spool, then per-process spools whose owner is gone
+        recovered = self._replay(self._path)
+        if os.path.exists(self._path):
+            os.truncate(self._path, 0)
+        self._write_offset(0)
+        if not fcntl:
+            return recovered  # without locks a live process's spool cannot be told apart
+        directory = os.path.dirname(os.path.abspath(self.spool_path))
+        pattern = re.compile(re.escape(os.path.basename(self.spool_path)) + r"\.\d+")
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not pattern.fullmatch(name) or path == os.path.abspath(self._path):
+                continue
+            lock_file = self._claim(path)
+            if lock_file is None:
+                continue
+            try:
+                recovered += self._replay(path)
+                self._remove_spool(path)
+            finally:
+                lock_file.close()
+        return recovered
+
+    @staticmethod
+    def _remove_spool(path):
+        for suffix in ("", ".offset", ".lock"):
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+    def _spool_write(self, line):
+        self._spool.write(line)
+        self._spool.flush()
+        if self.fsync:
+            os.fsync(self._spool.fileno())
+        self._spooled_bytes += len(line)
+
+    # --- Lifecycle ---
+    def start(self):
+        with self._cond:
+            if self._thread is not None:
+                return
+            directory = os.path.dirname(os.path.abspath(self.spool_path))
+            os.makedirs(directory, exist_ok=True)
+            self._path = self.spool_path
+            self._lock_file = self._claim(self._path) if fcntl else None
+            if self._lock_file is None:
+                self._path = f"{self.spool_path}.{os.getpid()}"
+                self._lock_file = self._claim(self._path)
+            self._recover()
+            self._spool = open(self._path, "ab")
+            self._spooled_bytes = self._committed_bytes = 0
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="nuros-write-behind", daemon=True)
+            self._thread.start()
+
+    def close(self, timeout=None):
+        """
+        Stops accepting records, waits for the writer to commit everything queued and
+        closes the spool. Returns False if the writer did not finish within `timeout`.
+        """
+        with self._cond:
+            if self._thread is None:
+                return True
+            self._stopping = True
+            self._cond.notify_all()
+            thread = self._thread
+        thread.join(timeout)
+        if thread.is_alive():
+            return False
+        with self._cond:
+            self._thread = None
+            self._spool.close()
+            self._spool = None
+            if self._path != self.spool_path:
+                # Fully committed per-process spool: nothing left for a later process to replay
+                self._remove_spool(self._path)
+            self._lock_file.close()
+            self._lock_file = None
+        return True
+
+    # --- Producer ---
+    def enqueue(self, record, block=True, timeout=None):
+        """
+        Queues one record for the store. With block=False (or after `timeout` seconds)
+        a full queue raises queue.Full; the record is then neither spooled nor queued.
+        """
+        if self._thread is None:
+            self.start()
+        line = (json.dumps(record, default=float) + "\n").encode()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("write-behind queue is closed")
+            if len(self._buffer) >= self.max_depth:
+                if not block:
+                    self.stats["rejected"] += 1
+                    raise queue.Full
+                self.stats["blocked_puts"] += 1
+                while len(self._buffer) >= self.max_depth:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        self.stats["rejected"] += 1
+                        raise queue.Full
+                    self._cond.wait(remaining)
+            self._spool_write(line)
+            self._buffer.append((record, len(line)))
+            self.stats["enqueued"] += 1
+            self.stats["max_depth_seen"] = max(self.stats["max_depth_seen"], len(self._buffer))
+            self._cond.notify_all()
+
+    # --- Writer ---
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._buffer and not self._stopping:
+                    self._cond.wait()
+                if not self._buffer:
+                    return
+                n = min(self.batch_size, len(self._buffer))
+                batch = [self._buffer.popleft() for _ in range(n)]
+                self._in_flight = n
+                self._cond.notify_all()
+
+            start = time.perf_counter()
+            try:
+                self.store.append_many([record for record, _ in batch])
+            except Exception:
+                with self._cond:
+                    self._buffer.extendleft(reversed(batch))
+                    self._in_flight = 0
+                    self.stats["errors"] += 1
+                    self._cond.wait(self.retry_sec)
+                continue
+            elapsed = time.perf_counter() - start
+
+            with self._cond:
+                self._in_flight = 0
+                self._committed_bytes += sum(size for _, size in batch)
+                if not self._buffer:
+                    self._spool.truncate(0)
+                    self._spooled_bytes = self._committed_bytes = 0
+                self._write_offset(self._committed_bytes)
+                self.stats["committed"] += n
+                self.stats["batches"] += 1
+                self.stats["last_batch_size"] = n
+                self.stats["flush_sec_total"] += elapsed
+                self.stats["flush_sec_max"] = max(self.stats["flush_sec_max"], elapsed)
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Blocks until every record queued so far is committed. Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._buffer or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def metrics(self):
+        """
+        Backpressure snapshot: current depth, batch sizes and flush latency.
+        """
+        with self._cond:
+            stats = dict(self.stats)
+            depth = len(self._buffer) + self._in_flight
+            spooled = self._spooled_bytes - self._committed_bytes
+        batches = stats["batches"]
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "utilization": depth / self.max_depth,
+            "spooled_bytes": spooled,
+            "mean_batch_size": stats["committed"] / batches if batches else 0.0,
+            "mean_flush_ms": 1000 * stats["flush_sec_total"] / batches if batches else 0.0,
+            "max_flush_ms": 1000 * stats["flush_sec_max"],
+            **{key: value for key, value in stats.items() if not key.startswith("flush_sec")},
+        }
+
+# Singleton instance (NUROS_SPOOL_FILE overrides the spool path); drained at interpreter exit
+research_writer = WriteBehindQueue(spool_path=os.environ.get("NUROS_SPOOL_FILE", SPOOL_FILE))
+atexit.register(research_writer.close, 30.0)